@@ -0,0 +1,74 @@
+import json
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import User
+from core.benchmark import benchmark_database, percentile
+from accounts.ratelimit import login_limiter
+from accounts.utils import sync_user_permissions
+
+PASSWORD = 'Bench#Pass1'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent logins against login_view in a throwaway test database.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50)
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--rounds', type=int, default=2, help='Logins per user.')
+        parser.add_argument('--fast-hash', action='store_true',
+                            help='Use MD5 hashing to measure everything except PBKDF2 cost.')
+        parser.add_argument('--no-limit', action='store_true', help='Disable the login rate limiter.')
+
+    def handle(self, *args, **options):
+        overrides = {}
+        if options['fast_hash']:
+            overrides['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+        if options['no_limit']:
+            overrides['LOGIN_RATE_LIMITS'] = {}
+
+        with override_settings(**overrides):
+            login_limiter.reset()
+            try:
+                with benchmark_database():
+                    self.run_benchmark(options)
+            finally:
+                login_limiter.reset()
+
+    def run_benchmark(self, options):
+        emails = [f'bench{i}@example.com' for i in range(options['users'])]
+        for email in emails:
+            user = User.objects.create_user(email=email, password=PASSWORD, user_type='staff')
+            sync_user_permissions(user, [('seat', 'view'), ('badge', 'view'), ('badge', 'print')])
+
+        def attempt(email):
+            body = json.dumps({'email': email, 'password': PASSWORD})
+            started = time.perf_counter()
+            response = Client().post('/login/verify/', body, content_type='application/json')
+            return response.status_code, time.perf_counter() - started
+
+        with CaptureQueriesContext(connection) as queries:
+            attempt(emails[0])
+        login_limiter.reset()
+
+        jobs = emails * options['rounds']
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            results = list(pool.map(attempt, jobs))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for _, latency in results)
+        statuses = Counter(status for status, _ in results)
+        self.stdout.write(f'logins:          {len(jobs)} ({options["concurrency"]} concurrent)')
+        self.stdout.write(f'throughput:      {len(jobs) / elapsed:.1f} logins/s')
+        self.stdout.write(f'latency p50/p95: {statistics.median(latencies) * 1000:.1f} / {percentile(latencies, 95) * 1000:.1f} ms')
+        self.stdout.write(f'queries/login:   {len(queries.captured_queries)}')
+        self.stdout.write(f'status codes:    {dict(sorted(statuses.items()))}')
@@ -0,0 +1,40 @@
+import json
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.provisioning import provision_users
+
+
+class Command(BaseCommand):
+    help = 'Create staff accounts in bulk from a CSV (name, email, password, role[, status, permissions]).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path')
+        parser.add_argument('--dry-run', action='store_true', help='Validate the file without creating users.')
+        parser.add_argument('--workers', type=int, default=None, help='Password hashing processes (default: CPU count).')
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig') as f:
+                text = f.read()
+        except OSError as e:
+            raise CommandError(str(e))
+
+        started = time.perf_counter()
+        workers = options['workers'] or os.cpu_count() or 1
+        result = provision_users(text, dry_run=options['dry_run'], workers=workers)
+        elapsed = time.perf_counter() - started
+
+        if not result['success']:
+            for error in result['errors']:
+                self.stderr.write(f"Row {error['row']}: {error['error']}")
+            raise CommandError(f"{len(result['errors'])} invalid rows; nothing was created.")
+
+        if result.get('dry_run'):
+            self.stdout.write(self.style.SUCCESS(f"{result['valid']} rows are valid."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Created {result['created']} users in {elapsed:.1f}s."))
+        if options['verbosity'] > 1:
+            self.stdout.write(json.dumps(result, indent=2))
@@ -0,0 +1,66 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.contrib.auth.views import redirect_to_login
+from django.http import JsonResponse
+
+from .permissions import compile_permission_map
+from .utils import get_permissions
+
+
+class PermissionMiddleware:
+    """
+    Enforce @requires_permission declarations for every routed view.
+    Must come after AuthenticationMiddleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.rules = compile_permission_map()
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+            # The handler picks this up instead of the sync hook, so an ASGI
+            # request is not sent to a thread just for the permission check.
+            self.process_view = self.aprocess_view
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def _rule(self, request):
+        match = request.resolver_match
+        return self.rules.get(match.route) if match else None
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        rule = self._rule(request)
+        if rule is None:
+            return None
+        user = request.user
+        # Async views run under WSGI too (runserver, the test client); let
+        # their request.auser() reuse this user instead of loading it again.
+        request._acached_user = user
+        return self._check(request, user, rule)
+
+    async def aprocess_view(self, request, view_func, view_args, view_kwargs):
+        rule = self._rule(request)
+        if rule is None:
+            return None
+        return self._check(request, await request.auser(), rule)
+
+    def _check(self, request, user, rule):
+        if not user.is_authenticated:
+            if '/api/' in request.path:
+                return JsonResponse({'success': False, 'error': 'Authentication required'}, status=401)
+            return redirect_to_login(request.get_full_path())
+
+        if not rule.allows(user):
+            return JsonResponse({'success': False, 'error': f'No {rule.describe()}'}, status=403)
+
+        # Loaded once here; views read it instead of re-deriving it.
+        request.permissions = get_permissions(user)
+        return None
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:44
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+# Frozen copy of the permission_mask layout in accounts.models as of this
+# migration: each module owns an 8-bit slot, actions are bits within it.
+# Later changes to the live table must not change what this migration writes.
+MODULE_SHIFT = {'seats': 0, 'badges': 8, 'users': 16, 'alignment': 24}
+MODULE_ALIASES = {'seat': 'seats', 'badge': 'badges', 'user': 'users', 'align': 'alignment'}
+ACTION_BIT = {
+    'view': 1, 'edit': 2, 'delete': 4, 'print': 8,
+    'export': 16, 'create': 32, 'upload': 64, 'reset': 128,
+}
+
+
+def permissions_to_mask(pairs):
+    mask = 0
+    for module, action in pairs:
+        shift = MODULE_SHIFT.get(MODULE_ALIASES.get(module, module))
+        bit = ACTION_BIT.get(action)
+        if shift is not None and bit is not None:
+            mask |= bit << shift
+    return mask
+
+
+def populate_permission_masks(apps, schema_editor):
+    User = apps.get_model('accounts', 'User')
+    UserPermission = apps.get_model('accounts', 'UserPermission')
+    pairs = defaultdict(list)
+    for user_id, module, action in UserPermission.objects.values_list('user_id', 'module', 'action'):
+        pairs[user_id].append((module, action))
+    for user_id, user_pairs in pairs.items():
+        User.objects.filter(pk=user_id).update(permission_mask=permissions_to_mask(user_pairs))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0007_alter_userpermission_action'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='permission_mask',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_permission_masks, migrations.RunPython.noop),
+    ]
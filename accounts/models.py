@@ -44,6 +44,9 @@ class User(AbstractBaseUser, PermissionsMixin, TimestampedModel):
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
 
+    # Bitfield mirror of this user's UserPermission rows; see permission_bit()
+    permission_mask = models.PositiveBigIntegerField(default=0, editable=False)
+
     objects = UserManager()
 
     USERNAME_FIELD = 'email'
@@ -56,6 +59,19 @@ class User(AbstractBaseUser, PermissionsMixin, TimestampedModel):
     def __str__(self):
         return self.email
 
+    def has_module_permission(self, module, action):
+        """O(1) check against permission_mask; module may be a stored alias."""
+        bit = permission_bit(module, action)
+        return bool(bit and (self.is_superuser or self.permission_mask & bit))
+
+    def sync_permission_mask(self):
+        """Recompute permission_mask from the UserPermission table and save it."""
+        self.permission_mask = permissions_to_mask(
+            UserPermission.objects.filter(user_id=self.pk).values_list('module', 'action')
+        )
+        User.objects.filter(pk=self.pk).update(permission_mask=self.permission_mask)
+        return self.permission_mask
+
 
 class UserPermission(models.Model):
     """
@@ -94,4 +110,43 @@ class UserPermission(models.Model):
         ]
 
     def __str__(self):
-        return f"{self.user.email} → {self.get_module_display()}: {self.get_action_display()}"
\ No newline at end of file
+        return f"{self.user.email} → {self.get_module_display()}: {self.get_action_display()}"
+
+
+# Stored module codes (as sent by the user-management page) → Module values.
+MODULE_ALIASES = {
+    'seat': UserPermission.Module.SEATS,
+    'badge': UserPermission.Module.BADGES,
+    'user': UserPermission.Module.USERS,
+    'align': UserPermission.Module.ALIGNMENT,
+}
+MODULE_CODES = {module: code for code, module in MODULE_ALIASES.items()}
+
+# Each module owns an 8-bit slot in permission_mask; actions are bits within it.
+_MODULE_SHIFT = {module: index * 8 for index, module in enumerate(UserPermission.Module.values)}
+_ACTION_BIT = {action: 1 << index for index, action in enumerate(UserPermission.Action.values)}
+
+
+def permission_bit(module, action):
+    """Bit for (module, action) in permission_mask, or 0 if unknown."""
+    shift = _MODULE_SHIFT.get(MODULE_ALIASES.get(module, module))
+    action_bit = _ACTION_BIT.get(action)
+    if shift is None or action_bit is None:
+        return 0
+    return action_bit << shift
+
+
+def permissions_to_mask(pairs):
+    """Fold (module, action) pairs into a permission_mask."""
+    mask = 0
+    for module, action in pairs:
+        mask |= permission_bit(module, action)
+    return mask
+
+
+def mask_to_permissions(mask):
+    """Expand a permission_mask into {module: [actions]} for every module."""
+    return {
+        module: [action for action, bit in _ACTION_BIT.items() if (mask >> shift) & bit]
+        for module, shift in _MODULE_SHIFT.items()
+    }
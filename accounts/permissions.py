@@ -0,0 +1,65 @@
+"""
+Declarative view permissions.
+
+Views declare what they need with @requires_permission('seats.edit').
+PermissionMiddleware compiles those declarations into a route → rule table
+once at startup and enforces them on every request with a dict lookup and
+a bit test against the user's permission_mask.
+"""
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from .models import permission_bit
+
+
+def requires_permission(*permissions):
+    """
+    Declare the permissions a view needs as 'module.action' strings.
+    Holding any one of them is enough. Apply as the outermost decorator.
+    """
+    rules = tuple(tuple(permission.split('.', 1)) for permission in permissions)
+    for module, action in rules:
+        if not permission_bit(module, action):
+            raise ValueError(f'Unknown permission: {module}.{action}')
+
+    def decorator(view):
+        view.required_permissions = rules
+        return view
+    return decorator
+
+
+class PermissionRule:
+    __slots__ = ('permissions', 'mask')
+
+    def __init__(self, permissions):
+        self.permissions = permissions
+        self.mask = 0
+        for module, action in permissions:
+            self.mask |= permission_bit(module, action)
+
+    def allows(self, user):
+        # Superusers hold every permission, as with Django's own checks.
+        if user.is_superuser:
+            return True
+        return bool(getattr(user, 'permission_mask', 0) & self.mask)
+
+    def describe(self):
+        return ' or '.join(f'{action} permission for {module}' for module, action in self.permissions)
+
+
+def _walk(patterns, prefix=''):
+    for entry in patterns:
+        route = prefix + str(entry.pattern)
+        if isinstance(entry, URLResolver):
+            yield from _walk(entry.url_patterns, route)
+        elif isinstance(entry, URLPattern):
+            yield route, entry.callback
+
+
+def compile_permission_map(urlconf=None):
+    """Map each route string (as in ResolverMatch.route) to its PermissionRule."""
+    table = {}
+    for route, callback in _walk(get_resolver(urlconf).url_patterns):
+        permissions = getattr(callback, 'required_permissions', None)
+        if permissions:
+            table[route] = PermissionRule(permissions)
+    return table
@@ -0,0 +1,200 @@
+"""
+Bulk user provisioning from CSV.
+
+Columns: name, email, password, role, and optionally status and
+permissions. permissions holds `module_action` entries separated by
+semicolons, e.g. "seat_view;seat_edit;badge_print". Those are the same keys
+the user listing returns.
+
+The whole file is validated before anything is written. Password hashing
+is the expensive step (PBKDF2, by design). Callers that own their process,
+such as the provision_users command, can spread large batches over a pool
+of spawned worker processes by passing `workers`; web requests hash in
+process, since forking or spawning from a threaded server is not safe to
+do per request. Users and their permission rows are then inserted with
+bulk_create in one transaction.
+"""
+import csv
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import django
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from .models import Status, User, UserPermission, UserType, permission_bit, permissions_to_mask
+from .utils import bump_users_version
+from .validators import validate_email_format, validate_name, validate_password
+
+REQUIRED_COLUMNS = ('name', 'email', 'password', 'role')
+
+# Below this many rows the pool start-up costs more than it saves.
+PARALLEL_HASH_THRESHOLD = 16
+
+_pool = None
+_pool_workers = None
+_pool_lock = threading.Lock()
+
+
+def _hash_pool(workers):
+    """The shared hashing pool, (re)started when missing or sized differently."""
+    global _pool, _pool_workers
+    with _pool_lock:
+        if _pool is None or _pool_workers != workers:
+            if _pool is not None:
+                _pool.shutdown(wait=False)
+            # Spawn rather than fork: forking a threaded process can leave
+            # the child holding locks no thread will ever release. Spawned
+            # workers start without Django configured.
+            _pool = ProcessPoolExecutor(max_workers=workers, initializer=django.setup,
+                                        mp_context=multiprocessing.get_context('spawn'))
+            _pool_workers = workers
+        return _pool
+
+
+def _drop_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False)
+
+
+def hash_passwords(passwords, workers=None):
+    """
+    Hash passwords with the configured hasher; large batches go to a pool of
+    `workers` processes when given, and are hashed in process otherwise.
+    """
+    if not workers or workers == 1 or len(passwords) < PARALLEL_HASH_THRESHOLD:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (workers * 4))
+    pool = _hash_pool(workers)
+    # Hand the workers this process's hasher, so they hash exactly as it would.
+    hash_one = partial(make_password, hasher=get_hasher())
+    try:
+        return list(pool.map(hash_one, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died (OOM, killed); start afresh next time and finish here.
+        _drop_pool(pool)
+        return [make_password(password) for password in passwords]
+
+
+def _parse_permissions(value):
+    pairs = []
+    for entry in filter(None, (part.strip() for part in (value or '').split(';'))):
+        module, _, action = entry.partition('_')
+        if not permission_bit(module, action):
+            raise ValueError(f'Unknown permission: {entry}')
+        pairs.append((module, action))
+    return pairs
+
+
+def parse_rows(text):
+    """
+    Parse and validate CSV text.
+    Returns (rows, errors); rows are only usable when errors is empty.
+    """
+    reader = csv.DictReader(io.StringIO(text))
+    missing = [col for col in REQUIRED_COLUMNS if col not in (reader.fieldnames or [])]
+    if missing:
+        return [], [{'row': 1, 'error': f"Missing required columns: {', '.join(missing)}"}]
+
+    rows, errors, seen = [], [], set()
+    for row_num, raw in enumerate(reader, start=2):
+        row = {key: (value or '').strip() for key, value in raw.items() if key}
+        email = User.objects.normalize_email(row['email'])
+        problem = (
+            validate_name(row['name'])
+            or validate_email_format(email)
+            or validate_password(row['password'])
+        )
+        if not problem and row['role'] not in UserType.values:
+            problem = f"Role must be one of: {', '.join(UserType.values)}"
+        status = row.get('status') or Status.ACTIVE
+        if not problem and status not in Status.values:
+            problem = f"Status must be one of: {', '.join(Status.values)}"
+        if not problem and email.lower() in seen:
+            problem = 'Duplicate email in file'
+        if not problem:
+            try:
+                permissions = _parse_permissions(row.get('permissions'))
+            except ValueError as e:
+                problem = str(e)
+        if problem:
+            errors.append({'row': row_num, 'email': row['email'], 'error': problem})
+            continue
+        seen.add(email.lower())
+        rows.append({
+            'row': row_num,
+            'name': row['name'],
+            'email': email,
+            'password': row['password'],
+            'role': row['role'],
+            'status': status,
+            'permissions': permissions,
+        })
+
+    # One query for every email that already has an account, in any case.
+    existing = set(
+        User.objects.annotate(email_lower=Lower('email'))
+        .filter(email_lower__in=[r['email'].lower() for r in rows])
+        .values_list('email_lower', flat=True)
+    )
+    errors.extend(
+        {'row': r['row'], 'email': r['email'], 'error': 'Email already exists'}
+        for r in rows if r['email'].lower() in existing
+    )
+    errors.sort(key=lambda e: e['row'])
+    return rows, errors
+
+
+def provision_users(text, dry_run=False, workers=None, batch_size=500):
+    """
+    Validate a CSV and, unless invalid or `dry_run`, create every user.
+    `workers` is passed on to hash_passwords. Returns a JSON-serializable
+    summary.
+    """
+    rows, errors = parse_rows(text)
+    if errors:
+        return {'success': False, 'created': 0, 'errors': errors}
+    if dry_run or not rows:
+        return {'success': True, 'dry_run': dry_run, 'created': 0, 'valid': len(rows), 'errors': []}
+
+    hashes = hash_passwords([row['password'] for row in rows], workers=workers)
+    users = [
+        User(
+            email=row['email'],
+            first_name=row['name'],
+            password=password_hash,
+            user_type=row['role'],
+            status=row['status'],
+            permission_mask=permissions_to_mask(row['permissions']),
+        )
+        for row, password_hash in zip(rows, hashes)
+    ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users, batch_size=batch_size)
+        UserPermission.objects.bulk_create(
+            [
+                UserPermission(user=user, module=module, action=action)
+                for user, row in zip(users, rows)
+                for module, action in row['permissions']
+            ],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
+    # bulk_create skips signals, so invalidate the listing cache here.
+    bump_users_version()
+
+    return {
+        'success': True,
+        'created': len(users),
+        'users': [{'id': user.id, 'email': user.email} for user in users],
+        'errors': [],
+    }
@@ -0,0 +1,85 @@
+"""
+In-process token-bucket rate limiting for login attempts.
+
+Buckets live in a bounded LRU map, so a flood of distinct keys cannot
+grow memory without limit. State is per worker process; that is enough
+to stop a brute-force burst from tying up CPU on password hashing.
+"""
+from collections import OrderedDict
+import threading
+import time
+
+from django.conf import settings
+
+
+class TokenBucketLimiter:
+    """`capacity` tokens per key, refilled at `rate` tokens per second."""
+
+    def __init__(self, capacity, rate, max_keys=10000):
+        self.capacity = capacity
+        self.rate = rate
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def consume(self, key, now=None):
+        """
+        Take one token for `key`. Returns 0 when allowed, otherwise the
+        number of seconds until a token is available.
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                wait = 0
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
+
+
+def _limiter(scope):
+    capacity, rate = getattr(settings, 'LOGIN_RATE_LIMITS', {}).get(scope, (None, None))
+    if capacity is None:
+        return None
+    return TokenBucketLimiter(capacity, rate)
+
+
+class LoginRateLimiter:
+    """Separate buckets per client IP and per submitted email."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Drop every bucket and re-read LOGIN_RATE_LIMITS."""
+        self.by_ip = _limiter('ip')
+        self.by_email = _limiter('email')
+
+    def check(self, ip, email):
+        """Seconds to wait before another attempt is allowed (0 if allowed)."""
+        waits = []
+        if self.by_ip and ip:
+            waits.append(self.by_ip.consume(ip))
+        if self.by_email and email:
+            waits.append(self.by_email.consume(email.strip().lower()))
+        return max(waits, default=0)
+
+    def succeeded(self, email):
+        # A correct password shouldn't count against the next login.
+        if self.by_email and email:
+            self.by_email.reset(email.strip().lower())
+
+
+login_limiter = LoginRateLimiter()
@@ -0,0 +1,34 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import User, UserPermission
+from .utils import bump_users_version, permission_sync_active
+
+
+def _owner_deleted(instance, origin):
+    """Whether this row goes because its user (or a queryset of users) is deleted."""
+    if isinstance(origin, User):
+        return origin.pk == instance.user_id
+    return getattr(origin, 'model', None) is User
+
+
+@receiver(post_save, sender=UserPermission)
+@receiver(post_delete, sender=UserPermission)
+def permission_changed(sender, instance, **kwargs):
+    if permission_sync_active.get():
+        return
+    # A cascade from deleting the user leaves no mask to keep in step.
+    if _owner_deleted(instance, kwargs.get('origin')):
+        return
+    # Keep the bitfield in step with rows edited anywhere, including the admin.
+    User(pk=instance.user_id).sync_permission_mask()
+    bump_users_version()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    # Logins only touch last_login, which the user listing does not show.
+    if kwargs.get('update_fields') == frozenset({'last_login'}):
+        return
+    bump_users_version()
@@ -1,3 +1,119 @@
-from django.test import TestCase
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import check_password
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import querybudget
+from core.querybudget import Endpoint
+from . import provisioning
+from .models import User, UserPermission
+
+
+# Each row costs one PBKDF2 hash in the request, like a login.
+BULK_USERS = 3
+
+
+def _users_csv(dataset):
+    rows = ['name,email,password,role,permissions']
+    rows += [f'New Staff {letter},newstaff{letter}@example.com,Str0ng!Pass,staff,seat_view;badge_print'
+             for letter in 'ABCDEFGHIJ'[:BULK_USERS]]
+    return {'file': SimpleUploadedFile('users.csv', '\n'.join(rows).encode(), content_type='text/csv')}
+
+
+def _check_list_users(test, response, dataset):
+    body = response.json()
+    test.assertEqual(body['stats']['total'], querybudget.USER_COUNT)
+    test.assertEqual(len(body['users']), querybudget.USER_COUNT)
+
+
+def _check_created(test, response, dataset):
+    user = User.objects.get(id=response.json()['id'])
+    test.assertEqual(user.email, 'fresh@example.com')
+    test.assertTrue(user.has_module_permission('seats', 'view'))
+
+
+def _check_bulk_created(test, response, dataset):
+    test.assertEqual(response.json()['created'], BULK_USERS)
+    test.assertEqual(User.objects.filter(email__startswith='newstaff').count(), BULK_USERS)
+
+
+def _check_updated(test, response, dataset):
+    user = User.objects.get(id=dataset.user.id)
+    test.assertEqual((user.first_name, user.user_type), ('Staff Renamed', 'manager'))
+    test.assertTrue(user.has_module_permission('seats', 'edit'))
+    test.assertFalse(user.has_module_permission('badges', 'print'))
+
+
+class AccountEndpointBudgetTests(querybudget.QueryBudgetTestCase):
+    urlconf = 'accounts.urls'
+    baseline_path = Path(__file__).with_name('query_baseline.json')
+    endpoints = [
+        Endpoint('accounts:login_page', queries=0, p95_ms=50, anonymous=True,
+                 check=lambda t, r, d: t.assertTemplateUsed(r, 'login.html')),
+        Endpoint('accounts:login_view', queries=9, p95_ms=750, method='post', anonymous=True,
+                 body={'email': 'staff1@example.com', 'password': querybudget.PASSWORD}, runs=3,
+                 check=lambda t, r, d: t.assertEqual(r.json()['user']['email'], 'staff1@example.com')),
+        Endpoint('accounts:dashboard', queries=1, p95_ms=50,
+                 check=lambda t, r, d: t.assertTemplateUsed(r, 'dashboard.html')),
+        Endpoint('accounts:user_list', queries=1, p95_ms=50,
+                 skip='renders users/user_list.html, which does not exist'),
+        Endpoint('accounts:list_users', queries=3, p95_ms=50, data={'limit': 200}, check=_check_list_users),
+        Endpoint('accounts:create_user', queries=8, p95_ms=750, method='post', runs=3,
+                 body={'name': 'Fresh User', 'email': 'fresh@example.com', 'password': 'Str0ng!Pass',
+                       'role': 'staff', 'permissions': [{'module': 'seat', 'action': 'view'}]},
+                 check=_check_created),
+        Endpoint('accounts:bulk_create_users', queries=6, p95_ms=750 * BULK_USERS, method='post', data=_users_csv, runs=3,
+                 check=_check_bulk_created),
+        Endpoint('accounts:update_user', queries=19, p95_ms=50, method='post', args=lambda d: [d.user.id],
+                 body={'name': 'Staff Renamed', 'role': 'manager',
+                       'permissions': [{'module': 'seat', 'action': 'view'}, {'module': 'seat', 'action': 'edit'}]},
+                 check=_check_updated),
+        Endpoint('accounts:delete_user', queries=10, p95_ms=50, method='delete', args=lambda d: [d.user.id],
+                 check=lambda t, r, d: t.assertFalse(User.objects.filter(id=d.user.id).exists())),
+    ]
+
+
+class PermissionTests(TestCase):
+    def test_superuser_needs_no_permission_rows(self):
+        admin = User.objects.create_superuser('root@example.com', 'Str0ng!Pass')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('accounts:list_users'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(admin.has_module_permission('users', 'edit'))
+
+    def test_permission_edits_keep_the_mask_in_step(self):
+        user = User.objects.create(email='someone@example.com')
+        permission = UserPermission.objects.create(user=user, module='seat', action='view')
+        user.refresh_from_db()
+        self.assertTrue(user.has_module_permission('seats', 'view'))
+        permission.delete()
+        user.refresh_from_db()
+        self.assertEqual(user.permission_mask, 0)
+
+
+class ProvisioningTests(TestCase):
+    def test_existing_email_is_matched_in_any_case(self):
+        User.objects.create(email='Taken@Example.com')
+        rows, errors = provisioning.parse_rows('name,email,password,role\nSomeone,taken@example.com,Str0ng!Pass,staff\n')
+        self.assertEqual([e['error'] for e in errors], ['Email already exists'])
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_hashing_pool_is_started_once(self):
+        self.addCleanup(lambda: provisioning._pool and provisioning._drop_pool(provisioning._pool))
+        passwords = [f'Passw0rd-{n}' for n in range(provisioning.PARALLEL_HASH_THRESHOLD)]
+        with mock.patch.object(provisioning, 'ProcessPoolExecutor', wraps=provisioning.ProcessPoolExecutor) as pool:
+            hashes = provisioning.hash_passwords(passwords, workers=2) + provisioning.hash_passwords(passwords, workers=2)
+        pool.assert_called_once()
+        self.assertEqual(pool.call_args.kwargs['mp_context'].get_start_method(), 'spawn')
+        self.assertTrue(all(check_password(p, h) for p, h in zip(passwords * 2, hashes)))
+
+    @override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+    def test_hashing_stays_in_process_without_workers(self):
+        passwords = [f'Passw0rd-{n}' for n in range(provisioning.PARALLEL_HASH_THRESHOLD)]
+        with mock.patch.object(provisioning, 'ProcessPoolExecutor') as pool:
+            hashes = provisioning.hash_passwords(passwords)
+        pool.assert_not_called()
+        self.assertTrue(all(check_password(p, h) for p, h in zip(passwords, hashes)))
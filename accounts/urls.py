@@ -12,6 +12,7 @@ urlpatterns = [
 
     path('api/users/', views.list_users, name='list_users'),
     path('api/users/create/', views.create_user, name='create_user'),
+    path('api/users/bulk-create/', views.bulk_create_users, name='bulk_create_users'),
     path('api/users/<int:user_id>/update/', views.update_user, name='update_user'),
     path('api/users/<int:user_id>/delete/', views.delete_user, name='delete_user'),
 ]
\ No newline at end of file
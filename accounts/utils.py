@@ -1,22 +1,102 @@
-from accounts.models import UserPermission
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import reduce
+import operator
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+
+from accounts.models import User, UserPermission, mask_to_permissions, permissions_to_mask
+
+# Set while sync_user_permissions runs, so the per-row signal handlers
+# don't redo work the sync finishes in one step.
+permission_sync_active = ContextVar('permission_sync_active', default=False)
+
+
+def _get_version(key):
+    """
+    Read a cache version counter. A missing counter (first use or evicted)
+    starts from a fresh timestamp so old cache entries never match.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def _bump_version(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), timeout=None)
+
+
+def get_users_version():
+    """Version of the user table as a whole, for listing caches."""
+    return _get_version('accounts:users-version')
+
+
+def bump_users_version():
+    _bump_version('accounts:users-version')
 
 
 def get_permissions(user):
-    from collections import defaultdict
-    permissions = UserPermission.objects.filter(user=user).values('module', 'action')
+    """
+    Permissions of `user` as {'seats': [...], 'badges': [...], ...}.
+
+    Decoded from the user's permission_mask, which is loaded with the user
+    row, so checks cost no queries; the result is memoized on the user
+    object for the rest of the request.
+    """
+    memo = getattr(user, '_permissions_cache', None)
+    if memo is None:
+        memo = mask_to_permissions(getattr(user, 'permission_mask', 0))
+        user._permissions_cache = memo
+    return memo
+
+
+@contextmanager
+def _permission_sync():
+    token = permission_sync_active.set(True)
+    try:
+        yield
+    finally:
+        permission_sync_active.reset(token)
+
+
+def sync_user_permissions(user, pairs):
+    """
+    Make the user's UserPermission rows equal `pairs` ((module, action)).
 
-    # Transform into desired format
-    result = defaultdict(list)
-    for perm in permissions:
-        result[perm['module']].append(perm['action'])
+    Only the difference is written: one bulk_create for missing pairs and
+    one filtered DELETE for extra ones, inside a transaction, so concurrent
+    readers never see the user without permissions. Updates the user's
+    permission_mask and bumps the listing version.
+    Returns (added, removed) counts.
+    """
+    requested = {(module, action) for module, action in pairs}
+    with transaction.atomic(), _permission_sync():
+        existing = set(UserPermission.objects.filter(user=user).values_list('module', 'action'))
+        to_add = requested - existing
+        to_remove = existing - requested
 
+        if to_add:
+            UserPermission.objects.bulk_create(
+                [UserPermission(user=user, module=module, action=action) for module, action in to_add],
+                ignore_conflicts=True,
+            )
+        if to_remove:
+            UserPermission.objects.filter(user=user).filter(
+                reduce(operator.or_, (Q(module=module, action=action) for module, action in to_remove))
+            ).delete()
 
-    normalized = {
-        'seats': result.get('seat', []),
-        'badges': result.get('badge', []),
-        'users': result.get('user', []),
-        'alignment': result.get('align', []),
-    }
+        user.permission_mask = permissions_to_mask(requested)
+        User.objects.filter(pk=user.pk).update(permission_mask=user.permission_mask)
 
-    print('-----normalized-permission------', normalized)
-    return normalized
+    user.__dict__.pop('_permissions_cache', None)
+    if to_add or to_remove:
+        bump_users_version()
+    return len(to_add), len(to_remove)
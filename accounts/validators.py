@@ -0,0 +1,34 @@
+import re
+
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+
+
+def validate_name(name):
+    if not name or not name.strip():
+        return "Name is required."
+    if len(name) > 100:
+        return "Name cannot exceed 100 characters."
+    if not re.match(r'^[a-zA-Z\s]+$', name):
+        return "Name can only contain letters and spaces."
+    return None
+
+
+def validate_email_format(email):
+    if not email or not email.strip():
+        return "Email is required."
+    try:
+        validate_email(email)
+    except ValidationError:
+        return "Invalid email format."
+    return None
+
+
+def validate_password(password):
+    if not password:
+        return "Password is required."
+    if len(password) < 8:
+        return "Password must be at least 8 characters long."
+    if not re.match(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]+$', password):
+        return "Password must contain at least one uppercase letter, one lowercase letter, one digit, and one special character."
+    return None
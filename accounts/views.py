@@ -1,4 +1,3 @@
-import re
 from django.shortcuts import render
 from .models import User
 from django.http import JsonResponse
@@ -6,12 +5,18 @@ from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth import update_session_auth_hash
-from django.core.validators import validate_email
-from django.core.exceptions import ValidationError
-from .models import User, UserPermission
+from .models import User, MODULE_CODES, mask_to_permissions
 import json
+import math
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
 
-from .utils import get_permissions
+from .utils import get_permissions, get_users_version, sync_user_permissions
+from .validators import validate_name, validate_email_format, validate_password
+from .permissions import requires_permission
+from .provisioning import provision_users
+from .ratelimit import login_limiter
 
 def user_list(request):
     
@@ -56,14 +61,15 @@ def login_view(request):
         email = data.get('email')
         password = data.get('password')
 
+        # Throttle before authenticate(): hashing is the expensive part.
+        wait = login_limiter.check(request.META.get('REMOTE_ADDR'), email)
+        if wait:
+            response = JsonResponse({'success': False, 'error': 'Too many login attempts, try again shortly'}, status=429)
+            response['Retry-After'] = str(math.ceil(wait))
+            return response
 
-        print("Login attempt:", email, password)
-        
         user = authenticate(request, username=email, password=password)
 
-        print("Authenticated user:", user)
-
-
         if user is None:
             return JsonResponse({'success': False, 'error': 'Invalid credentials'}, status=401)
 
@@ -71,8 +77,13 @@ def login_view(request):
             return JsonResponse({'success': False, 'error': 'User is inactive'}, status=403)
 
         login(request, user)
+        login_limiter.succeeded(email)
 
-        perms = [{'module': p.module, 'action': p.action} for p in user.permissions.all()]
+        perms = [
+            {'module': MODULE_CODES.get(module, module), 'action': action}
+            for module, actions in get_permissions(user).items()
+            for action in actions
+        ]
 
         return JsonResponse({
             'success': True,
@@ -92,66 +103,71 @@ def login_view(request):
 
 
 # accounts/views.py
+@requires_permission('users.view')
 @login_required
 @require_http_methods(["GET"])
 def list_users(request):
-    users = User.objects.all().prefetch_related('permissions')
-    
-    total = users.count()
-    admins = users.filter(user_type='admin').count()
-    managers = users.filter(user_type='manager').count()
-    staff = users.filter(user_type='staff').count()
+    """
+    User stats plus one keyset page of users ordered by id.
+    Query params: limit (default 200), cursor (next_cursor of the previous page).
+    Responses are cached briefly and invalidated whenever a user or a
+    permission changes.
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 200)), 1), 500)
+        cursor = int(request.GET.get('cursor') or 0)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'limit and cursor must be integers'}, status=400)
+
+    cache_key = f'accounts:user-list:{get_users_version()}:{cursor}:{limit}'
+    payload = cache.get(cache_key)
+    if payload is None:
+        payload = _user_list_payload(cursor, limit)
+        cache.set(cache_key, payload, timeout=getattr(settings, 'USER_LIST_CACHE_TIMEOUT', 30))
+    return JsonResponse(payload)
+
+
+def _user_list_payload(cursor, limit):
+    stats = User.objects.aggregate(
+        total=Count('id'),
+        admins=Count('id', filter=Q(user_type='admin')),
+        managers=Count('id', filter=Q(user_type='manager')),
+        staff=Count('id', filter=Q(user_type='staff')),
+    )
+
+    rows = list(
+        User.objects.filter(id__gt=cursor).order_by('id')
+        .values('id', 'email', 'first_name', 'last_name', 'user_type', 'status', 'permission_mask')[:limit + 1]
+    )
+    next_cursor = rows[limit - 1]['id'] if len(rows) > limit else None
 
     user_list = []
-    for u in users:
-        full_name = f"{u.first_name} {u.last_name}".strip()
-        display_name = full_name if full_name else u.email.split('@')[0].replace('.', ' ').title()
-        
-        perms = {f"{p.module}_{p.action}": True for p in u.permissions.all()}
+    for u in rows[:limit]:
+        full_name = f"{u['first_name']} {u['last_name']}".strip()
+        display_name = full_name if full_name else u['email'].split('@')[0].replace('.', ' ').title()
+
+        perms = {
+            f"{MODULE_CODES.get(module, module)}_{action}": True
+            for module, actions in mask_to_permissions(u['permission_mask']).items()
+            for action in actions
+        }
         user_list.append({
-            'id': u.id,
-            'email': u.email,
+            'id': u['id'],
+            'email': u['email'],
             'name': display_name,
-            'role': u.user_type,
-            'status': 'active' if str(u.status).lower() in ['active', 'true', '1'] else 'inactive',
+            'role': u['user_type'],
+            'status': 'active' if str(u['status']).lower() in ['active', 'true', '1'] else 'inactive',
             'permissions': perms
         })
 
-    return JsonResponse({
-        'stats': {'total': total, 'admins': admins, 'managers': managers, 'staff': staff},
-        'users': user_list
-    })
-
-
-# Validation helper functions
-def validate_name(name):
-    if not name or not name.strip():
-        return "Name is required."
-    if len(name) > 100:
-        return "Name cannot exceed 100 characters."
-    if not re.match(r'^[a-zA-Z\s]+$', name):
-        return "Name can only contain letters and spaces."
-    return None
-
-def validate_email_format(email):
-    if not email or not email.strip():
-        return "Email is required."
-    try:
-        validate_email(email)
-    except ValidationError:
-        return "Invalid email format."
-    return None
-
-def validate_password(password):
-    if not password:
-        return "Password is required."
-    if len(password) < 8:
-        return "Password must be at least 8 characters long."
-    if not re.match(r'^(?=.*[a-z])(?=.*[A-Z])(?=.*\d)(?=.*[@$!%*?&])[A-Za-z\d@$!%*?&]+$', password):
-        return "Password must contain at least one uppercase letter, one lowercase letter, one digit, and one special character."
-    return None
+    return {
+        'stats': stats,
+        'users': user_list,
+        'next_cursor': next_cursor,
+    }
 
 
+@requires_permission('users.create')
 @csrf_exempt
 @login_required
 @require_http_methods(["POST"])
@@ -183,18 +199,14 @@ def create_user(request):
             status=data.get('status', 'active')
         )
         # Save permissions
-        for perm in data.get('permissions', []):
-            UserPermission.objects.create(
-                user=user,
-                module=perm['module'],
-                action=perm['action']
-            )
+        sync_user_permissions(user, [(perm['module'], perm['action']) for perm in data.get('permissions', [])])
         return JsonResponse({'success': True, 'id': user.id})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
 
+@requires_permission('users.edit')
 @csrf_exempt
 @login_required
 @require_http_methods(["POST"])
@@ -239,10 +251,8 @@ def update_user(request, user_id):
         user.save()
         update_session_auth_hash(request, user)
 
-        # Replace permissions
-        user.permissions.all().delete()
-        for perm in data.get('permissions', []):
-            UserPermission.objects.create(user=user, module=perm['module'], action=perm['action'])
+        # Replace permissions (diff only, in one transaction)
+        sync_user_permissions(user, [(perm['module'], perm['action']) for perm in data.get('permissions', [])])
 
         return JsonResponse({'success': True})
     except User.DoesNotExist:
@@ -251,16 +261,38 @@ def update_user(request, user_id):
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@requires_permission('users.create')
+@csrf_exempt
+@login_required
+@require_http_methods(["POST"])
+def bulk_create_users(request):
+    """
+    Provision many users from an uploaded CSV (multipart field "file").
+    Nothing is created unless every row is valid; pass dry_run=true to only validate.
+    """
+    csv_file = request.FILES.get('file')
+    if not csv_file:
+        return JsonResponse({'success': False, 'error': 'Missing file'}, status=400)
+    try:
+        text = csv_file.read().decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return JsonResponse({'success': False, 'error': 'File must be UTF-8 encoded CSV'}, status=400)
+
+    dry_run = request.POST.get('dry_run', 'false').lower() == 'true'
+    # Hashed in process: large files belong to the provision_users command.
+    result = provision_users(text, dry_run=dry_run)
+    return JsonResponse(result, status=200 if result['success'] else 400)
+
+
 def has_permission(user, module, action):
-    return user.permissions.filter(module=module, action=action).exists()
+    return user.has_module_permission(module, action)
 
 
+@requires_permission('users.delete')
 @csrf_exempt
 @login_required
 @require_http_methods(["DELETE"])
 def delete_user(request, user_id):
-    if not has_permission(request.user, 'users', 'delete'):
-        return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
     try:
         user = User.objects.get(id=user_id)
         user.delete()
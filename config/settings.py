@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -38,16 +39,22 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
 
+    "core",
     "accounts",
     "seatalignment",
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.JSONGZipMiddleware',
+    'core.middleware.ReplicaPinningMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'accounts.middleware.PermissionMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -75,13 +82,159 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-DATABASES = {
+# SQLite by default; SQLITE_PATH overrides the file. Set DB_ENGINE=postgres
+# (plus DB_NAME, DB_USER, DB_PASSWORD, DB_HOST, DB_PORT) for production.
+# DB_POOL=1 uses psycopg's connection pool; otherwise connections persist
+# for DB_CONN_MAX_AGE seconds.
+
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'seatmanagement'),
+            'USER': os.environ.get('DB_USER', 'seatmanagement'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            'CONN_HEALTH_CHECKS': True,
+        }
+    }
+    if os.environ.get('DB_POOL') == '1':
+        # Django's pool and persistent connections are mutually exclusive
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS'] = {
+            'pool': {
+                'min_size': int(os.environ.get('DB_POOL_MIN', 2)),
+                'max_size': int(os.environ.get('DB_POOL_MAX', 10)),
+            },
+        }
+    else:
+        DATABASES['default']['CONN_MAX_AGE'] = int(os.environ.get('DB_CONN_MAX_AGE', 60))
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('SQLITE_PATH', BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                # Take the write lock at BEGIN, so a read-then-write transaction
+                # waits on busy_timeout instead of failing mid-way.
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
+# Optional read replica for search, the seat table and history views (see
+# core.routers). DB_REPLICA_PATH points at a second SQLite file kept in step
+# by `manage.py sync_replica`; DB_REPLICA_HOST at a Postgres standby. Tests
+# run both aliases against the same test database.
+
+if os.environ.get('DB_REPLICA_HOST') and DB_ENGINE == 'postgres':
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.environ['DB_REPLICA_HOST'],
+        'TEST': {'MIRROR': 'default'},
+    }
+elif os.environ.get('DB_REPLICA_PATH') and DB_ENGINE != 'postgres':
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': os.environ['DB_REPLICA_PATH'],
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+# Seconds a client keeps reading from the primary after one of its own writes
+REPLICA_STICKY_SECONDS = 5
+
+# Applied to every new SQLite connection by core.db.apply_sqlite_pragmas
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -20000,  # KiB, i.e. about 20 MB
+    'temp_store': 'MEMORY',
+}
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Point 'default' at a shared backend (Redis/Memcached) when running several
+# worker processes, so permission invalidation reaches all of them.
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'seatmanagement',
     }
 }
 
+# Sessions are read on every request; keep them in the cache, written through to the DB
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Login throttling per worker: (burst capacity, tokens refilled per second).
+# The per-IP bucket is generous because venue staff share one NAT address.
+LOGIN_RATE_LIMITS = {
+    'ip': (60, 1.0),
+    'email': (5, 5 / 60),
+}
+
+# Serve the kiosk endpoints (search, print, badge template, upload status)
+# from seatalignment.async_views. config.asgi turns this on.
+ASYNC_KIOSK_VIEWS = os.environ.get('ASYNC_KIOSK_VIEWS') == '1'
+
+# Queue badge pre-rendering (seatalignment.prerender) on seat and template
+# changes. Queueing runs in the web request, so only turn this on where a
+# Celery broker is running; otherwise badges are drawn on first print.
+PRERENDER_BADGES = os.environ.get('PRERENDER_BADGES') == '1'
+
+# Live seat feed. The in-memory backend only reaches clients connected to
+# the same process; multi-worker deployments need a shared backend.
+PUBSUB_BACKEND = 'core.pubsub.InMemoryPubSub'
+SEAT_FEED_HEARTBEAT = 15
+SEAT_FEED_RETRY_MS = 3000
+
+# Request metrics (/metrics) and request logging. Every request is counted;
+# only a sample is logged, plus every slow or 5xx one.
+# /metrics is closed unless one of these is set. A scraper sends
+# METRICS_TOKEN as "Authorization: Bearer <token>". METRICS_ALLOWED_IPS
+# admits by REMOTE_ADDR: only use it when scrapers reach the app directly.
+# Behind a reverse proxy on the same host every request comes from the
+# proxy's address (often 127.0.0.1), so listing that would open /metrics to
+# everyone; use the token there.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+METRICS_ALLOWED_IPS = [ip for ip in os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if ip]
+METRICS_LOG_SAMPLE_RATE = float(os.environ.get('METRICS_LOG_SAMPLE_RATE', '0.01'))
+METRICS_SLOW_REQUEST_SECONDS = 1.0
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'logfmt': {
+            'format': 'ts=%(asctime)s level=%(levelname)s logger=%(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'logfmt',
+        },
+    },
+    'loggers': {
+        'core.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('REQUEST_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Seconds a user-management listing page stays cached; user changes invalidate sooner
+USER_LIST_CACHE_TIMEOUT = 30
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -119,9 +272,23 @@ USE_TZ = True
 
 
 STATIC_URL = '/static/'
-STATIC_ROOT = '/var/www/invitationapp/static/'
+STATIC_ROOT = os.environ.get('STATIC_ROOT', '/var/www/invitationapp/static/')
+STATICFILES_DIRS = [BASE_DIR / 'static']
 MEDIA_URL = '/media/'
-MEDIA_ROOT = '/var/www/invitationapp/media/'
+MEDIA_ROOT = os.environ.get('MEDIA_ROOT', '/var/www/invitationapp/media/')
+
+# collectstatic writes content-hashed names plus .gz/.br copies (core.staticfiles).
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'core.staticfiles.CompressedManifestStaticFilesStorage'},
+}
+
+# Serve STATIC_ROOT from the app, hashed files with far-future cache headers.
+# Turn off where the front-end server maps STATIC_URL itself.
+SERVE_STATIC = os.environ.get('SERVE_STATIC', '1') == '1'
+
+# JSON responses at least this large are gzipped (core.middleware.JSONGZipMiddleware).
+GZIP_JSON_MIN_BYTES = 1024
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -133,3 +300,9 @@ AUTH_USER_MODEL = 'accounts.User'
 LOGIN_URL = '/login/'
 
 LOGOUT_REDIRECT_URL = '/login/'
+
+# Where archive_event writes compressed fixtures of finished events
+EVENT_ARCHIVE_ROOT = BASE_DIR / 'archive'
+
+# Inclusive SEAT-<n> range the free-seat allocator assigns from
+SEAT_NUMBER_RANGE = (1, 5000)
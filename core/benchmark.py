@@ -0,0 +1,128 @@
+"""Helpers shared by the bench_* and load-test management commands."""
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Create a throwaway test database for the duration of the block.
+
+    SQLite gets a file-backed database rather than the usual in-memory one:
+    the shared-cache memory database takes table locks that fail concurrent
+    requests outright, which is not what production sees.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(tmp, 'bench.sqlite3')
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0
+    return sorted_values[max(0, int(len(sorted_values) * pct / 100) - 1)]
+
+
+# One server process each, started with `python -m`.
+SERVER_COMMANDS = {
+    'wsgi': 'gunicorn config.wsgi:application --worker-class gthread --workers {workers} --threads {threads} '
+            '--bind 127.0.0.1:{port} --log-level warning',
+    'asgi': 'uvicorn config.asgi:application --workers {workers} --host 127.0.0.1 --port {port} '
+            '--no-access-log --log-level warning',
+}
+
+
+def login_session(user):
+    """
+    Session key of a real login for `user`, written straight to the database
+    so server subprocesses reading it treat the client as logged in.
+    """
+    session = SessionStore()
+    session['_auth_user_id'] = str(user.pk)
+    session['_auth_user_backend'] = 'django.contrib.auth.backends.ModelBackend'
+    session['_auth_user_hash'] = user.get_session_auth_hash()
+    session.create()
+    return session.session_key
+
+
+def server_env():
+    """Environment that points a server subprocess at the current (test) database."""
+    name = str(connection.settings_dict['NAME'])
+    if connection.vendor == 'sqlite':
+        return {**os.environ, 'SQLITE_PATH': name}
+    return {**os.environ, 'DB_NAME': name}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class Server:
+    """Run a server command (a python -m module line) as a subprocess until the block exits."""
+
+    def __init__(self, command, port, env):
+        self.args = command.split()
+        self.port = port
+        self.env = env
+        self.process = None
+
+    def __enter__(self):
+        executable = self.args[0]
+        try:
+            self.process = subprocess.Popen(
+                [sys.executable, '-m', *self.args],
+                cwd=settings.BASE_DIR, env=self.env,
+            )
+        except OSError as e:
+            raise CommandError(f'Could not start {executable}: {e}')
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError(f'{executable} exited; is it installed?')
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.2).close()
+                return self.port
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__()
+        raise CommandError(f'{executable} did not start listening')
+
+    def __exit__(self, *exc):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+async def http_request(reader, writer, method, path, headers=(), body=b''):
+    """
+    One HTTP/1.1 request on a keep-alive connection; returns (status, body).
+    A bare-bones client keeps the load generator cheap next to the server.
+    """
+    lines = [f'{method} {path} HTTP/1.1', 'Host: 127.0.0.1', f'Content-Length: {len(body)}', *headers]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    response_lines = head.decode('latin-1').split('\r\n')
+    status = int(response_lines[0].split()[1])
+    length = 0
+    for line in response_lines[1:]:
+        if line.lower().startswith('content-length:'):
+            length = int(line.split(':', 1)[1])
+    return status, await reader.readexactly(length)
@@ -0,0 +1,22 @@
+"""
+Per-connection database tuning.
+
+SQLite ships with rollback journaling and no busy timeout, so a kiosk
+marking a badge printed while a CSV import is writing fails straight
+away with "database is locked". The pragmas in settings.SQLITE_PRAGMAS are
+applied to every new connection: WAL lets readers run alongside the single
+writer, and busy_timeout makes writers queue instead of erroring.
+"""
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """connection_created receiver; a no-op for other database vendors."""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
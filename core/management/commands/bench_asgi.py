@@ -0,0 +1,103 @@
+import asyncio
+import secrets
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from accounts.models import User
+from accounts.utils import sync_user_permissions
+from core.benchmark import (
+    SERVER_COMMANDS, Server, benchmark_database, free_port, http_request, login_session, percentile, server_env,
+)
+from seatalignment.models import BadgeTemplate, Event, Seat
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare concurrent request capacity of one server process: gunicorn (WSGI, '
+        'sync views) against uvicorn (ASGI, async kiosk views), on a kiosk request mix.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, nargs='+', default=[8, 32, 128])
+        parser.add_argument('--seconds', type=float, default=5, help='Duration of each level.')
+        parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per process.')
+        parser.add_argument('--seats', type=int, default=2000)
+        parser.add_argument('--servers', nargs='+', choices=sorted(SERVER_COMMANDS),
+                            default=sorted(SERVER_COMMANDS, reverse=True))
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('bench_asgi prepares a throwaway SQLite database; run it with the default engine.')
+        with benchmark_database():
+            session, seat_ids = self.seed(options['seats'])
+            env = {**server_env(), 'REQUEST_LOG_LEVEL': 'WARNING'}
+            for name in options['servers']:
+                self.stdout.write(self.style.MIGRATE_HEADING(f'{name}: {SERVER_COMMANDS[name].split()[0]}'))
+                with self.server(name, options['threads'], env) as port:
+                    for level in options['concurrency']:
+                        stats = asyncio.run(load(port, session, seat_ids, level, options['seconds']))
+                        self.report(level, stats)
+
+    def seed(self, count):
+        event = Event.default()
+        Seat.objects.bulk_create(
+            [Seat(event=event, seat_no=f'SEAT-{n}', seat_number=n, name=f'Guest {n}', email=f'guest{n}@example.com',
+                  company=f'Company {n % 50}') for n in range(1, count + 1)],
+            batch_size=500,
+        )
+        BadgeTemplate.objects.create(event=event)
+        user = User.objects.create_user(email='kiosk@example.com', password=secrets.token_urlsafe(), user_type='staff')
+        sync_user_permissions(user, [('badge', 'view'), ('badge', 'print'), ('seat', 'view'), ('align', 'view')])
+        user.refresh_from_db()
+
+        return login_session(user), list(Seat.objects.values_list('id', flat=True))
+
+    def server(self, name, threads, env):
+        port = free_port()
+        return Server(SERVER_COMMANDS[name].format(port=port, workers=1, threads=threads), port, env)
+
+    def report(self, level, stats):
+        latencies = sorted(stats['latencies'])
+        self.stdout.write(
+            f'  {level:>4} concurrent  {len(latencies) / stats["elapsed"]:8.1f} req/s   '
+            f'p50 {percentile(latencies, 50) * 1000:7.1f} ms   p99 {percentile(latencies, 99) * 1000:7.1f} ms   '
+            f'errors {stats["errors"]}'
+        )
+
+
+async def load(port, session, seat_ids, concurrency, seconds):
+    """Keep-alive clients looping over the kiosk mix: search, template, print."""
+    csrf = secrets.token_hex(16)
+    headers = (f'Cookie: sessionid={session}; csrftoken={csrf}', f'X-CSRFToken: {csrf}')
+    deadline = time.monotonic() + seconds
+    stats = {'latencies': [], 'errors': 0}
+
+    async def client(number):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        step = number
+        try:
+            while time.monotonic() < deadline:
+                step += 1
+                if step % 3 == 0:
+                    method, path = 'GET', f'/manage-seat/api/search/?q=Guest+{step % 500}'
+                elif step % 3 == 1:
+                    method, path = 'GET', '/manage-seat/api/get-badge-template/'
+                else:
+                    method, path = 'POST', f'/manage-seat/print/{seat_ids[step % len(seat_ids)]}/'
+                started = time.perf_counter()
+                status, _ = await http_request(reader, writer, method, path, headers)
+                if status == 200:
+                    stats['latencies'].append(time.perf_counter() - started)
+                else:
+                    stats['errors'] += 1
+        except (ConnectionError, asyncio.IncompleteReadError):
+            stats['errors'] += 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n) for n in range(concurrency)))
+    stats['elapsed'] = time.perf_counter() - started
+    return stats
@@ -0,0 +1,115 @@
+import random
+import threading
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from django.test import override_settings
+
+from core.benchmark import benchmark_database, percentile
+from seatalignment.models import Event, Seat
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark database write concurrency under mixed load: kiosks marking '
+        'badges printed, a CSV-style bulk import and list readers, all at once.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seats', type=int, default=2000)
+        parser.add_argument('--kiosks', type=int, default=6, help='Threads updating print status.')
+        parser.add_argument('--readers', type=int, default=2)
+        parser.add_argument('--import-batch', type=int, default=200)
+        parser.add_argument('--seconds', type=float, default=5)
+        parser.add_argument('--untuned', action='store_true',
+                            help='Skip SQLITE_PRAGMAS and use deferred transactions, for comparison.')
+
+    def handle(self, *args, **options):
+        overrides = {}
+        if options['untuned']:
+            overrides['SQLITE_PRAGMAS'] = {}
+            connections.settings['default'].get('OPTIONS', {}).pop('transaction_mode', None)
+
+        self.stdout.write(f'database: {connection.vendor}, {"untuned" if options["untuned"] else "tuned"}')
+        with override_settings(**overrides), benchmark_database():
+            if connection.vendor == 'sqlite':
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.stdout.write(f'journal_mode: {cursor.fetchone()[0]}')
+            self.run_benchmark(options)
+
+    def run_benchmark(self, options):
+        event = Event.default()
+        Seat.objects.bulk_create(
+            [Seat(event=event, seat_no=f'SEAT-{n}', seat_number=n, name=f'Guest {n}', email=f'guest{n}@example.com')
+             for n in range(1, options['seats'] + 1)],
+            batch_size=500,
+        )
+        ids = list(Seat.objects.values_list('id', flat=True))
+        deadline = time.monotonic() + options['seconds']
+        next_seat = [options['seats'] + 1]
+        lock = threading.Lock()
+        latencies = {'print': [], 'import': [], 'read': []}
+        outcomes = Counter()
+
+        def timed(kind, operation):
+            started = time.perf_counter()
+            try:
+                operation()
+            except OperationalError as e:
+                outcomes[f'{kind} error: {e}'] += 1
+                return
+            with lock:
+                latencies[kind].append(time.perf_counter() - started)
+
+        def mark_printed():
+            with transaction.atomic():
+                seat = Seat.objects.get(pk=random.choice(ids))
+                seat.print_status = random.choice(Seat.PrintStatus.values)
+                seat.save(update_fields=['print_status', 'updated_at'])
+
+        def import_batch():
+            with lock:
+                first = next_seat[0]
+                next_seat[0] += options['import_batch']
+            with transaction.atomic():
+                Seat.objects.bulk_create([
+                    Seat(event=event, seat_no=f'SEAT-{n}', seat_number=n, name=f'Import {n}', email=f'import{n}@example.com')
+                    for n in range(first, first + options['import_batch'])
+                ])
+
+        def read_page():
+            list(Seat.objects.filter(event=event, print_status=Seat.PrintStatus.NOT_PRINTED)[:50])
+
+        def worker(kind, operation):
+            try:
+                while time.monotonic() < deadline:
+                    timed(kind, operation)
+            finally:
+                connection.close()
+
+        threads = (
+            [threading.Thread(target=worker, args=('print', mark_printed)) for _ in range(options['kiosks'])]
+            + [threading.Thread(target=worker, args=('import', import_batch))]
+            + [threading.Thread(target=worker, args=('read', read_page)) for _ in range(options['readers'])]
+        )
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        for kind, values in latencies.items():
+            values.sort()
+            self.stdout.write(
+                f'{kind:<7} {len(values) / elapsed:8.1f} ops/s   '
+                f'p50 {percentile(values, 50) * 1000:7.1f} ms   p99 {percentile(values, 99) * 1000:7.1f} ms'
+            )
+        if outcomes:
+            for message, count in outcomes.most_common():
+                self.stdout.write(self.style.WARNING(f'{count:>6}  {message}'))
+        else:
+            self.stdout.write(self.style.SUCCESS('no lock errors'))
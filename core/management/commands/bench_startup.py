@@ -0,0 +1,61 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Modules that should only load when a request actually needs them.
+HEAVY_MODULES = ('openpyxl',)
+
+# Run in a fresh interpreter: load the WSGI application the way a web worker
+# does, then resolve the urlconf, which imports every view module just as
+# the first request would.
+WORKER_STARTUP = '''
+import importlib, json, sys, time
+started = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+import config.wsgi
+from django.urls import get_resolver
+get_resolver().url_patterns
+elapsed = time.perf_counter() - started
+from core.taskmetrics import current_rss
+print(json.dumps({'seconds': elapsed, 'rss': current_rss(),
+                  'loaded': [m for m in %r if m in sys.modules]}))
+''' % (HEAVY_MODULES,)
+
+
+class Command(BaseCommand):
+    help = (
+        'Measure web worker start-up: import time and resident memory after loading '
+        'the WSGI application and every view. By default also measures with openpyxl '
+        'imported up front, as the seat views used to, for comparison.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help='Fresh interpreters per variant.')
+        parser.add_argument('--preload', nargs='*', default=['openpyxl'],
+                            help='Modules imported first for the comparison run; none to skip it.')
+
+    def handle(self, *args, **options):
+        variants = [('lazy imports', [])]
+        if options['preload']:
+            variants.append((f'preloading {", ".join(options["preload"])}', options['preload']))
+        for label, preload in variants:
+            samples = [self.start_worker(preload) for _ in range(options['runs'])]
+            seconds = statistics.median(s['seconds'] for s in samples) * 1000
+            rss = [s['rss'] for s in samples if s['rss'] is not None]
+            memory = f'{statistics.median(rss) / 2**20:7.1f} MB RSS' if rss else '    RSS n/a'
+            loaded = ', '.join(samples[-1]['loaded']) or 'none'
+            self.stdout.write(f'  {label:<32} {seconds:8.1f} ms   {memory}   heavy modules loaded: {loaded}')
+
+    def start_worker(self, preload):
+        result = subprocess.run(
+            [sys.executable, '-c', WORKER_STARTUP, *preload],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(f'Worker start-up failed:\n{result.stderr}')
+        return json.loads(result.stdout.strip().splitlines()[-1])
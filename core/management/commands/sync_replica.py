@@ -0,0 +1,45 @@
+import sqlite3
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core.routers import REPLICA_DB_ALIAS, replica_available
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy the SQLite primary into the SQLite replica file (DB_REPLICA_PATH). '
+        'Stands in for streaming replication when trying the replica router locally.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0,
+                            help='Keep syncing every N seconds instead of once.')
+
+    def handle(self, *args, **options):
+        if not replica_available():
+            raise CommandError('No replica database configured; set DB_REPLICA_PATH.')
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict
+        replica = connections[REPLICA_DB_ALIAS].settings_dict
+        if primary['ENGINE'] != replica['ENGINE'] or connections[REPLICA_DB_ALIAS].vendor != 'sqlite':
+            raise CommandError('sync_replica only copies SQLite files; use real replication for Postgres.')
+
+        while True:
+            started = time.perf_counter()
+            self.copy(primary['NAME'], replica['NAME'])
+            self.stdout.write(f'Synced replica in {(time.perf_counter() - started) * 1000:.0f} ms')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, source_path, target_path):
+        # The online backup API takes a consistent snapshot even while the
+        # primary is being written to.
+        source = sqlite3.connect(source_path)
+        target = sqlite3.connect(target_path)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
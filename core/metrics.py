@@ -0,0 +1,174 @@
+"""
+In-process request metrics.
+
+MetricsMiddleware times every request and records, per route pattern and
+method: a latency histogram, a DB query-count histogram, DB time, response
+bytes and a request counter by status. Queries are counted by an execute
+wrapper installed on every database connection (see CoreConfig.ready),
+which adds to the RequestStats of the request in progress through a
+ContextVar. That also reaches async views, because sync_to_async copies the
+context into its worker thread.
+
+Each process keeps its own registry, so a multi-worker deployment exposes
+one set of series per worker at /metrics.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+logger = logging.getLogger('core.requests')
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class RequestStats:
+    __slots__ = ('queries', 'db_time')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+
+
+current_stats = ContextVar('current_stats', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """Connection execute wrapper: charge the query to the current request."""
+    stats = current_stats.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - start
+
+
+def install_query_counter(sender, connection, **kwargs):
+    """connection_created receiver; a connection object may reconnect many times."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """(le, count) pairs ending with +Inf, as Prometheus expects."""
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class RouteMetrics:
+    __slots__ = ('latency', 'queries', 'db_time', 'response_bytes', 'statuses')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_time = 0.0
+        self.response_bytes = 0
+        self.statuses = {}
+
+
+class MetricsRegistry:
+    """Aggregates per (route, method); one short lock hold per request."""
+
+    def __init__(self):
+        self._routes = {}
+        self._lock = threading.Lock()
+        self._collectors = []
+
+    def register_collector(self, collector):
+        """
+        Add a callable returning extra exposition lines, called on every
+        render; for series that live outside this process, such as task runs
+        recorded in the database.
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def observe(self, route, method, status, duration, stats, size):
+        with self._lock:
+            metrics = self._routes.get((route, method))
+            if metrics is None:
+                metrics = self._routes[(route, method)] = RouteMetrics()
+            metrics.latency.observe(duration)
+            metrics.queries.observe(stats.queries)
+            metrics.db_time += stats.db_time
+            if size is not None:
+                metrics.response_bytes += size
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._routes = {}
+
+    def render(self):
+        """The registry in the Prometheus text exposition format."""
+        with self._lock:
+            routes = sorted(self._routes.items())
+            lines = []
+
+            lines += ['# HELP http_requests_total Requests by route, method and status.',
+                      '# TYPE http_requests_total counter']
+            for (route, method), m in routes:
+                for status, count in sorted(m.statuses.items()):
+                    lines.append(f'http_requests_total{_labels(route, method, status=status)} {count}')
+
+            _render_histogram(lines, 'http_request_duration_seconds', 'Request latency in seconds.',
+                              [(key, m.latency) for key, m in routes])
+            _render_histogram(lines, 'http_request_db_queries', 'Database queries per request.',
+                              [(key, m.queries) for key, m in routes])
+
+            lines += ['# HELP http_request_db_seconds_total Time spent in database queries.',
+                      '# TYPE http_request_db_seconds_total counter']
+            for (route, method), m in routes:
+                lines.append(f'http_request_db_seconds_total{_labels(route, method)} {m.db_time:.6f}')
+
+            lines += ['# HELP http_response_bytes_total Response body bytes, excluding streams.',
+                      '# TYPE http_response_bytes_total counter']
+            for (route, method), m in routes:
+                lines.append(f'http_response_bytes_total{_labels(route, method)} {m.response_bytes}')
+        for collector in self._collectors:
+            lines += collector()
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(route, method, **extra):
+    pairs = [('route', route), ('method', method), *extra.items()]
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _render_histogram(lines, name, help_text, series):
+    lines += [f'# HELP {name} {help_text}', f'# TYPE {name} histogram']
+    for (route, method), histogram in series:
+        for bound, count in histogram.cumulative():
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{name}_bucket{_labels(route, method, le=le)} {count}')
+        lines.append(f'{name}_sum{_labels(route, method)} {histogram.sum:.6f}')
+        lines.append(f'{name}_count{_labels(route, method)} {histogram.count}')
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,156 @@
+import random
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.middleware.gzip import GZipMiddleware
+
+from .metrics import UNMATCHED_ROUTE, RequestStats, current_stats, logger, registry
+from .routers import primary_pinned, replica_available
+from .staticfiles import StaticFilesIndex
+
+PIN_COOKIE = 'pin_primary'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+
+class ReplicaPinningMiddleware:
+    """
+    Read-your-writes for the replica router: after a successful write the
+    client is sent to the primary until the pin cookie expires.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = primary_pinned.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+        return self.pin(request, response)
+
+    async def __acall__(self, request):
+        token = primary_pinned.set(PIN_COOKIE in request.COOKIES)
+        try:
+            response = await self.get_response(request)
+        finally:
+            primary_pinned.reset(token)
+        return self.pin(request, response)
+
+    def pin(self, request, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400 and replica_available():
+            response.set_cookie(
+                PIN_COOKIE, '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class MetricsMiddleware:
+    """
+    Record latency, query count/time, status and size for every request,
+    and log a sample of requests (plus every slow or failed one) as
+    key=value pairs. Goes first so the timing covers all other middleware.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = current_stats.set(stats)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_stats.reset(token)
+        self.record(request, response, time.perf_counter() - start, stats)
+        return response
+
+    def record(self, request, response, duration, stats):
+        match = request.resolver_match
+        # The route pattern, not the path, keeps label cardinality bounded.
+        route = '/' + match.route if match else UNMATCHED_ROUTE
+        size = None if response.streaming else len(response.content)
+        registry.observe(route, request.method, response.status_code, duration, stats, size)
+
+        if (duration >= settings.METRICS_SLOW_REQUEST_SECONDS or response.status_code >= 500
+                or random.random() < settings.METRICS_LOG_SAMPLE_RATE):
+            # Only a user that was already loaded; never query just to log.
+            user = getattr(request, '_cached_user', None) or getattr(request, '_acached_user', None)
+            logger.info(
+                'method=%s route=%s status=%s duration_ms=%.1f queries=%d db_ms=%.1f bytes=%s user=%s',
+                request.method, route, response.status_code, duration * 1000,
+                stats.queries, stats.db_time * 1000, '-' if size is None else size,
+                user.pk if user is not None and user.is_authenticated else '-',
+            )
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files (see core.staticfiles) before sessions,
+    auth or the database are touched. Turned off with SERVE_STATIC = False
+    where a front-end server maps STATIC_URL to STATIC_ROOT itself.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.SERVE_STATIC:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.index = StaticFilesIndex(settings.STATIC_ROOT, settings.STATIC_URL)
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.index.response(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.index.response(request) or await self.get_response(request)
+
+
+class JSONGZipMiddleware(GZipMiddleware):
+    """
+    GZip JSON responses of at least GZIP_JSON_MIN_BYTES. HTML pages are left
+    alone: they carry CSRF tokens, which compression exposes to BREACH, and
+    their scripts and styles are served precompressed anyway.
+    """
+
+    def process_response(self, request, response):
+        if (response.streaming or not response.get('Content-Type', '').startswith('application/json')
+                or len(response.content) < settings.GZIP_JSON_MIN_BYTES):
+            return response
+        return super().process_response(request, response)
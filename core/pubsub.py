@@ -0,0 +1,103 @@
+"""
+Publish/subscribe for pushing live updates to browsers.
+
+Publishers are ordinary sync code (views, the history layer); subscribers
+are async streaming views on the ASGI app. settings.PUBSUB_BACKEND picks
+the implementation. InMemoryPubSub only reaches subscribers in the same
+process, which is enough for a single uvicorn worker; several workers or
+Celery-side publishers need a backend on a shared broker with the same
+publish/subscribe interface.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Sent in place of a backlog the subscriber could not keep up with.
+RESYNC = {'type': 'reload'}
+
+
+class Subscription:
+    """One subscriber's bounded queue, bound to the event loop that created it."""
+
+    def __init__(self, backend, channel, maxsize):
+        self.backend = backend
+        self.channel = channel
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def deliver(self, message):
+        # Runs on self.loop. A full queue means the client has fallen behind:
+        # drop the backlog and tell it to resync instead.
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout=None):
+        """Next message; raises TimeoutError after `timeout` seconds."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        self.backend.unsubscribe(self)
+
+
+class BasePubSub:
+    def publish(self, channel, message):
+        """Send a JSON-serializable message to every subscriber of `channel`."""
+        raise NotImplementedError
+
+    def subscribe(self, channel):
+        """Return a Subscription; call from the subscriber's event loop."""
+        raise NotImplementedError
+
+    def unsubscribe(self, subscription):
+        raise NotImplementedError
+
+
+class InMemoryPubSub(BasePubSub):
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._channels = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's loop has closed; it is going away anyway.
+                self.unsubscribe(subscription)
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel, self.maxsize)
+        with self._lock:
+            self._channels[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_pubsub():
+    """The process-wide backend named by settings.PUBSUB_BACKEND."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = import_string(settings.PUBSUB_BACKEND)()
+        return _backend
@@ -0,0 +1,278 @@
+"""
+Query-count and latency budgets for URL endpoints.
+
+An app's tests subclass QueryBudgetTestCase and declare one Endpoint per
+URL name in its urlconf: how to call it, the most queries one request may
+run, a p95 latency target and a check of what the response holds, so a
+cheap endpoint cannot pass by returning the wrong thing. The test case
+seeds a realistic dataset once (10k seats, 200 users), calls each
+endpoint a few times with the test client inside a rolled-back
+savepoint, and fails when a budget is exceeded or a check fails.
+
+The normalized SQL of every endpoint is kept in the app's
+query_baseline.json, so an over-budget failure shows a unified diff of
+what changed, which makes a new per-row query easy to spot. Rewrite the
+baselines after an intended change with:
+
+    QUERY_BUDGET_UPDATE=1 python manage.py test
+
+QUERY_BUDGET_LATENCY_FACTOR scales every latency target for slow
+machines; 0 turns the latency checks off.
+"""
+import difflib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from contextlib import ExitStack
+from pathlib import Path
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import get_resolver, reverse
+
+from accounts.models import MODULE_ALIASES, User, UserPermission, permissions_to_mask
+from seatalignment.models import BadgeTemplate, Event, Seat, SeatCSVUpload, SeatHistory
+from seatalignment import history
+from .benchmark import percentile
+
+SEAT_COUNT = 10_000
+USER_COUNT = 200
+PASSWORD = 'Budget-Passw0rd!'
+
+ALL_PERMISSIONS = [(module, action) for module in MODULE_ALIASES for action in UserPermission.Action.values]
+
+UPDATE_BASELINE = os.environ.get('QUERY_BUDGET_UPDATE') == '1'
+LATENCY_FACTOR = float(os.environ.get('QUERY_BUDGET_LATENCY_FACTOR', '1'))
+
+
+class Dataset:
+    """Handles on the seeded rows that endpoint definitions refer to."""
+
+    def __init__(self, event, admin, users, seats, upload):
+        self.event = event
+        self.admin = admin
+        self.users = users
+        self.seats = seats
+        self.upload = upload
+
+    @property
+    def seat(self):
+        return self.seats[0]
+
+    @property
+    def user(self):
+        return self.users[0]
+
+
+def seed_dataset(seat_count=SEAT_COUNT, user_count=USER_COUNT):
+    """Bulk-insert one event's worth of seats, history and staff accounts."""
+    event = Event.default() or Event.objects.create(name='Budget event', slug='budget')
+    genders = Seat.Gender.values
+    # Every sixth seat number stays free, so allocation has gaps to fill.
+    numbers = [n for n in range(1, seat_count * 6 // 5 + 2) if n % 6][:seat_count]
+    Seat.objects.bulk_create(
+        [Seat(event=event, seat_no=f'SEAT-{n}', seat_number=n, name=f'Attendee {n}',
+              email=f'attendee{n}@example.com', company=f'Company {n % 200}', phone=f'+1555{n:07d}', gender=genders[n % len(genders)],
+              print_status=Seat.PrintStatus.PRINTED if n % 3 == 0 else Seat.PrintStatus.NOT_PRINTED)
+         for n in numbers],
+        batch_size=2000,
+    )
+    seats = list(Seat.objects.filter(event=event).order_by('seat_number')[:50])
+
+    changes = history.HistoryBuffer(event, source=SeatHistory.Source.IMPORT)
+    for seat in seats:
+        changes.add_create(seat.id, history.snapshot(seat))
+        changes.add(seat.id, seat.seat_no, SeatHistory.Action.UPDATE, {'company': ['', seat.company]})
+    changes.flush()
+
+    # One hash shared by every account: the budgets are about queries, not PBKDF2.
+    password = make_password(PASSWORD)
+    admin = User.objects.create(email='budget-admin@example.com', password=password, user_type='admin',
+                                is_staff=True, permission_mask=permissions_to_mask(ALL_PERMISSIONS))
+    UserPermission.objects.bulk_create(
+        [UserPermission(user=admin, module=module, action=action) for module, action in ALL_PERMISSIONS]
+    )
+    staff_permissions = [('seat', 'view'), ('badge', 'view'), ('badge', 'print')]
+    users = User.objects.bulk_create(
+        [User(email=f'staff{n}@example.com', password=password, first_name=f'Staff {n}', user_type='staff',
+              permission_mask=permissions_to_mask(staff_permissions))
+         for n in range(1, user_count)]
+    )
+    UserPermission.objects.bulk_create(
+        [UserPermission(user=user, module=module, action=action)
+         for user in users for module, action in staff_permissions]
+    )
+
+    BadgeTemplate.objects.create(event=event, name='Default', created_by=admin)
+    upload = SeatCSVUpload.objects.create(event=event, file='uploads/seed.csv', status='completed', processed=True)
+    return Dataset(event, admin, users, seats, upload)
+
+
+class Endpoint:
+    """
+    One URL name to exercise. `args`, `data` and `body` may be callables
+    taking the Dataset; `body` is sent as JSON, `data` as form data.
+    `check(test, response, dataset)` asserts on each response's content; it
+    runs before the request's writes are rolled back, so it may also look
+    at the database. `skip` gives the reason a declared endpoint cannot be
+    exercised yet.
+    """
+
+    def __init__(self, name, queries, p95_ms, method='get', args=None, data=None, body=None,
+                 status=200, check=None, anonymous=False, runs=5, skip=None):
+        self.name = name
+        self.queries = queries
+        self.p95_ms = p95_ms
+        self.method = method
+        self.args = args
+        self.data = data
+        self.body = body
+        self.status = status
+        self.check = check
+        self.anonymous = anonymous
+        self.runs = runs
+        self.skip = skip
+
+    def request(self, client, dataset):
+        resolve = lambda value: value(dataset) if callable(value) else value
+        url = reverse(self.name, args=resolve(self.args) or ())
+        call = getattr(client, self.method)
+        if self.body is not None:
+            return call(url, json.dumps(resolve(self.body)), content_type='application/json')
+        data = resolve(self.data)
+        return call(url, data) if data is not None else call(url)
+
+
+_LITERALS = [
+    (re.compile(r'"s\d+_x\d+"'), '"<savepoint>"'),
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?(?:[eE][-+]?\d+)?\b'), '?'),
+    (re.compile(r'\((?:\s*\?\s*,)+\s*\?\s*\)'), '(...)'),
+]
+
+
+def normalize_sql(sql):
+    """SQL with literals and IN-lists collapsed, so runs compare by shape."""
+    for pattern, replacement in _LITERALS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+
+def sql_report(name, baseline, captured):
+    """
+    Unified diff against the baseline; without a baseline, or when nothing
+    changed, the captured SQL with repeated statements counted.
+    """
+    if baseline is not None:
+        diff = '\n'.join(difflib.unified_diff(
+            baseline, captured, f'{name} (baseline)', f'{name} (this run)', lineterm='', n=1))
+        if diff:
+            return diff
+    counts = {}
+    for sql in captured:
+        counts[sql] = counts.get(sql, 0) + 1
+    return '\n'.join(f'{count:>4} x {sql}' for sql, count in counts.items())
+
+
+def url_names(urlconf):
+    """Namespaced names of every named pattern in `urlconf`."""
+    resolver = get_resolver(urlconf)
+    namespace = getattr(resolver.urlconf_module, 'app_name', None)
+    names = {pattern.name for pattern in resolver.url_patterns if getattr(pattern, 'name', None)}
+    return {f'{namespace}:{name}' if namespace else name for name in names}
+
+
+class QueryBudgetTestCase(TestCase):
+    urlconf = None
+    endpoints = ()
+    baseline_path = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dataset = seed_dataset()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # Uploads made by the endpoints land in a throwaway media root.
+        media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        cls.enterClassContext(override_settings(MEDIA_ROOT=media_root))
+        cls.baseline = {}
+        if cls.baseline_path and Path(cls.baseline_path).exists():
+            cls.baseline = json.loads(Path(cls.baseline_path).read_text())
+        cls.captured = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        if UPDATE_BASELINE and cls.baseline_path and cls.captured:
+            Path(cls.baseline_path).write_text(json.dumps(dict(sorted(cls.captured.items())), indent=2) + '\n')
+        super().tearDownClass()
+
+    def test_every_url_has_a_budget(self):
+        missing = url_names(self.urlconf) - {endpoint.name for endpoint in self.endpoints}
+        self.assertFalse(missing, f'No query budget declared for: {", ".join(sorted(missing))}')
+
+    def test_endpoints_within_budget(self):
+        for endpoint in self.endpoints:
+            with self.subTest(endpoint.name):
+                self.check_endpoint(endpoint)
+
+    def measure(self, endpoint):
+        """
+        Call the endpoint `runs` times, checking each response; returns
+        (responses, timings_ms, captured SQL lists).
+        """
+        responses, timings, captures = [], [], []
+        cache.clear()
+        for _ in range(endpoint.runs):
+            # A fresh session per run: the previous one was rolled back.
+            client = Client()
+            if not endpoint.anonymous:
+                client.force_login(self.dataset.admin)
+            savepoint = transaction.savepoint()
+            with ExitStack() as stack:
+                contexts = [stack.enter_context(CaptureQueriesContext(connection))
+                            for connection in {id(c): c for c in connections.all()}.values()]
+                start = time.perf_counter()
+                response = endpoint.request(client, self.dataset)
+                timings.append((time.perf_counter() - start) * 1000)
+            try:
+                self.check_response(endpoint, response)
+            finally:
+                transaction.savepoint_rollback(savepoint)
+            responses.append(response)
+            captures.append([query['sql'] for context in contexts for query in context.captured_queries])
+        return responses, timings, captures
+
+    def check_response(self, endpoint, response):
+        body = b'<stream>' if response.streaming else response.content[:300]
+        self.assertEqual(response.status_code, endpoint.status,
+                         f'{endpoint.name} returned {response.status_code}: {body!r}')
+        if endpoint.check is not None:
+            endpoint.check(self, response, self.dataset)
+
+    def check_endpoint(self, endpoint):
+        if endpoint.skip:
+            self.skipTest(endpoint.skip)
+        responses, timings, captures = self.measure(endpoint)
+
+        worst = max(captures, key=len)
+        normalized = [normalize_sql(sql) for sql in worst]
+        self.captured[endpoint.name] = normalized
+        if len(worst) > endpoint.queries:
+            self.fail(
+                f'{endpoint.name} ran {len(worst)} queries, budget is {endpoint.queries}:\n'
+                + sql_report(endpoint.name, self.baseline.get(endpoint.name), normalized)
+            )
+
+        if LATENCY_FACTOR:
+            p95 = percentile(sorted(timings), 95)
+            target = endpoint.p95_ms * LATENCY_FACTOR
+            self.assertLessEqual(p95, target, f'{endpoint.name} p95 {p95:.1f}ms exceeds {target:.0f}ms')
@@ -0,0 +1,76 @@
+"""
+Primary/replica routing.
+
+Writes always go to `default`. Reads go to `replica` only inside views
+marked with @reads_from_replica (search, the seat table, history) and
+only when the client has not written recently: ReplicaPinningMiddleware
+pins a browser to the primary for REPLICA_STICKY_SECONDS after any
+successful unsafe request, so an edit or print is visible on the next
+page load. Without a `replica` alias configured everything stays on
+`default`.
+"""
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+REPLICA_DB_ALIAS = 'replica'
+
+replica_reads = ContextVar('replica_reads', default=False)
+primary_pinned = ContextVar('primary_pinned', default=False)
+
+
+def reads_from_replica(view):
+    """Let the view's queries go to the read replica when one is available."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            token = replica_reads.set(True)
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                replica_reads.reset(token)
+        return wrapped
+
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        token = replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            replica_reads.reset(token)
+    return wrapped
+
+
+def replica_available():
+    return REPLICA_DB_ALIAS in settings.DATABASES
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if (
+            replica_reads.get()
+            and not primary_pinned.get()
+            and replica_available()
+            # Reads inside a write transaction must see that transaction.
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        # Explicit, otherwise saving an instance read from the replica
+        # would be routed back to the replica.
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        aliases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives schema changes through replication.
+        return db == DEFAULT_DB_ALIAS
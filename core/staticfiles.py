@@ -0,0 +1,126 @@
+"""
+Static asset pipeline.
+
+collectstatic stores every file under a content-hashed name (the Django
+manifest storage) and writes gzip and brotli siblings next to each text
+asset, so nothing is compressed per request. StaticFilesIndex then serves
+STATIC_ROOT from the app, for deployments without a front-end server doing
+it: hashed names are cacheable for a year and marked immutable, so a
+returning kiosk loads its scripts and styles without touching the network.
+"""
+import gzip
+import mimetypes
+import os
+import re
+
+import brotli
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.files.base import ContentFile
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.json', '.map', '.svg', '.txt', '.xml', '.html')
+# Below this the compressed copy saves less than a round trip's headers.
+COMPRESS_MIN_BYTES = 1024
+
+# Content codings in order of preference, with the suffix of their copies.
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Unhashed names can change on any deploy.
+REVALIDATE_CACHE_CONTROL = 'public, max-age=60'
+
+
+def compress(data):
+    """{suffix: compressed bytes} for each coding that actually shrinks `data`."""
+    variants = {
+        '.gz': gzip.compress(data, compresslevel=9, mtime=0),
+        '.br': brotli.compress(data, quality=11),
+    }
+    return {suffix: body for suffix, body in variants.items() if len(body) < len(data)}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes .gz and .br copies of hashed text assets."""
+
+    manifest_strict = False
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            # Not collected (development, tests): link the plain name.
+            if content is None:
+                return name
+            raise
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(hashed):
+            if not name.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            if len(data) < COMPRESS_MIN_BYTES:
+                continue
+            for suffix, body in compress(data).items():
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(body))
+                yield name, name + suffix, True
+
+
+_ACCEPTS = {coding: re.compile(rf'\b{coding}\b') for coding, _ in ENCODINGS}
+
+
+class StaticFilesIndex:
+    """
+    The files under STATIC_ROOT and their compressed copies, listed once:
+    the tree only changes on deploy, which restarts the workers.
+    """
+
+    def __init__(self, root, url):
+        # url path -> (file path, content type, [(coding, compressed file path)])
+        self.files = {}
+        self.immutable = {url + name for name in getattr(staticfiles_storage, 'hashed_files', {}).values()}
+        if not root or not os.path.isdir(root):
+            return
+        suffixes = tuple(suffix for _, suffix in ENCODINGS)
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                if path.endswith(suffixes):
+                    continue
+                content_type, _ = mimetypes.guess_type(name)
+                variants = [(coding, path + suffix) for coding, suffix in ENCODINGS
+                            if os.path.exists(path + suffix)]
+                relative = os.path.relpath(path, root).replace(os.sep, '/')
+                self.files[url + relative] = (path, content_type or 'application/octet-stream', variants)
+
+    def response(self, request):
+        """The response for a static file request, or None when it is not a collected file."""
+        entry = self.files.get(request.path)
+        if entry is None or request.method not in ('GET', 'HEAD'):
+            return None
+        path, content_type, variants = entry
+        accept = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        encoding = next(((coding, variant) for coding, variant in variants if _ACCEPTS[coding].search(accept)), None)
+        if encoding:
+            path = encoding[1]
+        # Small files straight from the page cache; read whole, not streamed.
+        with open(path, 'rb') as f:
+            response = HttpResponse(f.read(), content_type=content_type)
+        if encoding:
+            response['Content-Encoding'] = encoding[0]
+        if variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        response['Cache-Control'] = (
+            IMMUTABLE_CACHE_CONTROL if request.path in self.immutable else REVALIDATE_CACHE_CONTROL
+        )
+        return response
@@ -0,0 +1,99 @@
+"""
+Timing for background tasks.
+
+A TaskRun measures one execution: wall-clock start, total duration, named
+phases and peak memory. The task stores what it measured on its own model
+row, because Celery workers are separate processes whose in-memory state
+the /metrics endpoint never sees; aggregates are then read back from the
+database by a collector (see MetricsRegistry.register_collector).
+
+Peak memory is the process's resident set size, sampled by a background
+thread while the run lasts. tracemalloc would attribute allocations more
+precisely but slows allocation-heavy code such as the row-by-row import
+several times over. RSS covers the whole process, so it includes Django
+itself and, in a threaded web worker, requests served at the same time.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.utils import timezone
+
+MEMORY_SAMPLE_INTERVAL = 0.05
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class _MemorySampler(threading.Thread):
+    def __init__(self):
+        super().__init__(name='task-memory-sampler', daemon=True)
+        self.peak = current_rss()
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(MEMORY_SAMPLE_INTERVAL):
+            self.peak = max(self.peak, current_rss())
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak = max(self.peak, current_rss())
+        return self.peak
+
+
+class TaskRun:
+    """
+    Context manager around one task execution:
+
+        with TaskRun() as run:
+            with run.phase('parse'):
+                ...
+
+    Phases entered more than once accumulate.
+    """
+
+    def __init__(self):
+        self.started_at = None
+        self.duration = None
+        self.peak_memory = None
+        self.phases = {}
+        self._sampler = None
+
+    def __enter__(self):
+        self.started_at = timezone.now()
+        if current_rss() is not None:
+            self._sampler = _MemorySampler()
+            self._sampler.start()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.duration = time.perf_counter() - self._start
+        if self._sampler is not None:
+            self.peak_memory = self._sampler.stop()
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def queue_seconds(self, enqueued_at):
+        """Time between `enqueued_at` and the start of this run, if known."""
+        if enqueued_at is None:
+            return None
+        return max(0.0, (self.started_at - enqueued_at).total_seconds())
+
+    def rate(self, count):
+        """`count` per second over the whole run."""
+        return count / self.duration if self.duration else None
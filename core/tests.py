@@ -1,3 +1,40 @@
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 
-# Create your tests here.
+from .querybudget import normalize_sql
+
+
+class NormalizeSqlTests(SimpleTestCase):
+    def test_literals_and_in_lists_collapse(self):
+        self.assertEqual(
+            normalize_sql('SELECT "a" FROM "t" WHERE "id" IN (1, 2, 3) AND "name" = \'it\'\'s\' LIMIT 21'),
+            'SELECT "a" FROM "t" WHERE "id" IN (...) AND "name" = ? LIMIT ?',
+        )
+
+    def test_floats_in_any_notation_collapse(self):
+        self.assertEqual(
+            normalize_sql('UPDATE "t" SET "a" = 0.25, "b" = 9.84e-05, "c" = 1.3E+02'),
+            'UPDATE "t" SET "a" = ?, "b" = ?, "c" = ?',
+        )
+
+    def test_savepoint_names_collapse(self):
+        self.assertEqual(normalize_sql('SAVEPOINT "s140_x12"'), 'SAVEPOINT "<savepoint>"')
+
+
+class MetricsAccessTests(TestCase):
+    def status(self, **headers):
+        return self.client.get('/metrics', **headers).status_code
+
+    @override_settings(METRICS_TOKEN='', METRICS_ALLOWED_IPS=[])
+    def test_closed_by_default(self):
+        self.assertEqual(self.status(), 403)
+
+    @override_settings(METRICS_TOKEN='s3cret', METRICS_ALLOWED_IPS=[])
+    def test_token_required_even_from_localhost(self):
+        self.assertEqual(self.status(), 403)
+        self.assertEqual(self.status(HTTP_AUTHORIZATION='Bearer wrong'), 403)
+        self.assertEqual(self.status(HTTP_AUTHORIZATION='Bearer s3cret'), 200)
+
+    @override_settings(METRICS_TOKEN='', METRICS_ALLOWED_IPS=['127.0.0.1'])
+    def test_allowed_ips_when_set(self):
+        self.assertEqual(self.status(), 200)
+        self.assertEqual(self.status(REMOTE_ADDR='10.0.0.9'), 403)
@@ -1,7 +1,70 @@
 from django.contrib import admin
 
 # Register your models here.
-from seatalignment.models import Seat, BadgeTemplate
+from seatalignment.models import Event, Seat, BadgeTemplate, RenderedBadge, SeatCSVUpload, SeatHistory
 
 admin.site.register(Seat)
-admin.site.register(BadgeTemplate)
+
+
+@admin.register(Event)
+class EventAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'starts_on', 'ends_on', 'status')
+    list_filter = ('status',)
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
+    readonly_fields = ('archived_at', 'archive_file')
+
+
+@admin.register(BadgeTemplate)
+class BadgeTemplateAdmin(admin.ModelAdmin):
+    list_display = ('event', 'version', 'name', 'page_width_mm', 'page_height_mm', 'created_by', 'created_at')
+    list_filter = ('event',)
+    readonly_fields = ('version', 'render_plan')
+
+    def has_change_permission(self, request, obj=None):
+        # Versions are immutable; a new layout is added as a new version.
+        return False
+
+
+@admin.register(RenderedBadge)
+class RenderedBadgeAdmin(admin.ModelAdmin):
+    list_display = ('seat', 'template_version', 'content_hash', 'rendered_at')
+    list_select_related = ('seat',)
+    readonly_fields = [f.name for f in RenderedBadge._meta.fields]
+
+
+@admin.register(SeatHistory)
+class SeatHistoryAdmin(admin.ModelAdmin):
+    list_display = ('seat_no', 'action', 'source', 'changed_by', 'created_at')
+    list_filter = ('action', 'source')
+    search_fields = ('seat_no',)
+    readonly_fields = [f.name for f in SeatHistory._meta.fields]
+
+
+def _seconds(field, label):
+    @admin.display(description=label, ordering=field, empty_value='-')
+    def column(self, obj):
+        value = getattr(obj, field)
+        return None if value is None else f'{value:.2f}s'
+    return column
+
+
+@admin.register(SeatCSVUpload)
+class SeatCSVUploadAdmin(admin.ModelAdmin):
+    """Import runs side by side: where the time went, how fast, how much memory."""
+    list_display = ('id', 'event', 'status', 'row_count', 'queue', 'parse', 'write', 'assign', 'duration',
+                    'throughput', 'peak_memory_kb', 'enqueued_at')
+    list_filter = ('status', 'event')
+    date_hierarchy = 'enqueued_at'
+    ordering = ('-id',)
+    readonly_fields = [f.name for f in SeatCSVUpload._meta.fields]
+
+    queue = _seconds('queue_seconds', 'queue wait')
+    parse = _seconds('parse_seconds', 'parse')
+    write = _seconds('write_seconds', 'write')
+    assign = _seconds('assign_seconds', 'assign')
+    duration = _seconds('duration_seconds', 'total')
+
+    @admin.display(description='rows/sec', ordering='rows_per_second', empty_value='-')
+    def throughput(self, obj):
+        return None if obj.rows_per_second is None else f'{obj.rows_per_second:,.0f}'
@@ -0,0 +1,279 @@
+"""
+Free-seat allocation over the configured SEAT-<n> range.
+
+Each event has its own allocator. Occupied seat numbers are kept in a
+compact in-process bitmap (one bit per seat) that is rebuilt from the
+database on first use and kept current by the Seat save/delete signals,
+which apply a change only once its transaction commits.
+
+Numbers handed out by `reserve` are held until the save that uses them
+commits; if that transaction rolls back instead, the reservation lapses
+after RESERVATION_SECONDS and the number is free again. Other processes
+may create seats behind our back; the unique constraint on (event,
+seat_no) catches that and `allocate_seat` rebuilds and retries.
+"""
+import threading
+import time
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+
+from .models import Seat
+
+# How long a reserved number waits for its save to commit.
+RESERVATION_SECONDS = 60
+
+
+class SeatBitmap:
+    """Bitset of occupied seat numbers over the inclusive range [first, last]."""
+
+    def __init__(self, first, last):
+        if first > last:
+            raise ValueError('Seat range is empty')
+        self.first = first
+        self.last = last
+        self.bits = bytearray((last - first) // 8 + 1)
+
+    def __contains__(self, number):
+        return self.first <= number <= self.last
+
+    def is_taken(self, number):
+        offset = number - self.first
+        return bool(self.bits[offset >> 3] & (1 << (offset & 7)))
+
+    def mark(self, number):
+        if number in self:
+            offset = number - self.first
+            self.bits[offset >> 3] |= 1 << (offset & 7)
+
+    def clear(self, number):
+        if number in self:
+            offset = number - self.first
+            self.bits[offset >> 3] &= ~(1 << (offset & 7)) & 0xFF
+
+    def free_runs(self):
+        """Yield (start, length) for every maximal run of free seats, in order."""
+        run_start = None
+        size = self.last - self.first + 1
+        for index, byte in enumerate(self.bits):
+            base = index << 3
+            if byte == 0x00 and base + 8 <= size:
+                if run_start is None:
+                    run_start = base
+                continue
+            if byte == 0xFF:
+                if run_start is not None:
+                    yield self.first + run_start, base - run_start
+                    run_start = None
+                continue
+            for bit in range(min(8, size - base)):
+                if byte & (1 << bit):
+                    if run_start is not None:
+                        yield self.first + run_start, base + bit - run_start
+                        run_start = None
+                elif run_start is None:
+                    run_start = base + bit
+        if run_start is not None:
+            yield self.first + run_start, size - run_start
+
+    def next_free(self, count):
+        """Return up to `count` lowest free seat numbers."""
+        numbers = []
+        for start, length in self.free_runs():
+            take = min(length, count - len(numbers))
+            numbers.extend(range(start, start + take))
+            if len(numbers) == count:
+                break
+        return numbers
+
+    def _free_mask(self):
+        size = self.last - self.first + 1
+        return ~int.from_bytes(self.bits, 'little') & ((1 << size) - 1)
+
+    def largest_free_block(self):
+        """
+        Return (start, length) of the longest free run, or (None, 0) when full.
+
+        Works on the bitmap as one big integer: runs[j] has a bit set where a
+        free run of at least 2**j seats starts, so the answer takes O(log n)
+        whole-bitmap operations instead of a per-seat scan.
+        """
+        free = self._free_mask()
+        if not free:
+            return None, 0
+        runs = [free]
+        while True:
+            width = 1 << (len(runs) - 1)
+            longer = runs[-1] & (runs[-1] >> width)
+            if not longer:
+                break
+            runs.append(longer)
+        starts = runs[-1]
+        length = 1 << (len(runs) - 1)
+        for j in range(len(runs) - 2, -1, -1):
+            longer = starts & (runs[j] >> length)
+            if longer:
+                starts = longer
+                length += 1 << j
+        lowest = (starts & -starts).bit_length() - 1
+        return self.first + lowest, length
+
+    def free_count(self):
+        return self._free_mask().bit_count()
+
+
+class SeatAllocator:
+    """Thread-safe allocator over a lazily built SeatBitmap for one event."""
+
+    def __init__(self, event_id, first=None, last=None):
+        self.event_id = event_id
+        self._range = (first, last)
+        self._bitmap = None
+        self._lock = threading.Lock()
+        # Reserved numbers not yet committed: number -> time.monotonic() deadline.
+        self._reserved = {}
+
+    @property
+    def seat_range(self):
+        first, last = self._range
+        if first is None or last is None:
+            first, last = getattr(settings, 'SEAT_NUMBER_RANGE', (1, 5000))
+        return first, last
+
+    def _get_bitmap(self):
+        # Caller holds the lock.
+        if self._bitmap is None:
+            first, last = self.seat_range
+            bitmap = SeatBitmap(first, last)
+            taken = Seat.objects.filter(
+                event_id=self.event_id, seat_number__range=(first, last)
+            ).values_list('seat_number', flat=True)
+            for number in taken.iterator(chunk_size=5000):
+                bitmap.mark(number)
+            for number in self._reserved:
+                bitmap.mark(number)
+            self._bitmap = bitmap
+        self._expire_reservations()
+        return self._bitmap
+
+    def _expire_reservations(self):
+        # Caller holds the lock. A lapsed reservation's save never committed.
+        now = time.monotonic()
+        for number, deadline in list(self._reserved.items()):
+            if deadline <= now:
+                del self._reserved[number]
+                if self._bitmap is not None:
+                    self._bitmap.clear(number)
+
+    def invalidate(self):
+        """Drop the bitmap; it is rebuilt from the database on next use."""
+        with self._lock:
+            self._bitmap = None
+
+    def mark_taken(self, number):
+        """Record a committed seat; confirms its reservation, if any."""
+        self.mark_many([number])
+
+    def release(self, number):
+        """Free a number whose seat was deleted or moved, or was never used."""
+        with self._lock:
+            self._reserved.pop(number, None)
+            if self._bitmap is not None and number is not None:
+                self._bitmap.clear(number)
+
+    def next_free(self, count=1):
+        with self._lock:
+            return self._get_bitmap().next_free(count)
+
+    def largest_free_block(self):
+        with self._lock:
+            return self._get_bitmap().largest_free_block()
+
+    def free_count(self):
+        with self._lock:
+            return self._get_bitmap().free_count()
+
+    def free_runs(self, first=None, last=None):
+        """List (start, length) free runs, clipped to [first, last] when given."""
+        with self._lock:
+            runs = list(self._get_bitmap().free_runs())
+        if first is None and last is None:
+            return runs
+        first = first if first is not None else float('-inf')
+        last = last if last is not None else float('inf')
+        clipped = []
+        for start, length in runs:
+            lo, hi = max(start, first), min(start + length - 1, last)
+            if lo <= hi:
+                clipped.append((int(lo), int(hi - lo + 1)))
+        return clipped
+
+    def mark_many(self, numbers):
+        with self._lock:
+            for number in numbers:
+                if number is None:
+                    continue
+                self._reserved.pop(number, None)
+                if self._bitmap is not None:
+                    self._bitmap.mark(number)
+
+    def reserve(self, count=1):
+        """
+        Atomically pick and mark the next `count` free seats so concurrent
+        callers in this process never receive the same numbers. The
+        numbers stay reserved until `mark_taken` (the committed save) or
+        `release`, or until the reservation lapses.
+        """
+        with self._lock:
+            bitmap = self._get_bitmap()
+            numbers = bitmap.next_free(count)
+            deadline = time.monotonic() + RESERVATION_SECONDS
+            for number in numbers:
+                bitmap.mark(number)
+                self._reserved[number] = deadline
+            return numbers
+
+
+_allocators = {}
+_allocators_lock = threading.Lock()
+
+
+def allocator_for(event_id):
+    """The allocator for one event, created on first use."""
+    with _allocators_lock:
+        allocator = _allocators.get(event_id)
+        if allocator is None:
+            allocator = _allocators[event_id] = SeatAllocator(event_id)
+        return allocator
+
+
+def forget_event(event_id):
+    """Drop an event's allocator, e.g. once the event is archived."""
+    with _allocators_lock:
+        _allocators.pop(event_id, None)
+
+
+def allocate_seat(seat, retries=3):
+    """
+    Assign the next free seat number in its event to an unsaved `seat` and
+    save it. Retries with a fresh bitmap when another process took the
+    number first. The seat's post_save signal confirms the reservation
+    once the save commits.
+    """
+    allocator = allocator_for(seat.event_id)
+    for _ in range(retries):
+        numbers = allocator.reserve(1)
+        if not numbers:
+            raise ValueError('No free seats left in the configured range')
+        seat.seat_no = f'SEAT-{numbers[0]}'
+        try:
+            with transaction.atomic():
+                seat.save()
+            return seat
+        except IntegrityError:
+            allocator.release(numbers[0])
+            allocator.invalidate()
+        except Exception:
+            allocator.release(numbers[0])
+            raise
+    raise ValueError('Could not allocate a free seat, please retry')
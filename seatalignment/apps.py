@@ -4,3 +4,10 @@ from django.apps import AppConfig
 class SeatalignmentConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'seatalignment'
+
+    def ready(self):
+        from core.metrics import registry
+
+        from . import signals  # noqa: F401
+        from .metrics import import_metrics
+        registry.register_collector(import_metrics)
@@ -0,0 +1,57 @@
+"""
+Cold storage for finished events.
+
+An event's seats, uploads, badge templates and history are written to one
+gzip-compressed JSON-lines fixture and then deleted, so the hot tables only
+hold live events. The fixture is in Django's serialization format, so
+`manage.py loaddata <file>` brings an event back.
+"""
+import gzip
+import os
+from pathlib import Path
+
+from django.conf import settings
+from django.core import serializers
+from django.db import transaction
+from django.utils import timezone
+
+from .allocation import forget_event
+from .models import BadgeTemplate, Event, Seat, SeatCSVUpload, SeatHistory
+
+# Restore order: the event first, then the rows that point at it.
+ARCHIVED_MODELS = (Seat, SeatCSVUpload, BadgeTemplate, SeatHistory)
+
+
+def archive_path(event):
+    root = Path(getattr(settings, 'EVENT_ARCHIVE_ROOT', Path(settings.BASE_DIR) / 'archive'))
+    return root / f"{event.slug}-{timezone.now():%Y%m%d%H%M%S}.jsonl.gz"
+
+
+def archive_event(event, path=None, chunk_size=2000):
+    """
+    Write `event` and its rows to `path`, delete the rows and mark the event
+    archived. Returns (path, {model label: row count}).
+    """
+    path = Path(path or archive_path(event))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(path.name + '.part')
+
+    counts = {}
+    with gzip.open(partial, 'wt', encoding='utf-8') as stream:
+        serializers.serialize('jsonl', [event], stream=stream)
+        for model in ARCHIVED_MODELS:
+            queryset = model.objects.filter(event=event).order_by('pk')
+            counts[model._meta.label] = queryset.count()
+            serializers.serialize('jsonl', queryset.iterator(chunk_size=chunk_size), stream=stream)
+    # Only a complete file takes the final name, and only then are rows deleted.
+    os.replace(partial, path)
+
+    with transaction.atomic():
+        for model in reversed(ARCHIVED_MODELS):
+            model.objects.filter(event=event).delete()
+        event.status = Event.Status.ARCHIVED
+        event.archived_at = timezone.now()
+        event.archive_file = str(path)
+        event.save(update_fields=['status', 'archived_at', 'archive_file', 'updated_at'])
+        transaction.on_commit(lambda: forget_event(event.id))
+    return path, counts
@@ -0,0 +1,154 @@
+"""
+Group-aware bulk seat assignment.
+
+Attendees without a seat number are grouped by company and packed into the
+free seat runs reported by the allocator, so colleagues sit in contiguous
+blocks. Packing is best-fit decreasing: the largest groups are placed first,
+each into the smallest free run that holds it whole. A group that fits
+nowhere is split across the largest runs. Attendees without a company are
+placed last, as filler for the gaps that remain.
+"""
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+from .allocation import allocator_for
+from .history import HistoryBuffer, snapshot
+from .models import Seat, SeatHistory
+
+ATTENDEE_FIELDS = ('name', 'email', 'company', 'phone', 'gender')
+
+
+def _group_key(attendee):
+    return (attendee.get('company') or '').strip().casefold()
+
+
+def pack_groups(groups, runs):
+    """
+    Pack `groups` (lists of attendees) into free `runs` of (start, length).
+    Returns (placements, unplaced), where placements is a list of
+    (attendee, seat_number) and unplaced lists the attendees left over.
+    """
+    free = sorted((length, start) for start, length in runs if length > 0)
+    placements = []
+    unplaced = []
+
+    def take(size, length, start):
+        # Seats [start, start + size) are used; return the rest of the run.
+        if length > size:
+            insort(free, (length - size, start + size))
+        return range(start, start + size)
+
+    for members in sorted(groups, key=len, reverse=True):
+        remaining = list(members)
+        while remaining and free:
+            index = bisect_left(free, (len(remaining), -1))
+            if index == len(free):
+                # Too big for any run: fill the largest one and keep going.
+                index = len(free) - 1
+            length, start = free.pop(index)
+            size = min(length, len(remaining))
+            seats = take(size, length, start)
+            placements.extend(zip(remaining[:size], seats))
+            remaining = remaining[size:]
+        unplaced.extend(remaining)
+
+    return placements, unplaced
+
+
+def plan_assignment(event, attendees, seat_from=None, seat_to=None):
+    """
+    Compute a seat plan in `event` without writing anything.
+    Returns (placements, unplaced) as in `pack_groups`.
+    """
+    by_company = defaultdict(list)
+    singles = []
+    for attendee in attendees:
+        key = _group_key(attendee)
+        if key:
+            by_company[key].append(attendee)
+        else:
+            singles.append(attendee)
+
+    groups = [sorted(members, key=lambda a: (a.get('name') or '').casefold()) for members in by_company.values()]
+    groups.extend([attendee] for attendee in singles)
+    return pack_groups(groups, allocator_for(event.id).free_runs(seat_from, seat_to))
+
+
+def validate_attendees(attendees):
+    """Return a list of {'row', 'error'} for attendees that cannot become seats."""
+    errors = []
+    exclude = ['event', 'seat_no', 'seat_number', 'print_status']
+    for index, attendee in enumerate(attendees):
+        try:
+            Seat(**{field: attendee.get(field) or '' for field in ATTENDEE_FIELDS}).clean_fields(exclude=exclude)
+        except ValidationError as e:
+            errors.append({'row': attendee.get('row', index + 1), 'error': '; '.join(
+                f'{field}: {" ".join(messages)}' for field, messages in e.message_dict.items()
+            )})
+    return errors
+
+
+def summarize(placements):
+    """Per-company seat ranges for a preview, in seat order."""
+    blocks = defaultdict(list)
+    for attendee, number in placements:
+        blocks[(attendee.get('company') or '').strip()].append(number)
+    summary = []
+    for company, numbers in blocks.items():
+        numbers.sort()
+        spans = []
+        for number in numbers:
+            if spans and spans[-1][1] == number - 1:
+                spans[-1][1] = number
+            else:
+                spans.append([number, number])
+        summary.append({
+            'company': company,
+            'count': len(numbers),
+            'blocks': [f'SEAT-{lo}' if lo == hi else f'SEAT-{lo}–SEAT-{hi}' for lo, hi in spans],
+        })
+    return sorted(summary, key=lambda s: (-s['count'], s['company']))
+
+
+def assign_seats(event, attendees, seat_from=None, seat_to=None, dry_run=False, batch_size=1000,
+                 user=None, source=SeatHistory.Source.BULK):
+    """
+    Plan seats in `event` for `attendees` (dicts with name, email, company,
+    ...) and, unless `dry_run`, create them with bulk_create in one
+    transaction. Returns (placements, unplaced).
+    """
+    allocator = allocator_for(event.id)
+    for attempt in range(2):
+        placements, unplaced = plan_assignment(event, attendees, seat_from, seat_to)
+        if dry_run or not placements:
+            return placements, unplaced
+
+        seats = [
+            Seat(
+                event=event,
+                seat_no=f'SEAT-{number}',
+                seat_number=number,
+                **{field: (attendee.get(field) or '').strip() for field in ATTENDEE_FIELDS},
+            )
+            for attendee, number in placements
+        ]
+        try:
+            with transaction.atomic():
+                Seat.objects.bulk_create(seats, batch_size=batch_size)
+                changes = HistoryBuffer(event, user=user, source=source, batch_size=batch_size)
+                for seat in seats:
+                    changes.add_create(seat.id, snapshot(seat))
+                changes.flush()
+        except IntegrityError:
+            # Another process took some of the planned seats; replan once.
+            allocator.invalidate()
+            if attempt:
+                raise
+            continue
+        # bulk_create sends no signals; record the numbers once they are durable.
+        numbers = [number for _, number in placements]
+        transaction.on_commit(lambda: allocator.mark_many(numbers))
+        return placements, unplaced
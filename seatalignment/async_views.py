@@ -0,0 +1,124 @@
+"""
+Async versions of the kiosk hot-path endpoints.
+
+Under ASGI (config.asgi sets ASYNC_KIOSK_VIEWS) these replace their sync
+namesakes in urls.py, so a kiosk waiting on the database or cache does not
+hold a worker thread. WSGI deployments keep using the sync views, and both
+build their responses from seatalignment.payloads.
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.http import JsonResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.views.decorators.http import require_http_methods
+
+from accounts.permissions import requires_permission
+from core.routers import reads_from_replica
+from core.pubsub import get_pubsub
+from . import feed, history
+from .events import acurrent_event
+from .models import BadgeTemplate, Seat, SeatCSVUpload, SeatHistory
+from .payloads import (
+    SEARCH_FIELDS, SEARCH_LIMIT, badge_template_cache_key, badge_template_payload, badge_template_version,
+    search_filter, search_result, upload_status_payload,
+)
+
+
+@requires_permission('badges.view', 'seats.view')
+@require_http_methods(["GET"])
+@reads_from_replica
+async def search_seats(request):
+    query = request.GET.get('q', '').strip()
+    if not query or len(query) < 2:
+        return JsonResponse({'results': []})
+
+    event = await acurrent_event(request)
+    seats = Seat.objects.filter(event=event).filter(search_filter(query)).values(*SEARCH_FIELDS)[:SEARCH_LIMIT]
+    return JsonResponse({'results': [search_result(s) async for s in seats]})
+
+
+@requires_permission('badges.print')
+@require_http_methods(["POST"])
+@login_required
+async def print_seat(request, seat_id):
+    event = await acurrent_event(request)
+    try:
+        seat = await Seat.objects.aget(id=seat_id, event=event)
+    except Seat.DoesNotExist:
+        return JsonResponse({"success": False, "error": "Seat not found"}, status=404)
+
+    previous_status = seat.print_status
+    seat.print_status = Seat.PrintStatus.PRINTED
+    await history.asave_and_record(seat, ['print_status', 'updated_at'], SeatHistory.Action.PRINT,
+                                   {'print_status': [previous_status, seat.print_status]},
+                                   user=await request.auser())
+
+    return JsonResponse({
+        "success": True,
+        "seat_no": seat.seat_no,
+        "name":    seat.name,
+        "badge_url": reverse('seats:seat_badge', args=[seat.id]),
+    })
+
+
+@requires_permission('alignment.view', 'badges.print')
+@require_http_methods(["GET"])
+@login_required
+async def get_badge_template(request):
+    event = await acurrent_event(request)
+    version = badge_template_version(request, event)
+    key = badge_template_cache_key(event.id, version)
+    payload = await cache.aget(key) if version else None
+    if payload is None:
+        template = version and await BadgeTemplate.objects.filter(event=event, version=version).afirst()
+        if not template:
+            return JsonResponse({'success': False, 'error': 'No template found'})
+        payload = badge_template_payload(template)
+        await cache.aset(key, payload, None)
+    return JsonResponse({'success': True, 'template': payload})
+
+
+@requires_permission('seats.upload', 'seats.create')
+@login_required
+async def upload_status(request, upload_id):
+    event = await acurrent_event(request)
+    try:
+        upload = await SeatCSVUpload.objects.aget(id=upload_id, event=event)
+    except SeatCSVUpload.DoesNotExist:
+        return JsonResponse({'status': 'not_found'}, status=404)
+    return JsonResponse(upload_status_payload(upload))
+
+
+@requires_permission('seats.view', 'badges.view')
+@require_http_methods(["GET"])
+@login_required
+async def seat_feed(request):
+    """
+    Server-sent events stream of seat changes in the current event.
+    Clients patch single rows from each message and reload on "reload".
+    """
+    event = await acurrent_event(request)
+    subscription = get_pubsub().subscribe(feed.channel(event.id))
+
+    async def stream():
+        try:
+            yield 'retry: %d\n\n' % settings.SEAT_FEED_RETRY_MS
+            while True:
+                try:
+                    message = await subscription.get(settings.SEAT_FEED_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    # Keeps proxies from closing an idle connection.
+                    yield ': ping\n\n'
+                    continue
+                yield 'data: %s\n\n' % json.dumps(message, default=str)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,85 @@
+"""
+Badge layout compilation.
+
+A BadgeTemplate version stores the layout as the alignment page edits it:
+CSS pixel offsets inside a page sized in millimetres. compile_render_plan
+resolves that once, when the version is saved, into a render plan with
+every length in both CSS px and mm and the font fully spelled out. The
+plan is stored with the version and served with it, so print clients and
+server-side renderers draw from it without redoing the arithmetic;
+render_svg is the server-side one, used to pre-render badges (see
+prerender).
+
+The constants mirror the #printSeat rules in badge-alignment.html; change
+them together.
+"""
+from html import escape
+
+CSS_PX_PER_MM = 96 / 25.4
+TEXT_PADDING_PX = (10, 16)  # vertical, horizontal
+FONT_FAMILY = "'Segoe UI', sans-serif"
+# Share of the font size above the baseline, for renderers that place text
+# by baseline (SVG, PDF) rather than by box.
+FONT_ASCENT = 0.8
+
+PLAN_FORMAT = 1
+
+# Seat fields a badge shows; a badge only needs redrawing when one changes.
+BADGE_FIELDS = ('seat_no',)
+
+
+def px_to_mm(px):
+    return round(px / CSS_PX_PER_MM, 3)
+
+
+def mm_to_px(mm):
+    return round(mm * CSS_PX_PER_MM, 3)
+
+
+def compile_render_plan(template):
+    """The render plan of a template version, as a JSON-serializable dict."""
+    padding_y, padding_x = TEXT_PADDING_PX
+    x_px = template.position_x + padding_x
+    y_px = template.position_y + padding_y
+    size_px = template.font_size
+    return {
+        'format': PLAN_FORMAT,
+        'page': {
+            'width_mm': template.page_width_mm,
+            'height_mm': template.page_height_mm,
+            'width_px': mm_to_px(template.page_width_mm),
+            'height_px': mm_to_px(template.page_height_mm),
+        },
+        'seat_no': {
+            'x_px': x_px,
+            'y_px': y_px,
+            'x_mm': px_to_mm(x_px),
+            'y_mm': px_to_mm(y_px),
+            'baseline_y_mm': px_to_mm(y_px + size_px * FONT_ASCENT),
+            'font_family': FONT_FAMILY,
+            'font_size_px': size_px,
+            'font_size_mm': px_to_mm(size_px),
+            'font_size_pt': round(size_px * 0.75, 2),
+            'font_weight': 'bold' if template.is_bold else 'normal',
+            'text_align': template.text_align,
+        },
+    }
+
+
+def render_svg(plan, seat):
+    """
+    A print-ready SVG of one badge, as bytes. User units are millimetres.
+    `seat` maps BADGE_FIELDS to values. The page positions the seat number's
+    box by its left edge and sizes the box to the text, so the text starts
+    at x whatever text_align says.
+    """
+    page = plan['page']
+    text = plan['seat_no']
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{page["width_mm"]}mm" height="{page["height_mm"]}mm" '
+        f'viewBox="0 0 {page["width_mm"]} {page["height_mm"]}">\n'
+        f'<text x="{text["x_mm"]}" y="{text["baseline_y_mm"]}" font-family="{escape(text["font_family"])}" '
+        f'font-size="{text["font_size_mm"]}" font-weight="{text["font_weight"]}">{escape(seat["seat_no"])}</text>\n'
+        '</svg>\n'
+    ).encode()
@@ -0,0 +1,44 @@
+"""
+Which event a request works on.
+
+`?event=<slug>` on any page or API call switches the event and remembers
+the choice in the session; otherwise the session's event is used, falling
+back to the most recent active event.
+"""
+from asgiref.sync import sync_to_async
+from django.http import Http404
+
+from .models import Event
+
+EVENT_SESSION_KEY = 'event_id'
+
+
+def current_event(request):
+    """Resolve (once per request) the event a request is scoped to."""
+    if hasattr(request, '_event'):
+        return request._event
+
+    visible = Event.objects.exclude(status=Event.Status.ARCHIVED)
+    event = None
+    slug = request.GET.get('event')
+    if slug:
+        event = visible.filter(slug=slug).first()
+        if event is None:
+            raise Http404(f'No event {slug!r}')
+        request.session[EVENT_SESSION_KEY] = event.id
+    elif request.session.get(EVENT_SESSION_KEY):
+        event = visible.filter(id=request.session[EVENT_SESSION_KEY]).first()
+    if event is None:
+        event = Event.default()
+    if event is None:
+        raise Http404('No active event')
+
+    request._event = event
+    return event
+
+
+async def acurrent_event(request):
+    """current_event for async views; the lookup and session handling are shared."""
+    if hasattr(request, '_event'):
+        return request._event
+    return await sync_to_async(current_event)(request)
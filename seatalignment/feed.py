@@ -0,0 +1,49 @@
+"""
+Live seat change feed.
+
+Every seat write already records SeatHistory rows, so the history layer
+publishes them here too: one message per changed seat, on a channel per
+event, after the transaction commits. Large bulk writes send a single
+"reload" instead of thousands of row patches.
+"""
+from django.db import transaction
+
+from core.pubsub import RESYNC, get_pubsub
+
+# Above this many changes in one batch, clients reload instead of patching.
+BULK_RELOAD_THRESHOLD = 200
+
+
+def channel(event_id):
+    return f'seats:{event_id}'
+
+
+def message(row):
+    """Feed message for one SeatHistory row."""
+    return {
+        'type': 'seat',
+        'action': row.action,
+        'id': row.seat_id,
+        'seat_no': row.seat_no,
+        'changes': row.changes,
+    }
+
+
+def _send(rows):
+    by_event = {}
+    for row in rows:
+        by_event.setdefault(row.event_id, []).append(row)
+    pubsub = get_pubsub()
+    for event_id, event_rows in by_event.items():
+        if len(event_rows) > BULK_RELOAD_THRESHOLD:
+            pubsub.publish(channel(event_id), RESYNC)
+            continue
+        for row in event_rows:
+            pubsub.publish(channel(event_id), message(row))
+
+
+def publish(rows):
+    """Publish history rows once the surrounding transaction (if any) commits."""
+    rows = list(rows)
+    if rows:
+        transaction.on_commit(lambda: _send(rows))
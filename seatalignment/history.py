@@ -0,0 +1,152 @@
+"""
+Seat change history.
+
+Every write path records a SeatHistory row holding only the fields that
+changed; each recorded change is also published to the live feed, and
+changes to badge fields queue the seat's badge for pre-rendering.
+Point-in-time state is rebuilt backwards: start from the live table and
+undo every change made after the requested time, so recent queries only
+read recent history.
+"""
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.utils import timezone
+
+from . import feed, prerender
+from .models import Seat, SeatHistory
+
+TRACKED_FIELDS = ('seat_no', 'name', 'email', 'company', 'phone', 'gender', 'print_status')
+
+
+def snapshot(seat):
+    """Tracked field values of a Seat instance or a values() dict."""
+    if isinstance(seat, dict):
+        return {field: seat.get(field) for field in TRACKED_FIELDS if field in seat}
+    return {field: getattr(seat, field) for field in TRACKED_FIELDS}
+
+
+def diff(before, after):
+    """{field: [old, new]} for tracked fields whose value changed."""
+    return {
+        field: [before.get(field), after[field]]
+        for field in TRACKED_FIELDS
+        if field in after and before.get(field) != after[field]
+    }
+
+
+def _user_or_none(user):
+    return user if user is not None and user.is_authenticated else None
+
+
+def entry(event_id, seat_id, seat_no, action, changes, user=None, source=SeatHistory.Source.WEB, when=None):
+    """Build an unsaved history row."""
+    return SeatHistory(
+        event_id=event_id,
+        seat_id=seat_id,
+        seat_no=seat_no,
+        action=action,
+        source=source,
+        changes=changes,
+        changed_by=_user_or_none(user),
+        created_at=when or timezone.now(),
+    )
+
+
+def record(seat, action, changes, user=None, source=SeatHistory.Source.WEB):
+    """Write a single history row for `seat`, skipping updates that changed nothing."""
+    if action == SeatHistory.Action.UPDATE and not changes:
+        return None
+    row = entry(seat.event_id, seat.id, seat.seat_no, action, changes, user, source)
+    row.save()
+    feed.publish([row])
+    prerender.schedule_for([row])
+    return row
+
+
+async def asave_and_record(seat, update_fields, action, changes, user=None, source=SeatHistory.Source.WEB):
+    """
+    Save `seat` and record the change in one transaction, for async views.
+    The async ORM cannot open a transaction, so both run in a worker thread.
+    """
+    def write():
+        with transaction.atomic():
+            seat.save(update_fields=update_fields)
+            return record(seat, action, changes, user, source)
+    return await sync_to_async(write)()
+
+
+def record_create(seat, user=None, source=SeatHistory.Source.WEB):
+    changes = {field: [None, value] for field, value in snapshot(seat).items()}
+    return record(seat, SeatHistory.Action.CREATE, changes, user, source)
+
+
+def record_delete(seat, user=None, source=SeatHistory.Source.WEB):
+    changes = {field: [value, None] for field, value in snapshot(seat).items()}
+    return record(seat, SeatHistory.Action.DELETE, changes, user, source)
+
+
+class HistoryBuffer:
+    """
+    Collects history rows for one event and writes them with bulk_create in
+    batches. Used by the import and bulk paths so history costs one INSERT
+    per batch.
+    """
+
+    def __init__(self, event, user=None, source=SeatHistory.Source.IMPORT, batch_size=1000):
+        self.event_id = event.id
+        self.user = _user_or_none(user)
+        self.source = source
+        self.batch_size = batch_size
+        self.when = timezone.now()
+        self.rows = []
+
+    def add(self, seat_id, seat_no, action, changes):
+        if action == SeatHistory.Action.UPDATE and not changes:
+            return
+        self.rows.append(entry(self.event_id, seat_id, seat_no, action, changes, self.user, self.source, self.when))
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def add_create(self, seat_id, values):
+        self.add(seat_id, values['seat_no'], SeatHistory.Action.CREATE,
+                 {field: [None, value] for field, value in snapshot(values).items()})
+
+    def add_delete(self, seat_id, values):
+        self.add(seat_id, values['seat_no'], SeatHistory.Action.DELETE,
+                 {field: [value, None] for field, value in snapshot(values).items()})
+
+    def flush(self):
+        if self.rows:
+            SeatHistory.objects.bulk_create(self.rows, batch_size=self.batch_size)
+            feed.publish(self.rows)
+            prerender.schedule_for(self.rows)
+            self.rows = []
+
+
+def seat_history(event, seat_id):
+    """All changes to one seat, oldest first (uses the (seat_id, created_at) index)."""
+    return SeatHistory.objects.filter(event=event, seat_id=seat_id).order_by('created_at', 'id')
+
+
+def seats_at(event, when, seat_ids=None):
+    """
+    State of an event's seats at time `when` as {seat_id: {field: value}}.
+    Seats created after `when` are absent; seats deleted since are restored
+    from their delete diff.
+    """
+    current = Seat.objects.filter(event=event)
+    later = SeatHistory.objects.filter(event=event, created_at__gt=when)
+    if seat_ids is not None:
+        current = current.filter(id__in=seat_ids)
+        later = later.filter(seat_id__in=seat_ids)
+
+    state = {row['id']: snapshot(row) for row in current.values('id', *TRACKED_FIELDS).iterator(chunk_size=5000)}
+    for change in later.order_by('-created_at', '-id').values('seat_id', 'action', 'changes').iterator(chunk_size=5000):
+        seat_id, action = change['seat_id'], change['action']
+        if action == SeatHistory.Action.CREATE:
+            state.pop(seat_id, None)
+            continue
+        values = state.setdefault(seat_id, {})
+        for field, (old, _new) in change['changes'].items():
+            values[field] = old
+    return state
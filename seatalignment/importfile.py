@@ -0,0 +1,52 @@
+"""
+Row readers for seat import files.
+
+CSV is read with the stdlib csv module, one row at a time, so an import
+never holds the whole file.
+XLSX needs openpyxl, which is imported only when such a file arrives.
+
+Values come back as text, exactly as written in the file: a phone number
+keeps its leading "+", and a seat column with blanks is not turned into
+floats.
+"""
+import csv
+from contextlib import contextmanager
+
+
+@contextmanager
+def open_rows(path):
+    """
+    Open an import file; yields (columns, rows). `rows` is an iterator of
+    (row_num, {column: text}) where row_num counts the header as row 1.
+    """
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            yield list(reader.fieldnames or []), _csv_rows(reader)
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            values = workbook.worksheets[0].iter_rows(values_only=True)
+            columns = [_text(value) for value in next(values, ())]
+            yield columns, _sheet_rows(columns, values)
+        finally:
+            workbook.close()
+
+
+def _csv_rows(reader):
+    for row_num, row in enumerate(reader, start=2):
+        # Short rows leave None for the missing columns; extra cells go under None.
+        yield row_num, {column: value or '' for column, value in row.items() if column is not None}
+
+
+def _sheet_rows(columns, values):
+    for row_num, cells in enumerate(values, start=2):
+        if any(cell is not None for cell in cells):
+            cells = (*cells, *[None] * (len(columns) - len(cells)))
+            yield row_num, {column: _text(cell) for column, cell in zip(columns, cells)}
+
+
+def _text(value):
+    return '' if value is None else str(value)
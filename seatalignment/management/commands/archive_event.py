@@ -0,0 +1,43 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from seatalignment.archive import archive_event
+from seatalignment.models import Event
+
+
+class Command(BaseCommand):
+    help = (
+        'Move finished events to compressed cold storage (EVENT_ARCHIVE_ROOT) and '
+        'delete their seats, uploads, templates and history from the live tables.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help='Events to archive (default: every finished event).')
+        parser.add_argument('--ended-before', type=date.fromisoformat,
+                            help='Archive events whose end date is before YYYY-MM-DD.')
+        parser.add_argument('--force', action='store_true', help='Also archive events still marked active.')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        events = Event.objects.exclude(status=Event.Status.ARCHIVED)
+        if options['slugs']:
+            events = events.filter(slug__in=options['slugs'])
+            missing = set(options['slugs']) - set(events.values_list('slug', flat=True))
+            if missing:
+                raise CommandError(f"Unknown or already archived: {', '.join(sorted(missing))}")
+        elif options['ended_before']:
+            events = events.filter(ends_on__lt=options['ended_before'])
+        else:
+            events = events.filter(status=Event.Status.FINISHED)
+
+        for event in events:
+            if event.status == Event.Status.ACTIVE and not options['force']:
+                self.stdout.write(self.style.WARNING(f'Skipping {event.slug}: still active (use --force)'))
+                continue
+            if options['dry_run']:
+                self.stdout.write(f'Would archive {event.slug} ({event.seats.count()} seats)')
+                continue
+            path, counts = archive_event(event)
+            summary = ', '.join(f'{count} {label.split(".")[1]}' for label, count in counts.items())
+            self.stdout.write(self.style.SUCCESS(f'Archived {event.slug} to {path}: {summary}'))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from seatalignment.models import Seat, backfill_seat_numbers
+
+
+class Command(BaseCommand):
+    help = 'Populate Seat.seat_number from seat_no for rows that are missing it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        updated = backfill_seat_numbers(Seat, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Backfilled seat_number on {updated} seats.'))
@@ -0,0 +1,231 @@
+import asyncio
+import json
+import random
+import secrets
+import tempfile
+import time
+from urllib.parse import quote
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from accounts.models import User
+from accounts.utils import sync_user_permissions
+from core.benchmark import (
+    SERVER_COMMANDS, Server, benchmark_database, free_port, http_request, login_session, percentile, server_env,
+)
+from seatalignment.models import BadgeTemplate, Event, Seat
+
+# Error text that means a request lost a fight for a database lock.
+LOCK_MARKERS = (
+    b'database is locked', b'database table is locked',
+    b'deadlock detected', b'could not serialize access', b'lock timeout',
+)
+ENDPOINTS = ('search', 'print', 'dashboard', 'seat_list', 'bulk_upload')
+# Reconnect before reusing a connection idle this long; servers drop
+# idle keep-alive connections after a few seconds.
+IDLE_RECONNECT = 1.0
+
+
+class Command(BaseCommand):
+    help = (
+        'Replay a check-in rush against a local server on a throwaway database: kiosks '
+        'scanning, searching and claiming badge prints, organisers polling the dashboard '
+        'and seat table, and a bulk upload landing mid-rush. Reports check-ins per minute '
+        'and per-endpoint throughput, latency percentiles, error and lock rates.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seats', type=int, default=5000, help='Attendees seeded before the rush.')
+        parser.add_argument('--kiosks', type=int, default=20, help='Concurrent check-in kiosks.')
+        parser.add_argument('--think', type=float, default=0.0, help='Seconds a kiosk waits between check-ins.')
+        parser.add_argument('--organisers', type=int, default=3, help='Clients polling dashboard and seat table.')
+        parser.add_argument('--poll-interval', type=float, default=2.0)
+        parser.add_argument('--upload-rows', type=int, default=2000, help='Rows in the mid-rush upload; 0 disables it.')
+        parser.add_argument('--upload-after', type=float, default=3.0, help='Seconds into the rush the upload starts.')
+        parser.add_argument('--seconds', type=float, default=30)
+        parser.add_argument('--server', choices=sorted(SERVER_COMMANDS), default='wsgi')
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker.')
+
+    def handle(self, *args, **options):
+        with benchmark_database(), tempfile.TemporaryDirectory() as media_root:
+            sessions = self.seed(options['seats'])
+            port = free_port()
+            command = SERVER_COMMANDS[options['server']].format(
+                port=port, workers=options['workers'], threads=options['threads'])
+            upload = f"{options['upload_rows']}-row upload" if options['upload_rows'] else 'no upload'
+            self.stdout.write(
+                f"Check-in rush on {connection.vendor}: {options['seats']} attendees, {options['kiosks']} kiosks, "
+                f"{options['organisers']} organisers, {upload}; {options['server']} x{options['workers']}"
+            )
+            env = {**server_env(), 'MEDIA_ROOT': media_root, 'REQUEST_LOG_LEVEL': 'WARNING'}
+            with Server(command, port, env):
+                stats = asyncio.run(rush(port, sessions, options))
+            self.report(stats)
+
+    def seed(self, count):
+        event = Event.default()
+        Seat.objects.bulk_create(
+            [Seat(event=event, seat_no=f'SEAT-{n}', seat_number=n, name=f'Guest {n}', email=f'guest{n}@example.com',
+                  company=f'Company {n % 50}') for n in range(1, count + 1)],
+            batch_size=1000,
+        )
+        BadgeTemplate.objects.create(event=event)
+
+        def user(email, permissions):
+            user = User.objects.create_user(email=email, password=secrets.token_urlsafe(), user_type='staff')
+            sync_user_permissions(user, permissions)
+            return login_session(user)
+
+        return {
+            'kiosk': user('kiosk@example.com', [('badge', 'view'), ('badge', 'print'), ('seat', 'view')]),
+            'organiser': user('organiser@example.com', [('seat', 'view'), ('seat', 'upload'), ('seat', 'create')]),
+            'attendees': count,
+        }
+
+    def report(self, stats):
+        elapsed = stats['elapsed']
+        self.stdout.write(
+            f"{'endpoint':<12} {'requests':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+            f"{'errors':>7} {'locks':>7}"
+        )
+        for name in ENDPOINTS:
+            endpoint = stats['endpoints'][name]
+            latencies = sorted(endpoint['latencies'])
+            total = len(latencies) + endpoint['errors']
+            if not total:
+                continue
+            self.stdout.write(
+                f'{name:<12} {total:>8} {total / elapsed:>8.1f} '
+                f'{percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 95) * 1000:>8.1f} '
+                f'{percentile(latencies, 99) * 1000:>8.1f} '
+                f"{endpoint['errors'] / total:>7.1%} {endpoint['locks'] / total:>7.1%}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Check-ins: {stats['checkins']} in {elapsed:.1f}s = {stats['checkins'] / elapsed * 60:.0f}/min"
+        ) + f"  (already printed {stats['already_printed']}, not found {stats['not_found']})")
+        if stats['upload']:
+            self.stdout.write(f"Upload: {stats['upload']}")
+
+
+class _Connection:
+    """A keep-alive connection for one simulated client, with per-endpoint accounting."""
+
+    def __init__(self, port, stats, session):
+        self.port = port
+        self.stats = stats
+        self.csrf = secrets.token_hex(16)
+        self.headers = (f'Cookie: sessionid={session}; csrftoken={self.csrf}', f'X-CSRFToken: {self.csrf}')
+        self.reader = self.writer = None
+        self.last_used = 0.0
+
+    async def request(self, endpoint, method, path, headers=(), body=b''):
+        """Returns the response body on 2xx, else None; failures are counted, not raised."""
+        record = self.stats['endpoints'][endpoint]
+        if self.writer is None or time.monotonic() - self.last_used > IDLE_RECONNECT:
+            await self.close()
+            self.reader, self.writer = await asyncio.open_connection('127.0.0.1', self.port)
+        started = time.perf_counter()
+        try:
+            status, content = await http_request(
+                self.reader, self.writer, method, path, (*self.headers, *headers), body)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            record['errors'] += 1
+            await self.close()
+            return None
+        finally:
+            self.last_used = time.monotonic()
+        if any(marker in content for marker in LOCK_MARKERS):
+            record['locks'] += 1
+        if 200 <= status < 300 and not content.startswith(b'{"success": false'):
+            record['latencies'].append(time.perf_counter() - started)
+            return content
+        record['errors'] += 1
+        return None
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def rush(port, sessions, options):
+    stats = {
+        'endpoints': {name: {'latencies': [], 'errors': 0, 'locks': 0} for name in ENDPOINTS},
+        'checkins': 0, 'already_printed': 0, 'not_found': 0, 'upload': None,
+    }
+    deadline = time.monotonic() + options['seconds']
+    # Each attendee turns up once, in random order.
+    arrivals = list(range(1, sessions['attendees'] + 1))
+    random.shuffle(arrivals)
+    arrivals = iter(arrivals)
+
+    async def kiosk():
+        client = _Connection(port, stats, sessions['kiosk'])
+        for number in arrivals:
+            if time.monotonic() >= deadline:
+                break
+            # The badge QR code carries the attendee's email.
+            query = quote(f'guest{number}@example.com')
+            found = await client.request('search', 'GET', f'/manage-seat/api/search/?q={query}')
+            results = json.loads(found)['results'] if found else []
+            if not results:
+                stats['not_found'] += 1
+            elif results[0]['print_status'] == 'printed':
+                stats['already_printed'] += 1
+            elif await client.request('print', 'POST', f"/manage-seat/print/{results[0]['id']}/"):
+                stats['checkins'] += 1
+            if options['think']:
+                await asyncio.sleep(options['think'])
+        await client.close()
+
+    async def organiser():
+        client = _Connection(port, stats, sessions['organiser'])
+        while time.monotonic() < deadline:
+            await client.request('dashboard', 'GET', '/manage-seat/')
+            await client.request('seat_list', 'GET', '/manage-seat/api/seats/?limit=100')
+            await asyncio.sleep(min(options['poll_interval'], max(0, deadline - time.monotonic())))
+        await client.close()
+
+    async def uploader():
+        await asyncio.sleep(options['upload_after'])
+        client = _Connection(port, stats, sessions['organiser'])
+        body, content_type = upload_body(sessions['attendees'], options['upload_rows'])
+        result = await client.request('bulk_upload', 'POST', '/manage-seat/api/bulk-upload/',
+                                      (f'Content-Type: {content_type}',), body)
+        if result:
+            summary = json.loads(result)
+            stats['upload'] = {key: summary.get(key) for key in ('added', 'updated', 'failed')}
+        await client.close()
+
+    upload = asyncio.ensure_future(uploader()) if options['upload_rows'] else None
+    started = time.perf_counter()
+    await asyncio.gather(*(kiosk() for _ in range(options['kiosks'])),
+                         *(organiser() for _ in range(options['organisers'])))
+    # Rates cover the rush itself, not an upload still running after it.
+    stats['elapsed'] = time.perf_counter() - started
+    if upload:
+        await upload
+    return stats
+
+
+def upload_body(attendees, rows):
+    """
+    Multipart body for a late attendee-list export: corrected companies for
+    existing seats, and late registrations on new seats past the seeded ones.
+    """
+    lines = ['seat_no,name,email,company,phone,gender']
+    for row in range(rows):
+        if row % 2 == 0:
+            number = random.randint(1, attendees)
+            lines.append(f'SEAT-{number},Guest {number},guest{number}@example.com,Renamed {number % 50},,')
+        else:
+            number = attendees + row
+            lines.append(f'SEAT-{number},Late {number},late{number}@example.com,Company {number % 50},,')
+    boundary = secrets.token_hex(12)
+    body = (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="file"; filename="rush.csv"\r\n'
+        f'Content-Type: text/csv\r\n\r\n'
+    ).encode() + '\n'.join(lines).encode() + f'\r\n--{boundary}--\r\n'.encode()
+    return body, f'multipart/form-data; boundary={boundary}'
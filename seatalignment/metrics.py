@@ -0,0 +1,60 @@
+"""
+Seat import task metrics for /metrics.
+
+Imports run in Celery workers, so their numbers are read back from the
+SeatCSVUpload rows the task fills in rather than kept in process memory:
+totals across all recorded runs, for rates and averages, and the timings
+of the most recent run.
+"""
+from django.db.models import Count, Max, Sum
+
+from .models import SeatCSVUpload
+
+PHASES = ('parse', 'write', 'assign')
+
+
+def import_metrics():
+    runs = SeatCSVUpload.objects.exclude(started_at=None)
+    totals = list(runs.values('status').order_by('status').annotate(
+        runs=Count('id'),
+        rows=Sum('row_count'),
+        queue=Sum('queue_seconds'),
+        duration=Sum('duration_seconds'),
+        peak_memory=Max('peak_memory_kb'),
+        **{phase: Sum(f'{phase}_seconds') for phase in PHASES},
+    ))
+    last = runs.order_by('-started_at').first()
+
+    lines = ['# HELP seat_import_runs_total Seat imports run, by outcome.',
+             '# TYPE seat_import_runs_total counter']
+    lines += [f'seat_import_runs_total{{status="{t["status"]}"}} {t["runs"]}' for t in totals]
+    lines += ['# HELP seat_import_rows_total File rows read by seat imports.',
+              '# TYPE seat_import_rows_total counter',
+              f'seat_import_rows_total {sum(t["rows"] or 0 for t in totals)}']
+    lines += ['# HELP seat_import_queue_seconds_total Time imports waited between upload and start.',
+              '# TYPE seat_import_queue_seconds_total counter',
+              f'seat_import_queue_seconds_total {sum(t["queue"] or 0 for t in totals):.6f}']
+    lines += ['# HELP seat_import_seconds_total Time spent running imports.',
+              '# TYPE seat_import_seconds_total counter',
+              f'seat_import_seconds_total {sum(t["duration"] or 0 for t in totals):.6f}']
+    lines += ['# HELP seat_import_phase_seconds_total Time spent in each import phase.',
+              '# TYPE seat_import_phase_seconds_total counter']
+    lines += [f'seat_import_phase_seconds_total{{phase="{phase}"}} {sum(t[phase] or 0 for t in totals):.6f}'
+              for phase in PHASES]
+    lines += ['# HELP seat_import_peak_memory_max_bytes Highest peak resident memory of any import.',
+              '# TYPE seat_import_peak_memory_max_bytes gauge',
+              f'seat_import_peak_memory_max_bytes {max((t["peak_memory"] or 0 for t in totals), default=0) * 1024}']
+
+    if last is not None:
+        for name, help_text, value in (
+            ('queue_seconds', 'Queue wait', last.queue_seconds),
+            ('duration_seconds', 'Run time', last.duration_seconds),
+            ('rows_per_second', 'Throughput', last.rows_per_second),
+            ('peak_memory_bytes', 'Peak resident memory',
+             last.peak_memory_kb * 1024 if last.peak_memory_kb is not None else None),
+        ):
+            if value is not None:
+                lines += [f'# HELP seat_import_last_{name} {help_text} of the most recent import.',
+                          f'# TYPE seat_import_last_{name} gauge',
+                          f'seat_import_last_{name} {value}']
+    return lines
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:39
+
+import re
+
+from django.db import migrations, models
+
+# Frozen copies of seatalignment.models.parse_seat_number and
+# backfill_seat_numbers as of this migration, so later changes to them do
+# not change what it does.
+SEAT_NO_RE = re.compile(r'^SEAT-(\d+)$')
+
+
+def parse_seat_number(seat_no):
+    match = SEAT_NO_RE.match((seat_no or '').strip().upper())
+    return int(match.group(1)) if match else None
+
+
+def populate_seat_numbers(apps, schema_editor):
+    Seat = apps.get_model('seatalignment', 'Seat')
+    last_id = 0
+    while True:
+        batch = list(
+            Seat.objects.filter(id__gt=last_id, seat_number__isnull=True)
+            .order_by('id')
+            .only('id', 'seat_no')[:1000]
+        )
+        if not batch:
+            return
+        for seat in batch:
+            seat.seat_number = parse_seat_number(seat.seat_no)
+        Seat.objects.bulk_update(batch, ['seat_number'])
+        last_id = batch[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0003_badgetemplate'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='seat',
+            options={'ordering': ['seat_number', 'seat_no'], 'verbose_name': 'Seat', 'verbose_name_plural': 'Seats'},
+        ),
+        migrations.AddField(
+            model_name='seat',
+            name='seat_number',
+            field=models.PositiveIntegerField(blank=True, editable=False, help_text='Numeric part of seat_no, kept in sync on save', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(fields=['seat_number'], name='seatalignme_seat_nu_25c9c1_idx'),
+        ),
+        migrations.RunPython(populate_seat_numbers, migrations.RunPython.noop),
+    ]
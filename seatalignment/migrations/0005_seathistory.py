@@ -0,0 +1,36 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:42
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0004_seat_number'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SeatHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('seat_id', models.BigIntegerField()),
+                ('seat_no', models.CharField(max_length=20)),
+                ('action', models.CharField(choices=[('create', 'Create'), ('update', 'Update'), ('print', 'Print'), ('delete', 'Delete')], max_length=10)),
+                ('source', models.CharField(choices=[('web', 'Web'), ('bulk', 'Bulk API'), ('import', 'Import')], default='web', max_length=10)),
+                ('changes', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('changed_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Seat History',
+                'verbose_name_plural': 'Seat History',
+                'ordering': ['created_at', 'id'],
+                'indexes': [models.Index(fields=['seat_id', 'created_at'], name='seatalignme_seat_id_b86848_idx'), models.Index(fields=['created_at'], name='seatalignme_created_4225ae_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,116 @@
+# Generated by Django 5.2.7 on 2026-10-19 16:58
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0005_seathistory'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Event',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=100)),
+                ('slug', models.SlugField(unique=True)),
+                ('starts_on', models.DateField(blank=True, null=True)),
+                ('ends_on', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('active', 'Active'), ('finished', 'Finished'), ('archived', 'Archived')], db_index=True, default='active', max_length=20)),
+                ('archived_at', models.DateTimeField(blank=True, null=True)),
+                ('archive_file', models.CharField(blank=True, help_text='Compressed fixture holding the archived rows', max_length=255)),
+            ],
+            options={
+                'verbose_name': 'Event',
+                'verbose_name_plural': 'Events',
+                'ordering': ['-starts_on', '-id'],
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='seat',
+            name='seatalignme_seat_no_c98cba_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='seat',
+            name='seatalignme_email_9fe232_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='seat',
+            name='seatalignme_print_s_601cb1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='seat',
+            name='seatalignme_seat_nu_25c9c1_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='seathistory',
+            name='seatalignme_created_4225ae_idx',
+        ),
+        migrations.AlterField(
+            model_name='seat',
+            name='email',
+            field=models.EmailField(max_length=254),
+        ),
+        migrations.AlterField(
+            model_name='seat',
+            name='print_status',
+            field=models.CharField(choices=[('not_printed', 'Not Printed'), ('printed', 'Printed')], default='not_printed', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='seat',
+            name='seat_no',
+            field=models.CharField(help_text='e.g., SEAT-101', max_length=20, validators=[django.core.validators.RegexValidator(message='Seat No must be in format SEAT-101', regex='^SEAT-\\d+$')]),
+        ),
+        migrations.AddField(
+            model_name='badgetemplate',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='badge_templates', to='seatalignment.event'),
+        ),
+        migrations.AddField(
+            model_name='seat',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='seats', to='seatalignment.event'),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='uploads', to='seatalignment.event'),
+        ),
+        migrations.AddField(
+            model_name='seathistory',
+            name='event',
+            field=models.ForeignKey(null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='seatalignment.event'),
+        ),
+        migrations.AddIndex(
+            model_name='badgetemplate',
+            index=models.Index(fields=['event', 'created_at'], name='seatalignme_event_i_aa387c_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(fields=['event', 'seat_number'], name='seatalignme_event_i_438fdc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(fields=['event', 'email'], name='seatalignme_event_i_41c894_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seat',
+            index=models.Index(fields=['event', 'print_status'], name='seatalignme_event_i_05424e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='seathistory',
+            index=models.Index(fields=['event', 'created_at'], name='seatalignme_event_i_676832_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='seat',
+            constraint=models.UniqueConstraint(fields=('event', 'seat_no'), name='unique_seat_no_per_event'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+from django.db import migrations
+
+MODELS = ('Seat', 'SeatCSVUpload', 'BadgeTemplate', 'SeatHistory')
+
+
+def assign_default_event(apps, schema_editor):
+    """Put every existing row into one 'Default event' so event can be required."""
+    Event = apps.get_model('seatalignment', 'Event')
+    event, _ = Event.objects.get_or_create(slug='default', defaults={'name': 'Default event'})
+    for name in MODELS:
+        apps.get_model('seatalignment', name).objects.filter(event__isnull=True).update(event=event)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0006_event'),
+    ]
+
+    operations = [
+        migrations.RunPython(assign_default_event, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0007_assign_default_event'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='badgetemplate',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='badge_templates', to='seatalignment.event'),
+        ),
+        migrations.AlterField(
+            model_name='seat',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='seats', to='seatalignment.event'),
+        ),
+        migrations.AlterField(
+            model_name='seatcsvupload',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='uploads', to='seatalignment.event'),
+        ),
+        migrations.AlterField(
+            model_name='seathistory',
+            name='event',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='seatalignment.event'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0008_event_required'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='assign_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='duration_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='enqueued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='parse_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='peak_memory_kb',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='queue_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='row_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='rows_per_second',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='write_seconds',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
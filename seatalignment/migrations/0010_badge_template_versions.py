@@ -0,0 +1,97 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:05
+
+from django.db import migrations, models
+
+# Frozen copies of seatalignment.badges.compile_render_plan and
+# seatalignment.models.number_badge_template_versions as of this migration,
+# so later changes to them do not change what it does.
+CSS_PX_PER_MM = 96 / 25.4
+TEXT_PADDING_PX = (10, 16)
+FONT_FAMILY = "'Segoe UI', sans-serif"
+FONT_ASCENT = 0.8
+
+
+def px_to_mm(px):
+    return round(px / CSS_PX_PER_MM, 3)
+
+
+def mm_to_px(mm):
+    return round(mm * CSS_PX_PER_MM, 3)
+
+
+def compile_render_plan(template):
+    padding_y, padding_x = TEXT_PADDING_PX
+    x_px = template.position_x + padding_x
+    y_px = template.position_y + padding_y
+    size_px = template.font_size
+    return {
+        'format': 1,
+        'page': {
+            'width_mm': template.page_width_mm,
+            'height_mm': template.page_height_mm,
+            'width_px': mm_to_px(template.page_width_mm),
+            'height_px': mm_to_px(template.page_height_mm),
+        },
+        'seat_no': {
+            'x_px': x_px,
+            'y_px': y_px,
+            'x_mm': px_to_mm(x_px),
+            'y_mm': px_to_mm(y_px),
+            'baseline_y_mm': px_to_mm(y_px + size_px * FONT_ASCENT),
+            'font_family': FONT_FAMILY,
+            'font_size_px': size_px,
+            'font_size_mm': px_to_mm(size_px),
+            'font_size_pt': round(size_px * 0.75, 2),
+            'font_weight': 'bold' if template.is_bold else 'normal',
+            'text_align': template.text_align,
+        },
+    }
+
+
+def populate_versions(apps, schema_editor):
+    BadgeTemplate = apps.get_model('seatalignment', 'BadgeTemplate')
+    Event = apps.get_model('seatalignment', 'Event')
+    for event in Event.objects.all():
+        templates = list(BadgeTemplate.objects.filter(event=event).order_by('created_at', 'id'))
+        for version, template in enumerate(templates, start=1):
+            template.version = version
+            template.render_plan = compile_render_plan(template)
+        BadgeTemplate.objects.bulk_update(templates, ['version', 'render_plan'])
+        Event.objects.filter(pk=event.pk).update(
+            badge_template_version=templates[-1].version if templates else None
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0009_upload_instrumentation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='event',
+            name='badge_template_version',
+            field=models.PositiveIntegerField(blank=True, help_text='Badge template version this event prints with', null=True),
+        ),
+        migrations.AddField(
+            model_name='badgetemplate',
+            name='render_plan',
+            field=models.JSONField(default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name='badgetemplate',
+            name='version',
+            field=models.PositiveIntegerField(editable=False, null=True),
+        ),
+        migrations.RunPython(populate_versions, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='badgetemplate',
+            name='version',
+            field=models.PositiveIntegerField(editable=False),
+        ),
+        migrations.AddConstraint(
+            model_name='badgetemplate',
+            constraint=models.UniqueConstraint(fields=('event', 'version'), name='unique_badge_template_version'),
+        ),
+    ]
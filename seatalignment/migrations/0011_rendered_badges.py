@@ -0,0 +1,30 @@
+# Generated by Django 5.2.7 on 2026-10-19 17:41
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0010_badge_template_versions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenderedBadge',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('template_version', models.PositiveIntegerField()),
+                ('source_digest', models.CharField(max_length=64)),
+                ('content_hash', models.CharField(max_length=64)),
+                ('rendered_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('seat', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rendered_badge', to='seatalignment.seat')),
+            ],
+            options={
+                'verbose_name': 'Rendered Badge',
+                'verbose_name_plural': 'Rendered Badges',
+            },
+        ),
+    ]
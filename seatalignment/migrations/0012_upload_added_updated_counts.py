@@ -0,0 +1,23 @@
+# Generated by Django 5.2.7 on 2026-10-19 18:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seatalignment', '0011_rendered_badges'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='added_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='seatcsvupload',
+            name='updated_count',
+            field=models.IntegerField(default=0),
+        ),
+    ]
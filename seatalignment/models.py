@@ -1,12 +1,93 @@
-from django.db import models
+import re
+
+from django.db import models, transaction
 from django.core.validators import RegexValidator
+from django.utils import timezone
 from core.models import TimestampedModel 
 
+SEAT_NO_RE = re.compile(r'^SEAT-(\d+)$')
+
+
+def parse_seat_number(seat_no):
+    """Return the integer part of a SEAT-<n> seat number, or None."""
+    match = SEAT_NO_RE.match((seat_no or '').strip().upper())
+    return int(match.group(1)) if match else None
+
+
+def backfill_seat_numbers(seat_model, batch_size=1000):
+    """
+    Fill seat_number for rows that predate the column, in id-ordered batches.
+    Takes the model as an argument so migrations can pass the historical model.
+    Returns the number of rows updated.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        batch = list(
+            seat_model.objects.filter(id__gt=last_id, seat_number__isnull=True)
+            .order_by('id')
+            .only('id', 'seat_no')[:batch_size]
+        )
+        if not batch:
+            return updated
+        for seat in batch:
+            seat.seat_number = parse_seat_number(seat.seat_no)
+        seat_model.objects.bulk_update(batch, ['seat_number'])
+        updated += sum(1 for seat in batch if seat.seat_number is not None)
+        last_id = batch[-1].id
+
+
+class Event(TimestampedModel):
+    """
+    A conference or show. Seats, uploads and badge templates belong to one
+    event, so a new event starts empty and finished ones can be archived
+    out of the hot tables (see the archive_event command).
+    """
+    class Status(models.TextChoices):
+        ACTIVE = 'active', 'Active'
+        FINISHED = 'finished', 'Finished'
+        ARCHIVED = 'archived', 'Archived'
+
+    name = models.CharField(max_length=100)
+    slug = models.SlugField(unique=True)
+    starts_on = models.DateField(null=True, blank=True)
+    ends_on = models.DateField(null=True, blank=True)
+    status = models.CharField(
+        max_length=20,
+        choices=Status.choices,
+        default=Status.ACTIVE,
+        db_index=True
+    )
+    archived_at = models.DateTimeField(null=True, blank=True)
+    archive_file = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Compressed fixture holding the archived rows"
+    )
+    badge_template_version = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Badge template version this event prints with"
+    )
+
+    class Meta:
+        verbose_name = 'Event'
+        verbose_name_plural = 'Events'
+        ordering = ['-starts_on', '-id']
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def default(cls):
+        """The most recent active event, or None."""
+        return cls.objects.filter(status=cls.Status.ACTIVE).order_by('-starts_on', '-id').first()
+
+
 class Seat(TimestampedModel):
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name='seats')
     seat_no = models.CharField(
         max_length=20,
-        unique=True,
-        db_index=True,
         validators=[
             RegexValidator(
                 regex=r'^SEAT-\d+$',
@@ -15,9 +96,15 @@ class Seat(TimestampedModel):
         ],
         help_text="e.g., SEAT-101"
     )
+    seat_number = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        help_text="Numeric part of seat_no, kept in sync on save"
+    )
 
     name = models.CharField(max_length=100)
-    email = models.EmailField(db_index=True)
+    email = models.EmailField()
     company = models.CharField(max_length=100, blank=True)
     phone = models.CharField(
         max_length=20,
@@ -49,31 +136,51 @@ class Seat(TimestampedModel):
     print_status = models.CharField(
         max_length=20,
         choices=PrintStatus.choices,
-        default=PrintStatus.NOT_PRINTED,
-        db_index=True
+        default=PrintStatus.NOT_PRINTED
     )
 
     class Meta:
         verbose_name = 'Seat'
         verbose_name_plural = 'Seats'
-        ordering = ['seat_no']
+        ordering = ['seat_number', 'seat_no']
+        # Every query is scoped to one event, so every index leads with it.
+        # The unique constraint doubles as the (event, seat_no) index.
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'seat_no'], name='unique_seat_no_per_event'),
+        ]
         indexes = [
-            models.Index(fields=['seat_no']),
-            models.Index(fields=['email']),
-            models.Index(fields=['print_status']),
+            models.Index(fields=['event', 'seat_number']),
+            models.Index(fields=['event', 'email']),
+            models.Index(fields=['event', 'print_status']),
         ]
 
     def __str__(self):
         return f"{self.seat_no} - {self.name}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        seat = super().from_db(db, field_names, values)
+        # The stored number, so the save signals can tell when a seat moves.
+        if 'seat_number' in seat.__dict__:
+            seat._stored_seat_number = seat.seat_number
+        return seat
+
     def clean(self):
         if self.seat_no:
             self.seat_no = self.seat_no.upper().strip()
 
+    def save(self, *args, **kwargs):
+        self.seat_number = parse_seat_number(self.seat_no)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'seat_no' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'seat_number'}
+        super().save(*args, **kwargs)
+
 
 from django.core.validators import FileExtensionValidator
 
 class SeatCSVUpload(TimestampedModel):
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name='uploads')
     file = models.FileField(
         upload_to='seat_uploads/',
         validators=[FileExtensionValidator(allowed_extensions=['csv'])]
@@ -89,12 +196,28 @@ class SeatCSVUpload(TimestampedModel):
         default='processing'
     )
     processed = models.BooleanField(default=False)
+    # Rows written: added_count new seats (auto-assigned ones included) plus
+    # updated_count existing ones.
     processed_count = models.IntegerField(default=0)
+    added_count = models.IntegerField(default=0)
+    updated_count = models.IntegerField(default=0)
     failed_count = models.IntegerField(default=0)
     error_log = models.TextField(blank=True)
     processed_at = models.DateTimeField(null=True, blank=True)
     duplicate_count = models.IntegerField(default=0)
 
+    # Filled in by process_seat_csv_upload; durations are in seconds.
+    enqueued_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    queue_seconds = models.FloatField(null=True, blank=True)
+    parse_seconds = models.FloatField(null=True, blank=True)
+    write_seconds = models.FloatField(null=True, blank=True)
+    assign_seconds = models.FloatField(null=True, blank=True)
+    duration_seconds = models.FloatField(null=True, blank=True)
+    row_count = models.IntegerField(default=0)
+    rows_per_second = models.FloatField(null=True, blank=True)
+    peak_memory_kb = models.IntegerField(null=True, blank=True)
+
     class Meta:
         verbose_name = 'Seat CSV Upload'
         verbose_name_plural = 'Seat CSV Uploads'
@@ -111,9 +234,12 @@ from django.core.validators import MinValueValidator, MaxValueValidator
 
 class BadgeTemplate(TimestampedModel):
     """
-    Stores a saved badge layout for seat number printing.
-    One global template (or per-event later).
+    One version of an event's badge layout, for seat number printing.
+    Versions are immutable: saving a layout creates the next version, with
+    its render plan compiled, and points the event at it. Print runs can
+    pin a version number.
     """
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name='badge_templates')
     name = models.CharField(
         max_length=100,
         default="Default Seat Template",
@@ -154,7 +280,6 @@ class BadgeTemplate(TimestampedModel):
         validators=[MinValueValidator(50), MaxValueValidator(500)]
     )
 
-    # Optional: per-user or per-event
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -163,10 +288,103 @@ class BadgeTemplate(TimestampedModel):
         related_name='badge_templates'
     )
 
+    version = models.PositiveIntegerField(editable=False)
+    render_plan = models.JSONField(editable=False, default=dict)
+
     class Meta:
         verbose_name = 'Badge Template'
         verbose_name_plural = 'Badge Templates'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['event', 'created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['event', 'version'], name='unique_badge_template_version'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} v{self.version} ({self.page_width_mm}×{self.page_height_mm}mm)"
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise ValueError('Badge template versions are immutable; save a new version instead.')
+        from . import prerender
+        from .badges import compile_render_plan
+
+        with transaction.atomic():
+            # Two concurrent saves would pick the same number; the unique
+            # constraint turns the second into an IntegrityError.
+            latest = BadgeTemplate.objects.filter(event_id=self.event_id).aggregate(v=models.Max('version'))['v']
+            self.version = (latest or 0) + 1
+            self.render_plan = compile_render_plan(self)
+            super().save(*args, **kwargs)
+            Event.objects.filter(pk=self.event_id).update(badge_template_version=self.version)
+            # Redraw the event's pre-rendered badges with the new layout.
+            prerender.schedule(self.event_id)
+        if 'event' in self._state.fields_cache:
+            self.event.badge_template_version = self.version
+
+
+class RenderedBadge(models.Model):
+    """
+    A seat's pre-rendered badge file (see prerender). source_digest
+    fingerprints the render plan and seat fields it was drawn from; the
+    file itself is stored under its content hash.
+    """
+    seat = models.OneToOneField(Seat, on_delete=models.CASCADE, related_name='rendered_badge')
+    template_version = models.PositiveIntegerField()
+    source_digest = models.CharField(max_length=64)
+    content_hash = models.CharField(max_length=64)
+    rendered_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Rendered Badge'
+        verbose_name_plural = 'Rendered Badges'
+
+    def __str__(self):
+        return f"Badge for seat #{self.seat_id} v{self.template_version}"
+
+
+class SeatHistory(models.Model):
+    """
+    One change to a seat, stored as a field-level diff: {field: [old, new]}.
+    Rows are never updated; seat_id is a plain column so history outlives
+    deleted seats.
+    """
+    class Action(models.TextChoices):
+        CREATE = 'create', 'Create'
+        UPDATE = 'update', 'Update'
+        PRINT = 'print', 'Print'
+        DELETE = 'delete', 'Delete'
+
+    class Source(models.TextChoices):
+        WEB = 'web', 'Web'
+        BULK = 'bulk', 'Bulk API'
+        IMPORT = 'import', 'Import'
+
+    event = models.ForeignKey(Event, on_delete=models.PROTECT, related_name='+')
+    seat_id = models.BigIntegerField()
+    seat_no = models.CharField(max_length=20)
+    action = models.CharField(max_length=10, choices=Action.choices)
+    source = models.CharField(max_length=10, choices=Source.choices, default=Source.WEB)
+    changes = models.JSONField(default=dict)
+    changed_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        verbose_name = 'Seat History'
+        verbose_name_plural = 'Seat History'
+        ordering = ['created_at', 'id']
+        indexes = [
+            models.Index(fields=['seat_id', 'created_at']),
+            models.Index(fields=['event', 'created_at']),
+        ]
 
     def __str__(self):
-        return f"{self.name} ({self.page_width_mm}×{self.page_height_mm}mm)"
\ No newline at end of file
+        return f"{self.seat_no} {self.action} @ {self.created_at:%Y-%m-%d %H:%M:%S}"
@@ -0,0 +1,80 @@
+"""Query filters and response bodies shared by the sync views and their async twins."""
+from django.db.models import Q
+
+SEARCH_FIELDS = ('id', 'seat_no', 'name', 'email', 'company', 'phone', 'print_status')
+SEARCH_LIMIT = 10
+
+
+def search_filter(query):
+    """Match name, email, company or phone."""
+    return (
+        Q(name__icontains=query) |
+        Q(email__icontains=query) |
+        Q(company__icontains=query) |
+        Q(phone__icontains=query)
+    )
+
+
+def search_result(s):
+    return {
+        'id': s['id'],
+        'seat_no': s['seat_no'],
+        'name': s['name'],
+        'email': s['email'],
+        'company': s['company'] or '',
+        'phone': s['phone'] or '',
+        'print_status': s['print_status'],
+        'print_status_display': s['print_status'] == 'printed' and 'Printed' or 'Not Printed'
+    }
+
+
+def badge_template_version(request, event):
+    """
+    The template version to serve: `?version=<n>` pins one, otherwise the
+    event's current version. None when there is none or the pin is invalid.
+    """
+    pinned = request.GET.get('version')
+    if pinned is not None:
+        return int(pinned) if pinned.isdigit() else None
+    return event.badge_template_version
+
+
+def badge_template_cache_key(event_id, version):
+    # Versions never change, so their payloads are cached without expiry.
+    return f'seats:badge-template:{event_id}:{version}'
+
+
+def badge_template_payload(template):
+    return {
+        'id': template.id,
+        'version': template.version,
+        'position_x': template.position_x,
+        'position_y': template.position_y,
+        'font_size': template.font_size,
+        'is_bold': template.is_bold,
+        'text_align': template.text_align,
+        'page_width_mm': template.page_width_mm,
+        'page_height_mm': template.page_height_mm,
+        'plan': template.render_plan,
+    }
+
+
+def upload_status_payload(upload):
+    if upload.processed:
+        return {
+            'status': 'completed',
+            'result': {
+                'added': upload.added_count,
+                'updated': upload.updated_count,
+                'failed': upload.failed_count,
+                'duplicates': upload.duplicate_count,
+                'errors': upload.error_log.splitlines(),
+            }
+        }
+    payload = {
+        'status': upload.status,
+        'processed_rows': upload.processed_count,
+    }
+    if upload.status == 'failed':
+        payload['errors'] = upload.error_log.splitlines()
+    return payload
@@ -0,0 +1,180 @@
+"""
+Badge pre-rendering.
+
+Printing happens with the attendee at the desk, so badges are drawn ahead
+of time: whenever a seat's badge fields change (any write path, via the
+history layer) or the event gets a new template version, a background
+task renders the affected seats and the print endpoint only has to send a
+file.
+
+Files are content-addressed under MEDIA_ROOT/badges/, so identical badges
+share a file and a file never changes once written. Each seat's
+RenderedBadge row holds a digest of what its file was drawn from; a seat
+is only redrawn when that digest changes, and a stale or missing file is
+never served: the print endpoint draws it on the spot instead.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from .badges import BADGE_FIELDS, render_svg
+from .models import BadgeTemplate, RenderedBadge, Seat, SeatHistory
+from .payloads import badge_template_cache_key, badge_template_payload
+
+logger = logging.getLogger(__name__)
+
+BADGE_DIR = 'badges'
+RENDER_BATCH_SIZE = 500
+# Actions after which a seat's badge may look different.
+RENDER_ACTIONS = (SeatHistory.Action.CREATE, SeatHistory.Action.UPDATE)
+
+
+def current_template(event):
+    """
+    The event's current template version as its (cached) payload, or None.
+    Shares the cache entry of the get_badge_template endpoint.
+    """
+    version = event.badge_template_version
+    if not version:
+        return None
+    key = badge_template_cache_key(event.id, version)
+    payload = cache.get(key)
+    if payload is None:
+        template = BadgeTemplate.objects.filter(event=event, version=version).first()
+        if template is None:
+            return None
+        payload = badge_template_payload(template)
+        cache.set(key, payload, None)
+    return payload
+
+
+def source_digest(plan, seat):
+    """Fingerprint of everything a badge is drawn from."""
+    source = {'plan': plan, 'seat': {field: seat[field] for field in BADGE_FIELDS}}
+    return hashlib.sha256(json.dumps(source, sort_keys=True).encode()).hexdigest()
+
+
+def badge_name(content_hash):
+    return f'{BADGE_DIR}/{content_hash[:2]}/{content_hash}.svg'
+
+
+def store(content):
+    """Write a rendered badge under its content hash, once; returns the hash."""
+    content_hash = hashlib.sha256(content).hexdigest()
+    path = default_storage.path(badge_name(content_hash))
+    if not os.path.exists(path):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        # Write aside and rename, so a reader never sees half a file.
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        os.replace(tmp, path)
+    return content_hash
+
+
+def _save(rows):
+    RenderedBadge.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['seat'],
+        update_fields=['template_version', 'source_digest', 'content_hash', 'rendered_at'],
+    )
+
+
+def render_seats(event, seat_ids=None, batch_size=RENDER_BATCH_SIZE):
+    """
+    Render the badges of `seat_ids` in `event` (every seat when None) whose
+    digest changed. Returns {'rendered': n, 'unchanged': n}.
+    """
+    counts = {'rendered': 0, 'unchanged': 0}
+    template = current_template(event)
+    if template is None:
+        return counts
+    plan = template['plan']
+    seats = Seat.objects.filter(event=event)
+    if seat_ids is not None:
+        seats = seats.filter(id__in=seat_ids)
+
+    last_id = 0
+    while True:
+        batch = list(seats.filter(id__gt=last_id).order_by('id').values('id', *BADGE_FIELDS)[:batch_size])
+        if not batch:
+            return counts
+        last_id = batch[-1]['id']
+        rendered = dict(
+            RenderedBadge.objects.filter(seat_id__in=[s['id'] for s in batch]).values_list('seat_id', 'source_digest')
+        )
+        rows = []
+        now = timezone.now()
+        for seat in batch:
+            digest = source_digest(plan, seat)
+            if rendered.get(seat['id']) == digest:
+                counts['unchanged'] += 1
+                continue
+            rows.append(RenderedBadge(
+                seat_id=seat['id'],
+                template_version=template['version'],
+                source_digest=digest,
+                content_hash=store(render_svg(plan, seat)),
+                rendered_at=now,
+            ))
+        _save(rows)
+        counts['rendered'] += len(rows)
+
+
+def badge_path(event, seat):
+    """
+    Path of the up-to-date badge file for `seat`, drawing it now if the
+    background task has not got to it yet. None when the event has no
+    badge template.
+    """
+    template = current_template(event)
+    if template is None:
+        return None
+    plan = template['plan']
+    values = {field: getattr(seat, field) for field in BADGE_FIELDS}
+    digest = source_digest(plan, values)
+    rendered = RenderedBadge.objects.filter(seat=seat).first()
+    if rendered is not None and rendered.source_digest == digest:
+        path = default_storage.path(badge_name(rendered.content_hash))
+        if os.path.exists(path):
+            return path
+    content_hash = store(render_svg(plan, values))
+    _save([RenderedBadge(seat=seat, template_version=template['version'],
+                         source_digest=digest, content_hash=content_hash)])
+    return default_storage.path(badge_name(content_hash))
+
+
+def _enqueue(event_id, seat_ids):
+    from .tasks import prerender_badges
+
+    try:
+        prerender_badges.delay(event_id, seat_ids)
+    except Exception as e:
+        # Not fatal: the print endpoint draws missing badges itself.
+        logger.warning('Could not queue badge pre-rendering for event %s: %s', event_id, e)
+
+
+def schedule(event_id, seat_ids=None):
+    """Queue pre-rendering of `seat_ids` (all seats when None) once the transaction commits."""
+    if settings.PRERENDER_BADGES:
+        transaction.on_commit(lambda: _enqueue(event_id, seat_ids))
+
+
+def schedule_for(rows):
+    """Queue pre-rendering for the seats whose badge fields these history rows change."""
+    by_event = {}
+    for row in rows:
+        if row.action in RENDER_ACTIONS and any(field in row.changes for field in BADGE_FIELDS):
+            by_event.setdefault(row.event_id, []).append(row.seat_id)
+    for event_id, seat_ids in by_event.items():
+        schedule(event_id, seat_ids)
@@ -0,0 +1,46 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .allocation import allocator_for
+from .models import Seat
+
+
+def _saves_number(update_fields):
+    return update_fields is None or 'seat_number' in update_fields
+
+
+@receiver(pre_save, sender=Seat)
+def seat_saving(sender, instance, update_fields=None, **kwargs):
+    # Seats loaded from the database already know their stored number.
+    if instance._state.adding or not _saves_number(update_fields):
+        return
+    if not hasattr(instance, '_stored_seat_number'):
+        instance._stored_seat_number = (
+            Seat.objects.filter(pk=instance.pk).values_list('seat_number', flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Seat)
+def seat_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Only committed changes reach the bitmap, so a rolled-back save
+    # neither takes nor frees a number.
+    if not _saves_number(update_fields):
+        return
+    event_id, number = instance.event_id, instance.seat_number
+    previous = None if created else instance._stored_seat_number
+    instance._stored_seat_number = number
+    if created:
+        transaction.on_commit(lambda: allocator_for(event_id).mark_taken(number))
+    elif previous != number:
+        def move():
+            allocator = allocator_for(event_id)
+            allocator.release(previous)
+            allocator.mark_taken(number)
+        transaction.on_commit(move)
+
+
+@receiver(post_delete, sender=Seat)
+def seat_deleted(sender, instance, **kwargs):
+    # Only free the number once the delete is durable.
+    transaction.on_commit(lambda: allocator_for(instance.event_id).release(instance.seat_number))
@@ -1,7 +1,18 @@
+from itertools import islice
 
 from celery import shared_task
-from .models import Seat, SeatCSVUpload
-import pandas as pd
+from django.db import transaction
+from django.utils import timezone
+
+from core.taskmetrics import TaskRun
+from .models import Event, Seat, SeatCSVUpload, SeatHistory, parse_seat_number
+from . import history, prerender
+from .allocation import allocator_for
+from .assignment import ATTENDEE_FIELDS, assign_seats, validate_attendees
+from .importfile import open_rows
+
+# Rows read, and looked up against existing seats, per step.
+IMPORT_CHUNK_SIZE = 500
 
 
 @shared_task
@@ -9,75 +20,184 @@ def process_seat_csv_upload(upload_id):
     """
     Shared logic: works for both sync & async.
     Returns JSON-serializable dict.
+
+    The outcome, queue wait, phase timings, rows/sec and peak memory of the
+    run are stored on the upload row.
     """
+    run = TaskRun()
+    upload = None
     try:
-        upload = SeatCSVUpload.objects.get(id=upload_id)
-        file_path = upload.file.path
-
-        # Read file
-        if file_path.endswith('.csv'):
-            df = pd.read_csv(file_path)
-        else:
-            df = pd.read_excel(file_path)
-
-        required_cols = ['seat_no', 'name', 'email']
-        if not all(col in df.columns for col in required_cols):
-            raise ValueError('Missing required columns: seat_no, name, email')
-
-        added = updated = failed = 0
-        errors = []
-
-        for idx, row in df.iterrows():
-            row_num = idx + 2
-            try:
-                seat_no = str(row['seat_no']).strip().upper()
-                if not seat_no.startswith('SEAT-'):
-                    raise ValueError('Seat No must start with SEAT-')
-
-                defaults = {
-                    'name': str(row['name']).strip(),
-                    'email': str(row['email']).strip(),
-                    'company': str(row.get('company', '')).strip(),
-                    'phone': str(row.get('phone', '')).strip(),
-                    'gender': str(row.get('gender', '')).lower(),
+        with run:
+            upload = SeatCSVUpload.objects.select_related('event').get(id=upload_id)
+            result = _import_rows(upload, run)
+    except Exception as e:
+        if upload is not None:
+            upload.status = 'failed'
+            upload.error_log = str(e)
+            _record_run(upload, run)
+        return {'success': False, 'error': str(e)}
+
+    upload.processed = True
+    upload.status = 'partial' if result['failed'] else 'success'
+    upload.added_count = result['added']
+    upload.updated_count = result['updated']
+    upload.processed_count = result['added'] + result['updated']
+    upload.failed_count = result['failed']
+    upload.error_log = '\n'.join(f"Row {e['row']}: {e['error']}" for e in result['errors'])
+    _record_run(upload, run)
+    return result
+
+
+@shared_task
+def prerender_badges(event_id, seat_ids=None):
+    """
+    Render print-ready badges for `seat_ids` (the whole event when None)
+    with the event's current template version; see prerender.
+    """
+    return prerender.render_seats(Event.objects.get(id=event_id), seat_ids)
+
+
+def _record_run(upload, run):
+    upload.processed_at = timezone.now()
+    upload.started_at = run.started_at
+    upload.queue_seconds = run.queue_seconds(upload.enqueued_at)
+    upload.parse_seconds = run.phases.get('parse')
+    upload.write_seconds = run.phases.get('write')
+    upload.assign_seconds = run.phases.get('assign')
+    upload.duration_seconds = run.duration
+    upload.rows_per_second = run.rate(upload.row_count)
+    upload.peak_memory_kb = run.peak_memory // 1024 if run.peak_memory is not None else None
+    upload.save()
+
+
+def _import_rows(upload, run):
+    event = upload.event
+    added = updated = failed = 0
+    errors = []
+    unassigned = []
+    changes = history.HistoryBuffer(event, source=SeatHistory.Source.IMPORT)
+    valid_genders = {k.lower(): k for k, _ in Seat.Gender.choices}
+
+    with open_rows(upload.file.path) as (columns, rows):
+        # seat_no may be missing or blank: those rows are auto-assigned
+        required_cols = ['name', 'email']
+        with run.phase('parse'):
+            if not all(col in columns for col in required_cols):
+                raise ValueError('Missing required columns: name, email')
+
+        while True:
+            with run.phase('parse'):
+                chunk = list(islice(rows, IMPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            upload.row_count += len(chunk)
+
+            # Each chunk's seats and their history commit together, so a
+            # crash mid-import never leaves written rows without history.
+            with run.phase('write'), transaction.atomic():
+                # One lookup per chunk gives the "before" state for history
+                # diffs and tells creates from updates, instead of a read per row.
+                seat_nos = {row.get('seat_no', '').strip().upper() for _, row in chunk} - {''}
+                existing = {
+                    row['seat_no']: row
+                    for row in Seat.objects.filter(event=event, seat_no__in=seat_nos).values(*history.TRACKED_FIELDS)
                 }
 
-                # Validate gender
-                valid_genders = {k.lower(): k for k, _ in Seat.Gender.choices}
-                if defaults['gender'] and defaults['gender'] not in valid_genders:
-                    defaults['gender'] = ''
-
-                obj, created = Seat.objects.update_or_create(
-                    seat_no=seat_no,
-                    defaults=defaults
-                )
-                if created:
-                    added += 1
-                else:
-                    updated += 1
-            except Exception as e:
-                failed += 1
-                errors.append({'row': row_num, 'error': str(e)})
+                keyed = []
+                for row_num, row in chunk:
+                    try:
+                        seat_no = row.get('seat_no', '').strip().upper()
 
-        # Update upload record
-        upload.processed = True
-        upload.status = 'completed'
-        upload.save()
+                        defaults = {
+                            'name': row['name'].strip(),
+                            'email': row['email'].strip(),
+                            'company': row.get('company', '').strip(),
+                            'phone': row.get('phone', '').strip(),
+                            'gender': row.get('gender', '').lower(),
+                        }
 
-        return {
-            'success': True,
-            'added': added,
-            'updated': updated,
-            'failed': failed,
-            'errors': errors
-        }
+                        # Validate gender
+                        if defaults['gender'] and defaults['gender'] not in valid_genders:
+                            defaults['gender'] = ''
 
-    except Exception as e:
-        if upload_id:
-            try:
-                upload = SeatCSVUpload.objects.get(id=upload_id)
-                upload.status = 'failed'
-                upload.save()
-            except:
-                pass
-        return {'success': False, 'error': str(e)}
\ No newline at end of file
+                        if not seat_no:
+                            unassigned.append({'row': row_num, **defaults})
+                            continue
+                        if parse_seat_number(seat_no) is None:
+                            raise ValueError('Seat No must be in format SEAT-101')
+                        keyed.append({'row': row_num, 'seat_no': seat_no, **defaults})
+                    except Exception as e:
+                        failed += 1
+                        errors.append({'row': row_num, 'error': str(e)})
+
+                # The chunk is written in one statement, so rows the database
+                # would reject are weeded out first.
+                invalid = validate_attendees(keyed)
+                failed += len(invalid)
+                errors.extend(invalid)
+                invalid_rows = {e['row'] for e in invalid}
+
+                seats = {}
+                logged = []
+                new_numbers = []
+                for values in keyed:
+                    if values['row'] in invalid_rows:
+                        continue
+                    seat_no = values['seat_no']
+                    fields = {field: values[field] for field in ATTENDEE_FIELDS}
+                    before = existing.get(seat_no)
+                    if before is None:
+                        added += 1
+                        new_numbers.append(parse_seat_number(seat_no))
+                        logged.append((seat_no, SeatHistory.Action.CREATE, history.snapshot(
+                            {'seat_no': seat_no, 'print_status': Seat.PrintStatus.NOT_PRINTED, **fields})))
+                    else:
+                        updated += 1
+                        logged.append((seat_no, SeatHistory.Action.UPDATE, history.diff(before, fields)))
+                    # A seat listed twice ends up with its last row's values.
+                    seats[seat_no] = Seat(event=event, seat_no=seat_no, seat_number=parse_seat_number(seat_no), **fields)
+                    existing[seat_no] = {**(before or {}), 'seat_no': seat_no, **fields}
+
+                if seats:
+                    # One upsert per chunk; ON CONFLICT keeps it correct when
+                    # another writer adds one of these seats meanwhile.
+                    Seat.objects.bulk_create(
+                        list(seats.values()),
+                        update_conflicts=True,
+                        unique_fields=['event', 'seat_no'],
+                        update_fields=[*ATTENDEE_FIELDS, 'updated_at'],
+                    )
+                    for seat_no, action, values in logged:
+                        if action == SeatHistory.Action.CREATE:
+                            changes.add_create(seats[seat_no].id, values)
+                        else:
+                            changes.add(seats[seat_no].id, seat_no, action, values)
+                    # bulk_create sends no signals; record new numbers once they are durable.
+                    allocator = allocator_for(event.id)
+                    transaction.on_commit(lambda numbers=new_numbers: allocator.mark_many(numbers))
+                changes.flush()
+
+    assigned = 0
+    if unassigned:
+        with run.phase('assign'):
+            for error in validate_attendees(unassigned):
+                failed += 1
+                errors.append(error)
+            invalid_rows = {e['row'] for e in errors}
+            placements, unplaced = assign_seats(
+                event, [a for a in unassigned if a['row'] not in invalid_rows], source=SeatHistory.Source.IMPORT
+            )
+            assigned = len(placements)
+            added += assigned
+            for attendee in unplaced:
+                failed += 1
+                errors.append({'row': attendee['row'], 'error': 'No free seat left to auto-assign'})
+
+    return {
+        'success': True,
+        'added': added,
+        'updated': updated,
+        'assigned': assigned,
+        'failed': failed,
+        'errors': errors
+    }
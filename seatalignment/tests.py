@@ -1,3 +1,585 @@
-from django.test import TestCase
+import json
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.http import Http404
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User, UserPermission, permissions_to_mask
+from core import querybudget
+from core.querybudget import ALL_PERMISSIONS, Endpoint
+from . import allocation, badges, history, prerender, tasks
+from .allocation import SeatBitmap, allocate_seat, allocator_for, forget_event
+from .events import EVENT_SESSION_KEY, acurrent_event, current_event
+from .models import BadgeTemplate, Event, RenderedBadge, Seat, SeatCSVUpload, SeatHistory
+from .payloads import SEARCH_LIMIT
+from .views import SEAT_PAGE_SIZE
+
+
+def _upload(dataset):
+    rows = ['seat_no,name,email,company,phone,gender']
+    rows += [f'SEAT-{n},Imported {n},imported{n}@example.com,Acme,,female' for n in range(1, 21)]
+    rows += [f',Walk-in {n},walkin{n}@example.com,Acme,,male' for n in range(1, 6)]
+    return {'file': SimpleUploadedFile('seats.csv', '\n'.join(rows).encode(), content_type='text/csv')}
+
+
+def _seat_json(test, response, dataset, **expected):
+    """The response names the dataset's first seat, which now has `expected` values."""
+    test.assertTrue(response.json()['success'])
+    seat = Seat.objects.get(id=dataset.seat.id)
+    for field, value in expected.items():
+        test.assertEqual(getattr(seat, field), value)
+
+
+def _check_seat_page(test, response, dataset):
+    test.assertTemplateUsed(response, 'manage-seat.html')
+    page = response.context['seats']
+    test.assertEqual(len(page), SEAT_PAGE_SIZE)
+    test.assertEqual(page.paginator.count, querybudget.SEAT_COUNT)
+    test.assertContains(response, f'data-id="{dataset.seat.id}"')
+    test.assertLess(len(response.content), 400_000)
+
+
+def _check_list_seats(test, response, dataset):
+    body = response.json()
+    test.assertEqual(len(body['seats']), 100)
+    test.assertEqual(body['seats'][0]['seat_no'], dataset.seat.seat_no)
+    test.assertIsNotNone(body['next_cursor'])
+
+
+def _check_printed(test, response, dataset):
+    body = response.json()
+    test.assertEqual(body['seat_no'], dataset.seat.seat_no)
+    test.assertEqual(body['badge_url'], reverse('seats:seat_badge', args=[dataset.seat.id]))
+    _seat_json(test, response, dataset, print_status=Seat.PrintStatus.PRINTED)
+
+
+def _check_auto_assigned(test, response, dataset):
+    test.assertEqual(response.json()['assigned'], 10)
+    ids = list(Seat.objects.filter(email__startswith='guest').values_list('id', flat=True))
+    test.assertEqual(len(ids), 10)
+    changed_by = SeatHistory.objects.filter(seat_id__in=ids).values_list('changed_by', flat=True)
+    test.assertEqual(list(changed_by), [dataset.admin.id] * 10)
+
+
+def _check_bulk_edit(test, response, dataset):
+    ids = [s.id for s in dataset.seats]
+    test.assertEqual(response.json()['updated'], len(ids))
+    test.assertEqual(Seat.objects.filter(id__in=ids, company='Bulk Co').count(), len(ids))
+
+
+def _check_bulk_delete(test, response, dataset):
+    ids = [s.id for s in dataset.seats]
+    test.assertEqual(response.json()['deleted'], len(ids))
+    test.assertFalse(Seat.objects.filter(id__in=ids).exists())
+
+
+def _check_bulk_status(test, response, dataset):
+    company = Seat.objects.filter(event=dataset.event, company='Company 7')
+    test.assertEqual(response.json()['updated'], company.count())
+    test.assertFalse(company.exclude(print_status=Seat.PrintStatus.PRINTED).exists())
+
+
+def _check_upload(test, response, dataset):
+    # SEAT-6, -12 and -18 are free in the dataset; the 5 walk-ins are auto-assigned.
+    test.assertEqual(
+        {k: v for k, v in response.json().items() if k != 'errors'},
+        {'success': True, 'added': 8, 'updated': 17, 'assigned': 5, 'failed': 0},
+    )
+    test.assertEqual(Seat.objects.get(event=dataset.event, seat_no='SEAT-1').name, 'Imported 1')
+    test.assertEqual(Seat.objects.filter(event=dataset.event, email__startswith='walkin').count(), 5)
+
+
+def _check_search(test, response, dataset):
+    results = response.json()['results']
+    test.assertTrue(0 < len(results) <= SEARCH_LIMIT)
+    test.assertTrue(all(r['name'].startswith('Attendee 12') for r in results))
+
+
+def _template_used(name):
+    return lambda test, response, dataset: test.assertTemplateUsed(response, name)
+
+
+class SeatEndpointBudgetTests(querybudget.QueryBudgetTestCase):
+    urlconf = 'seatalignment.urls'
+    baseline_path = Path(__file__).with_name('query_baseline.json')
+    endpoints = [
+        Endpoint('seats:dashboard', queries=1, p95_ms=50, check=_template_used('dashboard.html')),
+        Endpoint('seats:manage_seat', queries=4, p95_ms=100, check=_check_seat_page),
+        Endpoint('seats:list_seats', queries=3, p95_ms=50, data={'limit': 100}, check=_check_list_seats),
+        Endpoint('seats:list_events', queries=3, p95_ms=50,
+                 check=lambda t, r, d: t.assertEqual(r.json()['current'], d.event.id)),
+        Endpoint('seats:select_event', queries=5, p95_ms=50, method='post',
+                 body=lambda d: {'slug': d.event.slug},
+                 check=lambda t, r, d: t.assertEqual(r.json()['event']['slug'], d.event.slug)),
+        Endpoint('seats:free_seats', queries=3, p95_ms=50, data={'count': 10},
+                 check=lambda t, r, d: t.assertEqual(r.json()['next_free'], [f'SEAT-{n}' for n in range(6, 61, 6)])),
+        Endpoint('seats:auto_assign_seats', queries=6, p95_ms=100, method='post',
+                 body={'attendees': [{'name': f'Guest {n}', 'email': f'guest{n}@example.com', 'company': 'Acme'}
+                                     for n in range(10)]},
+                 check=_check_auto_assigned),
+        Endpoint('seats:add_seat', queries=9, p95_ms=50, method='post',
+                 body={'name': 'New Guest', 'email': 'new@example.com', 'auto_assign': True},
+                 check=lambda t, r, d: t.assertEqual(
+                     Seat.objects.get(email='new@example.com').seat_no, r.json()['seat']['seat_no'])),
+        Endpoint('seats:edit_seat', queries=9, p95_ms=50, method='post',
+                 body=lambda d: {'id': d.seat.id, 'name': 'Renamed', 'company': 'Other Co'},
+                 check=lambda t, r, d: _seat_json(t, r, d, name='Renamed', company='Other Co')),
+        Endpoint('seats:delete_seat', queries=8, p95_ms=50, method='post',
+                 body=lambda d: {'id': d.seat.id},
+                 check=lambda t, r, d: t.assertFalse(Seat.objects.filter(id=d.seat.id).exists())),
+        Endpoint('seats:seat_history', queries=3, p95_ms=50, args=lambda d: [d.seat.id],
+                 check=lambda t, r, d: t.assertEqual([h['action'] for h in r.json()['history']], ['create', 'update'])),
+        Endpoint('seats:seats_at', queries=4, p95_ms=100,
+                 data=lambda d: {'at': timezone.now().isoformat(), 'ids': ','.join(str(s.id) for s in d.seats)},
+                 check=lambda t, r, d: t.assertEqual(
+                     [(s['id'], s['company']) for s in r.json()['seats']], [(s.id, s.company) for s in d.seats])),
+        Endpoint('seats:bulk_edit_seats', queries=7, p95_ms=50, method='post',
+                 body=lambda d: {'ids': [s.id for s in d.seats], 'patch': {'company': 'Bulk Co'}},
+                 check=_check_bulk_edit),
+        Endpoint('seats:bulk_delete_seats', queries=9, p95_ms=50, method='post',
+                 body=lambda d: {'ids': [s.id for s in d.seats]},
+                 check=_check_bulk_delete),
+        Endpoint('seats:bulk_status_seats', queries=7, p95_ms=50, method='post',
+                 body={'filter': {'company': 'Company 7'}, 'print_status': 'printed'},
+                 check=_check_bulk_status),
+        Endpoint('seats:print_seat', queries=7, p95_ms=50, method='post', args=lambda d: [d.seat.id],
+                 check=_check_printed),
+        Endpoint('seats:seat_badge', queries=6, p95_ms=50, args=lambda d: [d.seat.id],
+                 check=lambda t, r, d: t.assertIn(f'>{d.seat.seat_no}</text>'.encode(), r.content)),
+        Endpoint('seats:mark_printed', queries=7, p95_ms=50, method='post',
+                 body=lambda d: {'id': d.seat.id}, check=_check_printed),
+        Endpoint('seats:reprint_seat', queries=7, p95_ms=50, method='post',
+                 body=lambda d: {'id': d.seat.id}, check=_check_printed),
+        Endpoint('seats:print_badge', queries=1, p95_ms=50, check=_template_used('scan-print.html')),
+        Endpoint('seats:user_management', queries=1, p95_ms=50, check=_template_used('user-management.html')),
+        Endpoint('seats:badge_alignment', queries=1, p95_ms=50, check=_template_used('badge-alignment.html')),
+        Endpoint('seats:bulk_upload_seats', queries=14, p95_ms=100, method='post', data=_upload, runs=3,
+                 check=_check_upload),
+        Endpoint('seats:upload_status', queries=3, p95_ms=50, args=lambda d: [d.upload.id],
+                 check=lambda t, r, d: t.assertEqual(r.json()['status'], d.upload.status)),
+        Endpoint('seats:download_sample', queries=1, p95_ms=100, runs=3,
+                 check=lambda t, r, d: t.assertTrue(r.content.startswith(b'PK'))),
+        Endpoint('seats:search_seats', queries=3, p95_ms=50, data={'q': 'Attendee 12'}, check=_check_search),
+        Endpoint('seats:save_badge_template', queries=8, p95_ms=50, method='post',
+                 body={'font_size': 28, 'position_x': 10, 'position_y': 20},
+                 check=lambda t, r, d: t.assertEqual(
+                     (r.json()['version'], r.json()['plan']['seat_no']['font_size_px']), (2, 28))),
+        Endpoint('seats:get_badge_template', queries=3, p95_ms=50,
+                 check=lambda t, r, d: t.assertEqual(r.json()['template']['version'], d.event.badge_template_version)),
+        Endpoint('seats:seat_feed', queries=1, p95_ms=50, status=204,
+                 skip=settings.ASYNC_KIOSK_VIEWS and 'the async feed is an open-ended stream'),
+    ]
+
+    def setUp(self):
+        super().setUp()
+        # The allocator bitmap is process state; rebuild it from this dataset.
+        forget_event(self.dataset.event.id)
+
+
+def _seat(event, number, **fields):
+    fields = {'name': f'Guest {number}', 'email': f'guest{number}@example.com', **fields}
+    return Seat(event=event, seat_no=f'SEAT-{number}', **fields)
+
+
+class SeatBitmapTests(TestCase):
+    def test_free_runs_and_gaps(self):
+        bitmap = SeatBitmap(1, 20)
+        for number in (1, 2, 4, 8, 9, 10):
+            bitmap.mark(number)
+        self.assertEqual(list(bitmap.free_runs()), [(3, 1), (5, 3), (11, 10)])
+        self.assertEqual(bitmap.next_free(5), [3, 5, 6, 7, 11])
+        self.assertEqual(bitmap.largest_free_block(), (11, 10))
+        self.assertEqual(bitmap.free_count(), 14)
+
+    def test_clear_and_out_of_range(self):
+        bitmap = SeatBitmap(10, 12)
+        bitmap.mark(9)
+        bitmap.mark(11)
+        bitmap.clear(11)
+        self.assertEqual(bitmap.next_free(5), [10, 11, 12])
+        for number in (10, 11, 12):
+            bitmap.mark(number)
+        self.assertEqual(bitmap.largest_free_block(), (None, 0))
+
+
+@override_settings(SEAT_NUMBER_RANGE=(1, 50))
+class SeatAllocatorTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name='Allocator', slug='allocator')
+        self.addCleanup(forget_event, self.event.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            for number in (1, 2, 4, 5):
+                _seat(self.event, number).save()
+        self.allocator = allocator_for(self.event.id)
+
+    def allocate(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return allocate_seat(_seat(self.event, 0)).seat_number
+
+    def test_allocation_fills_gaps_first(self):
+        self.assertEqual([self.allocate() for _ in range(3)], [3, 6, 7])
+        self.assertEqual(self.allocator.free_runs(1, 10), [(8, 3)])
+
+    def test_delete_releases_number_on_commit(self):
+        self.allocator.next_free(1)
+        seat = Seat.objects.get(event=self.event, seat_number=2)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            seat.delete()
+        self.assertEqual(self.allocator.next_free(1), [3])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.allocator.next_free(2), [2, 3])
+
+    def test_moving_a_seat_swaps_its_number(self):
+        seat = Seat.objects.get(event=self.event, seat_number=4)
+        seat.seat_no = 'SEAT-3'
+        with self.captureOnCommitCallbacks(execute=True):
+            seat.save()
+        self.assertEqual(self.allocator.next_free(2), [4, 6])
+
+    def test_edits_that_keep_the_number_leave_the_bitmap_alone(self):
+        self.allocator.next_free(1)
+        bitmap = self.allocator._bitmap
+        seat = Seat.objects.get(event=self.event, seat_number=4)
+        seat.name = 'Renamed'
+        seat.print_status = Seat.PrintStatus.PRINTED
+        with self.captureOnCommitCallbacks(execute=True):
+            seat.save()
+        self.assertIs(self.allocator._bitmap, bitmap)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.allocator.next_free(1), [3])
+
+    def test_rolled_back_insert_frees_its_number(self):
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                allocate_seat(_seat(self.event, 0))
+                raise RuntimeError
+        self.assertFalse(Seat.objects.filter(event=self.event, seat_number=3).exists())
+        self.assertEqual(self.allocator.next_free(1), [6])
+        later = allocation.time.monotonic() + allocation.RESERVATION_SECONDS + 1
+        with mock.patch.object(allocation.time, 'monotonic', return_value=later):
+            self.assertEqual(self.allocator.next_free(1), [3])
+
+    def test_number_taken_by_another_process_is_retried(self):
+        self.allocator.next_free(1)
+        # bulk_create sends no signals, like a write from another process.
+        Seat.objects.bulk_create([_seat(self.event, 3, seat_number=3)])
+        self.assertEqual(self.allocate(), 6)
+        self.assertEqual(self.allocator._reserved, {})
+
+    def test_concurrent_reservations_never_overlap(self):
+        self.allocator.next_free(1)
+        results = []
+        barrier = threading.Barrier(8)
+
+        def reserve():
+            barrier.wait()
+            for _ in range(5):
+                results.extend(self.allocator.reserve(1))
+
+        threads = [threading.Thread(target=reserve) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 40)
+        self.assertEqual(len(set(results)), 40)
+        self.assertNotIn(1, results)
+        self.assertIn(3, results)
+
+
+def _admin():
+    user = User.objects.create(email='history-admin@example.com', user_type='admin', is_staff=True,
+                               permission_mask=permissions_to_mask(ALL_PERMISSIONS))
+    UserPermission.objects.bulk_create(
+        [UserPermission(user=user, module=module, action=action) for module, action in ALL_PERMISSIONS]
+    )
+    return user
+
+
+class SeatHistoryTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name='History', slug='history')
+        self.addCleanup(forget_event, self.event.id)
+
+    def at(self, minute):
+        return timezone.now().replace(year=2030, month=1, day=1, hour=9, minute=minute, second=0, microsecond=0)
+
+    def record_at(self, minute, record, *args, **kwargs):
+        with mock.patch.object(history.timezone, 'now', return_value=self.at(minute)):
+            return record(*args, **kwargs)
+
+    def test_diff_keeps_changed_tracked_fields_only(self):
+        before = {'seat_no': 'SEAT-1', 'name': 'Ann', 'company': 'Acme', 'phone': ''}
+        after = {'seat_no': 'SEAT-1', 'name': 'Anna', 'company': 'Acme', 'updated_at': 'x'}
+        self.assertEqual(history.diff(before, after), {'name': ['Ann', 'Anna']})
+        self.assertEqual(history.diff({}, {'email': 'a@example.com'}), {'email': [None, 'a@example.com']})
+        self.assertEqual(history.diff(before, before), {})
+
+    def test_seats_at_rebuilds_past_state(self):
+        ann, bob = _seat(self.event, 1, name='Ann'), _seat(self.event, 2, name='Bob')
+        for seat in (ann, bob):
+            seat.save()
+            self.record_at(0, history.record_create, seat)
+        before = history.snapshot(ann)
+        ann.name = 'Anna'
+        ann.save()
+        self.record_at(10, history.record, ann, SeatHistory.Action.UPDATE, history.diff(before, history.snapshot(ann)))
+        self.record_at(20, history.record_delete, bob)
+        bob_id = bob.id
+        bob.delete()
+        carl = _seat(self.event, 3, name='Carl')
+        carl.save()
+        self.record_at(30, history.record_create, carl)
+
+        at_5 = history.seats_at(self.event, self.at(5))
+        self.assertEqual(set(at_5), {ann.id, bob_id})
+        self.assertEqual(at_5[ann.id]['name'], 'Ann')
+        self.assertEqual(at_5[bob_id]['seat_no'], 'SEAT-2')
+
+        at_15 = history.seats_at(self.event, self.at(15))
+        self.assertEqual(at_15[ann.id]['name'], 'Anna')
+        self.assertIn(bob_id, at_15)
+
+        self.assertEqual(set(history.seats_at(self.event, self.at(25))), {ann.id})
+        self.assertEqual(history.seats_at(self.event, self.at(40)),
+                         {s.id: history.snapshot(s) for s in Seat.objects.filter(event=self.event)})
+        self.assertEqual(set(history.seats_at(self.event, self.at(5), seat_ids=[bob_id])), {bob_id})
+
+    def test_buffer_writes_in_batches_and_skips_empty_updates(self):
+        changes = history.HistoryBuffer(self.event, batch_size=2)
+        changes.add(1, 'SEAT-1', SeatHistory.Action.UPDATE, {})
+        changes.add_create(1, {'seat_no': 'SEAT-1', 'name': 'Ann'})
+        self.assertEqual(SeatHistory.objects.count(), 0)
+        changes.add(1, 'SEAT-1', SeatHistory.Action.UPDATE, {'name': ['Ann', 'Anna']})
+        self.assertEqual(SeatHistory.objects.count(), 2)
+        changes.add_delete(1, {'seat_no': 'SEAT-1', 'name': 'Anna'})
+        changes.flush()
+        rows = list(SeatHistory.objects.order_by('id').values_list('action', 'changes'))
+        self.assertEqual(rows, [
+            ('create', {'seat_no': [None, 'SEAT-1'], 'name': [None, 'Ann']}),
+            ('update', {'name': ['Ann', 'Anna']}),
+            ('delete', {'seat_no': ['SEAT-1', None], 'name': ['Anna', None]}),
+        ])
+
+    def test_failed_history_write_rolls_back_the_edit(self):
+        seat = _seat(self.event, 1, name='Ann')
+        seat.save()
+        client = Client()
+        client.force_login(_admin())
+        with mock.patch.object(history, 'record', side_effect=RuntimeError('history down')):
+            response = client.post('/manage-seat/api/edit/', json.dumps({'id': seat.id, 'name': 'Anna'}),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        seat.refresh_from_db()
+        self.assertEqual(seat.name, 'Ann')
+
+    def test_import_commits_each_chunk_with_its_history(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        rows = ['seat_no,name,email'] + [f'SEAT-{n},Guest {n},guest{n}@example.com' for n in range(1, 6)]
+        with override_settings(MEDIA_ROOT=media_root):
+            upload = SeatCSVUpload.objects.create(
+                event=self.event, file=SimpleUploadedFile('seats.csv', '\n'.join(rows).encode()))
+            flush = history.HistoryBuffer.flush
+            calls = []
+
+            def crash_on_second_chunk(buffer):
+                calls.append(1)
+                if len(calls) == 2:
+                    raise RuntimeError('worker lost')
+                flush(buffer)
+
+            with mock.patch.object(tasks, 'IMPORT_CHUNK_SIZE', 2), \
+                    mock.patch.object(history.HistoryBuffer, 'flush', crash_on_second_chunk):
+                result = tasks.process_seat_csv_upload(upload.id)
+
+        self.assertFalse(result['success'])
+        seat_ids = set(Seat.objects.filter(event=self.event).values_list('id', flat=True))
+        self.assertEqual(len(seat_ids), 2)
+        self.assertEqual(set(SeatHistory.objects.filter(event=self.event).values_list('seat_id', flat=True)), seat_ids)
+
+
+class BadgePrerenderTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        # Template payloads are cached by event id, which tests reuse.
+        cache.clear()
+        self.event = Event.objects.create(name='Badges', slug='badges')
+        self.addCleanup(forget_event, self.event.id)
+        for number in (1, 2, 3):
+            _seat(self.event, number).save()
+        BadgeTemplate(event=self.event, font_size=30).save()
+        self.event.refresh_from_db()
+
+    def badges(self):
+        return dict(RenderedBadge.objects.values_list('seat__seat_no', 'content_hash'))
+
+    def test_source_digest_covers_plan_and_badge_fields_only(self):
+        plan = prerender.current_template(self.event)['plan']
+        seat = {'seat_no': 'SEAT-1'}
+        self.assertEqual(prerender.source_digest(plan, seat), prerender.source_digest(plan, {**seat, 'name': 'x'}))
+        self.assertNotEqual(prerender.source_digest(plan, seat), prerender.source_digest(plan, {'seat_no': 'SEAT-2'}))
+        moved = {**plan, 'seat_no': {**plan['seat_no'], 'x_mm': 1.0}}
+        self.assertNotEqual(prerender.source_digest(plan, seat), prerender.source_digest(moved, seat))
+
+    def test_render_seats_only_redraws_changed_badges(self):
+        self.assertEqual(prerender.render_seats(self.event), {'rendered': 3, 'unchanged': 0})
+        first = self.badges()
+        svg = open(prerender.default_storage.path(prerender.badge_name(first['SEAT-1'])), 'rb').read()
+        self.assertIn(b'>SEAT-1</text>', svg)
+        self.assertIn(b'width="105mm" height="148mm"', svg)
+
+        Seat.objects.filter(seat_no='SEAT-1').update(name='Renamed')
+        Seat.objects.filter(seat_no='SEAT-2').update(seat_no='SEAT-20')
+        self.assertEqual(prerender.render_seats(self.event), {'rendered': 1, 'unchanged': 2})
+        self.assertEqual(self.badges()['SEAT-1'], first['SEAT-1'])
+        self.assertNotEqual(self.badges()['SEAT-20'], first['SEAT-2'])
+
+        BadgeTemplate(event=self.event, font_size=40).save()
+        self.event.refresh_from_db()
+        self.assertEqual(prerender.render_seats(self.event, seat_ids=[Seat.objects.get(seat_no='SEAT-3').id]),
+                         {'rendered': 1, 'unchanged': 0})
+        self.assertEqual(set(RenderedBadge.objects.values_list('template_version', flat=True)), {1, 2})
+
+    def test_badge_path_serves_fresh_files_and_redraws_stale_ones(self):
+        seat = Seat.objects.get(seat_no='SEAT-1')
+        prerender.render_seats(self.event)
+        path = prerender.badge_path(self.event, seat)
+        self.assertEqual(path, prerender.default_storage.path(prerender.badge_name(self.badges()['SEAT-1'])))
+
+        seat.seat_no = 'SEAT-10'
+        seat.save()
+        fresh = prerender.badge_path(self.event, seat)
+        self.assertNotEqual(fresh, path)
+        self.assertIn(b'>SEAT-10</text>', open(fresh, 'rb').read())
+        self.assertEqual(RenderedBadge.objects.get(seat=seat).source_digest,
+                         prerender.source_digest(prerender.current_template(self.event)['plan'], {'seat_no': 'SEAT-10'}))
+
+        empty = Event.objects.create(name='No template', slug='no-template')
+        self.assertIsNone(prerender.badge_path(empty, _seat(empty, 1)))
+
+    @override_settings(PRERENDER_BADGES=True)
+    def test_only_badge_field_changes_are_queued(self):
+        rows = [
+            history.entry(self.event.id, 1, 'SEAT-1', SeatHistory.Action.UPDATE, {'name': ['a', 'b']}),
+            history.entry(self.event.id, 2, 'SEAT-2', SeatHistory.Action.PRINT, {'print_status': ['a', 'b']}),
+            history.entry(self.event.id, 3, 'SEAT-3', SeatHistory.Action.UPDATE, {'seat_no': ['SEAT-9', 'SEAT-3']}),
+            history.entry(self.event.id, 4, 'SEAT-4', SeatHistory.Action.CREATE, {'seat_no': [None, 'SEAT-4']}),
+        ]
+        with mock.patch.object(prerender, '_enqueue') as enqueue, self.captureOnCommitCallbacks(execute=True):
+            prerender.schedule_for(rows)
+        enqueue.assert_called_once_with(self.event.id, [3, 4])
+
+    def test_saved_version_is_served_with_its_plan(self):
+        client = Client()
+        client.force_login(_admin())
+        layout = {'position_x': 40, 'position_y': 12, 'font_size': 36, 'is_bold': True, 'text_align': 'left',
+                  'page_width_mm': 100, 'page_height_mm': 70}
+        with mock.patch.object(prerender, '_enqueue'):
+            saved = client.post(f'/manage-seat/api/save-badge-template/?event={self.event.slug}',
+                                json.dumps(layout), content_type='application/json').json()
+        template = BadgeTemplate.objects.get(event=self.event, version=saved['version'])
+        self.assertEqual(saved['plan'], badges.compile_render_plan(template))
+        self.assertEqual(saved['plan']['seat_no']['x_px'], 40 + badges.TEXT_PADDING_PX[1])
+        served = client.get('/manage-seat/api/get-badge-template/').json()['template']
+        self.assertEqual(served['version'], saved['version'])
+        self.assertEqual(served['plan'], saved['plan'])
+
+
+class KioskTests(TestCase):
+    def setUp(self):
+        self.event = Event.objects.create(name='Kiosk', slug='kiosk')
+        self.addCleanup(forget_event, self.event.id)
+
+    def request(self, **params):
+        request = RequestFactory().get('/', params)
+        request.session = SessionStore()
+        return request
+
+    async def test_async_event_lookup_matches_sync(self):
+        self.assertEqual(await acurrent_event(self.request()), await sync_to_async(current_event)(self.request()))
+        request = self.request(event='kiosk')
+        self.assertEqual(await acurrent_event(request), self.event)
+        self.assertEqual(await request.session.aget(EVENT_SESSION_KEY), self.event.id)
+        with self.assertRaises(Http404):
+            await acurrent_event(self.request(event='missing'))
+
+    def test_printing_writes_only_the_status(self):
+        seat = _seat(self.event, 1, name='Ann')
+        seat.save()
+        client = Client()
+        client.force_login(_admin())
+        # An edit lands between the print view's read and its write.
+        Seat.objects.filter(id=seat.id).update(name='Anna')
+        with mock.patch.object(Seat.objects, 'get', return_value=seat):
+            response = client.post(f'/manage-seat/print/{seat.id}/?event=kiosk')
+        self.assertEqual(response.status_code, 200)
+        seat.refresh_from_db()
+        self.assertEqual((seat.name, seat.print_status), ('Anna', Seat.PrintStatus.PRINTED))
+
+
+class SeatImportTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.event = Event.objects.create(name='Import', slug='import')
+        self.addCleanup(forget_event, self.event.id)
+        _seat(self.event, 1, name='Ann').save()
+
+    def test_upload_status_reports_added_and_updated_separately(self):
+        rows = [
+            'seat_no,name,email,company',
+            'SEAT-1,Anna,ann@example.com,Acme',      # update
+            'SEAT-2,Bob,bob@example.com,Acme',       # add
+            'SEAT-2,Bobby,bob@example.com,Acme',     # update of the row above
+            'SEAT-X,Bad,bad@example.com,',           # invalid seat number
+            'SEAT-3,Cy,not-an-email,',               # invalid email
+            ',Dee,dee@example.com,Acme',             # auto-assigned add
+        ]
+        upload = SeatCSVUpload.objects.create(
+            event=self.event, file=SimpleUploadedFile('seats.csv', '\n'.join(rows).encode()))
+        with self.captureOnCommitCallbacks(execute=True):
+            result = tasks.process_seat_csv_upload(upload.id)
+
+        self.assertEqual((result['added'], result['updated'], result['failed']), (2, 2, 2))
+        upload.refresh_from_db()
+        self.assertEqual((upload.added_count, upload.updated_count, upload.processed_count), (2, 2, 4))
+        client = Client()
+        client.force_login(_admin())
+        status = client.get(f'/manage-seat/api/upload-status/{upload.id}/?event=import').json()
+        self.assertEqual((status['result']['added'], status['result']['updated'], status['result']['failed']), (2, 2, 2))
+
+        self.assertEqual(dict(Seat.objects.filter(event=self.event).values_list('seat_no', 'name')),
+                         {'SEAT-1': 'Anna', 'SEAT-2': 'Bobby', 'SEAT-3': 'Dee'})
+        self.assertEqual(allocator_for(self.event.id).next_free(1), [4])
+
+    def test_upload_status_reports_why_an_import_failed(self):
+        upload = SeatCSVUpload.objects.create(
+            event=self.event, file=SimpleUploadedFile('seats.csv', b'seat_no,name,email\n'))
+        with mock.patch.object(tasks, '_import_rows', side_effect=ValueError('File is not valid CSV')):
+            tasks.process_seat_csv_upload(upload.id)
+
+        client = Client()
+        client.force_login(_admin())
+        status = client.get(f'/manage-seat/api/upload-status/{upload.id}/?event=import').json()
+        self.assertEqual((status['status'], status['errors']), ('failed', ['File is not valid CSV']))
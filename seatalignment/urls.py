@@ -1,15 +1,32 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# Kiosk hot paths: async under ASGI, sync under WSGI.
+if settings.ASYNC_KIOSK_VIEWS:
+    from . import async_views as kiosk_views
+else:
+    kiosk_views = views
+
 app_name = 'seats'
 
 urlpatterns = [
     path('', views.dashboard, name='dashboard'),
     path('manage-seat/', views.manage_seat, name='manage_seat'),
+    path('api/seats/', views.list_seats, name='list_seats'),
+    path('api/events/', views.list_events, name='list_events'),
+    path('api/events/select/', views.select_event, name='select_event'),
+    path('api/free-seats/', views.free_seats, name='free_seats'),
+    path('api/auto-assign/', views.auto_assign_seats, name='auto_assign_seats'),
     path('api/add/', views.add_seat, name='add_seat'),
     path('api/edit/', views.edit_seat, name='edit_seat'),
     path('api/delete/', views.delete_seat, name='delete_seat'),
-    path('api/print/', views.print_seat, name='print_seat'),
+    path('api/history/<int:seat_id>/', views.seat_history, name='seat_history'),
+    path('api/history/at/', views.seats_at, name='seats_at'),
+    path('api/bulk-edit/', views.bulk_edit_seats, name='bulk_edit_seats'),
+    path('api/bulk-delete/', views.bulk_delete_seats, name='bulk_delete_seats'),
+    path('api/bulk-status/', views.bulk_status_seats, name='bulk_status_seats'),
+    path('api/print/', views.mark_printed, name='mark_printed'),
     path('api/reprint/', views.reprint_seat, name='reprint_seat'),
     path('print-badge/', views.print_badge, name='print_badge'),
     path('user-management/', views.user_management, name='user_management'),
@@ -17,15 +34,17 @@ urlpatterns = [
 
 
     path('api/bulk-upload/', views.bulk_upload_seats, name='bulk_upload_seats'),
-    path('api/upload-status/<int:upload_id>/', views.upload_status, name='upload_status'),
+    path('api/upload-status/<int:upload_id>/', kiosk_views.upload_status, name='upload_status'),
     path('download-sample/', views.download_sample, name='download_sample'),
 
-    path('api/search/', views.search_seats, name='search_seats'),
+    path('api/search/', kiosk_views.search_seats, name='search_seats'),
 
-    path("print/<int:seat_id>/", views.print_seat, name="print_seat"),
+    path("print/<int:seat_id>/", kiosk_views.print_seat, name="print_seat"),
+    path("print/<int:seat_id>/badge.svg", views.seat_badge, name="seat_badge"),
 
     # path('badge-alignment/', views.badge_alignment, name='badge_alignment'),
     path('api/save-badge-template/', views.save_badge_template, name='save_badge_template'),
-    path('api/get-badge-template/', views.get_badge_template, name='get_badge_template'),
+    path('api/get-badge-template/', kiosk_views.get_badge_template, name='get_badge_template'),
+    path('api/feed/', kiosk_views.seat_feed, name='seat_feed'),
     
 ]
@@ -1,27 +1,44 @@
 from django.shortcuts import render, get_object_or_404
-from django.http import JsonResponse
+from django.http import Http404, JsonResponse
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.contrib.auth.decorators import login_required
 from django.views.decorators.http import require_http_methods
 from django.http import HttpResponse
+from django.db import transaction
 from django.db.models import Q
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.core.cache import cache
+from django.urls import reverse
 import json
-import pandas as pd
 from io import BytesIO
 
 
 from accounts.utils import get_permissions
+from accounts.permissions import requires_permission
+from core.routers import reads_from_replica
 from django.contrib.auth import get_user_model
 from accounts.models import UserPermission
-from .models import Seat, SeatCSVUpload, BadgeTemplate
+from .models import Event, Seat, SeatCSVUpload, BadgeTemplate, SeatHistory, parse_seat_number
 from .tasks import process_seat_csv_upload
+from .allocation import allocator_for, allocate_seat
+from .assignment import assign_seats, summarize, validate_attendees
+from .events import EVENT_SESSION_KEY, current_event
+from .payloads import (
+    SEARCH_FIELDS, SEARCH_LIMIT, badge_template_cache_key, badge_template_payload, badge_template_version,
+    search_filter, search_result, upload_status_payload,
+)
+from . import history, prerender
 
+# Rows per page of the manage-seat table.
+SEAT_PAGE_SIZE = 100
 
 
 @login_required
 def dashboard(request):
-    print('request...user', request.user)
     user_permissions = get_permissions(request.user)
     
     context = {
@@ -34,32 +51,84 @@ def dashboard(request):
     return render(request, 'dashboard.html', context)
 
 
+@requires_permission('seats.view')
 @login_required
+@reads_from_replica
 def manage_seat(request):
-    print('request...user', request.user)
+    """
+    The seat table, one page at a time. Query params: q (search), not_printed=1, page.
+    """
     user_permissions = get_permissions(request.user)
+    event = current_event(request)
 
-    seats = Seat.objects.all().select_related().order_by('seat_no')
+    seats = Seat.objects.filter(event=event)
+    query = request.GET.get('q', '').strip()
+    if query:
+        seats = seats.filter(search_filter(query) | Q(seat_no__icontains=query))
+    not_printed = request.GET.get('not_printed') == '1'
+    if not_printed:
+        seats = seats.exclude(print_status=Seat.PrintStatus.PRINTED)
+    page = Paginator(seats.order_by('seat_number', 'seat_no'), SEAT_PAGE_SIZE).get_page(request.GET.get('page'))
     context = {
-        'seats': seats,
+        'event': event,
+        'seats': page,
+        'query': query,
+        'not_printed': not_printed,
         'permissions':  user_permissions.get('seats', [])
     } 
     return render(request, 'manage-seat.html', context)
 
 
+@requires_permission('seats.view')
+@login_required
+@require_http_methods(["GET"])
+@reads_from_replica
+def list_seats(request):
+    """
+    Keyset-paginated seat listing ordered by (seat_number, id).
+    Query params: from, to (seat range), limit, cursor (from a previous next_cursor).
+    """
+    try:
+        limit = min(max(int(request.GET.get('limit', 100)), 1), 500)
+        seats = _seat_range(
+            Seat.objects.filter(event=current_event(request)), request.GET.get('from'), request.GET.get('to')
+        )
 
+        cursor = request.GET.get('cursor')
+        if cursor:
+            after_number, after_id = (int(part) for part in cursor.split(':'))
+            seats = seats.filter(
+                Q(seat_number__gt=after_number) | Q(seat_number=after_number, id__gt=after_id)
+            )
+
+        rows = list(
+            seats.filter(seat_number__isnull=False)
+            .order_by('seat_number', 'id')
+            .values('id', 'seat_no', 'seat_number', 'name', 'email', 'company', 'phone', 'gender', 'print_status')[:limit + 1]
+        )
+    except ValueError as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = f"{rows[-1]['seat_number']}:{rows[-1]['id']}"
+
+    return JsonResponse({'success': True, 'seats': rows, 'next_cursor': next_cursor})
+
+
+
+@requires_permission('seats.create')
 @login_required
 @require_POST
 @csrf_exempt
 def add_seat(request):
-    user_permissions = get_permissions(request.user)
-    if 'create' not in user_permissions.get('seats', []):
-        return JsonResponse({'success': False, 'error': 'No create permission for seats'}, status=403)
-    
     try:
         data = json.loads(request.body)
+        auto_assign = bool(data.get('auto_assign')) and not data.get('seat_no', '').strip()
         
         seat = Seat(
+            event=current_event(request),
             seat_no=data.get('seat_no', '').strip().upper(),
             name=data.get('name', '').strip(),
             email=data.get('email', '').strip(),
@@ -69,8 +138,13 @@ def add_seat(request):
             print_status=Seat.PrintStatus.NOT_PRINTED
         )
         
-        seat.full_clean()  
-        seat.save()
+        seat.full_clean(exclude=['seat_no'] if auto_assign else None)
+        with transaction.atomic():
+            if auto_assign:
+                allocate_seat(seat)
+            else:
+                seat.save()
+            history.record_create(seat, user=request.user)
 
         return JsonResponse({
             'success': True,
@@ -93,18 +167,16 @@ def add_seat(request):
         }, status=400)
     
 
+@requires_permission('seats.edit')
 @login_required
 @require_POST
 @csrf_exempt
 def edit_seat(request):
-    user_permissions = get_permissions(request.user)
-    if 'edit' not in user_permissions.get('seats', []):
-        return JsonResponse({'success': False, 'error': 'No edit permission for seats'}, status=403)
-    
     try:
         data = json.loads(request.body)
         seat_id = data.get('id')
-        seat = get_object_or_404(Seat, id=seat_id)
+        seat = get_object_or_404(Seat, id=seat_id, event=current_event(request))
+        before = history.snapshot(seat)
 
         seat.seat_no = data.get('seat_no', seat.seat_no).upper().strip()
         seat.name = data.get('name', seat.name)
@@ -115,7 +187,10 @@ def edit_seat(request):
         seat.print_status = data.get('print_status', seat.print_status)  # ADD THIS
 
         seat.full_clean()
-        seat.save()
+        with transaction.atomic():
+            seat.save()
+            history.record(seat, SeatHistory.Action.UPDATE,
+                           history.diff(before, history.snapshot(seat)), user=request.user)
 
         return JsonResponse({
             'success': True,
@@ -135,64 +210,379 @@ def edit_seat(request):
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@requires_permission('badges.view')
 @login_required
 def print_badge(request):
     user_permissions = get_permissions(request.user)
     has_print_permission = True if 'print' in user_permissions.get('badges',[]) else False
     return render(request, 'scan-print.html', {'permissions': user_permissions.get('badges',[]),'has_print_permission':has_print_permission})
 
+@requires_permission('users.view')
 @login_required
 def user_management(request):
     user_permissions = get_permissions(request.user)
     return render(request, 'user-management.html',{'permissions': user_permissions.get('users',[])})
 
+@requires_permission('alignment.view')
 @login_required
 def badge_alignment(request):
     user_permissions = get_permissions(request.user)
     return render(request, 'badge-alignment.html', {'permissions': user_permissions.get('alignment',[])})
 
+def _posted_seat_id(request):
+    return int(json.loads(request.body).get('id'))
+
+
+@requires_permission('badges.print')
+@login_required
 @require_POST
 @csrf_exempt
-def print_seat(request):
-    """Mark seat as printed via AJAX."""
+def mark_printed(request):
+    """Mark a seat printed, with its id in the JSON body; see print_seat."""
+    try:
+        seat_id = _posted_seat_id(request)
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return print_seat(request, seat_id)
+
+
+@requires_permission('badges.print')
+@login_required
+@require_POST
+@csrf_exempt
+def reprint_seat(request):
+    """Reprint (same as print, but logs action)"""
+    try:
+        seat_id = _posted_seat_id(request)
+    except (TypeError, ValueError) as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+    return print_seat(request, seat_id)  # Same logic
+
+
+@requires_permission('seats.delete')
+@login_required
+@require_POST
+@csrf_exempt
+def delete_seat(request):
+    """Delete a seat."""
     try:
         data = json.loads(request.body)
         seat_id = data.get('id')
-        seat = get_object_or_404(Seat, id=seat_id)
-        
-        seat.print_status = Seat.PrintStatus.PRINTED
-        seat.save(update_fields=['print_status'])
+        seat = get_object_or_404(Seat, id=seat_id, event=current_event(request))
+        with transaction.atomic():
+            history.record_delete(seat, user=request.user)
+            seat.delete()
+        return JsonResponse({'success': True})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+
+@requires_permission('seats.view')
+@login_required
+@require_http_methods(["GET"])
+def free_seats(request):
+    """Next free seat numbers and the largest contiguous free block."""
+    try:
+        count = min(max(int(request.GET.get('count', 1)), 1), 1000)
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'count must be an integer'}, status=400)
+
+    allocator = allocator_for(current_event(request).id)
+    block_start, block_length = allocator.largest_free_block()
+    first, last = allocator.seat_range
+    return JsonResponse({
+        'success': True,
+        'range': {'from': first, 'to': last},
+        'free_count': allocator.free_count(),
+        'next_free': [f'SEAT-{n}' for n in allocator.next_free(count)],
+        'largest_free_block': {
+            'from': f'SEAT-{block_start}' if block_start is not None else None,
+            'length': block_length,
+        },
+    })
+
+
+@requires_permission('seats.create')
+@login_required
+@require_POST
+@csrf_exempt
+def auto_assign_seats(request):
+    """
+    Seat attendees without seat numbers, keeping each company together.
+    Body: {"attendees": [{name, email, company, phone, gender}, ...],
+           "seat_from": optional, "seat_to": optional, "dry_run": bool}
+    """
+    try:
+        data = json.loads(request.body)
+        attendees = data.get('attendees')
+        if not isinstance(attendees, list) or not all(isinstance(a, dict) for a in attendees):
+            raise ValueError('attendees must be a list of objects')
+
+        errors = validate_attendees(attendees)
+        if errors:
+            return JsonResponse({'success': False, 'error': 'Validation failed', 'errors': errors}, status=400)
+
+        seat_from = _seat_bound(data.get('seat_from'))
+        seat_to = _seat_bound(data.get('seat_to'))
+        dry_run = bool(data.get('dry_run'))
+        placements, unplaced = assign_seats(current_event(request), attendees, seat_from, seat_to,
+                                           dry_run=dry_run, user=request.user)
 
         return JsonResponse({
             'success': True,
-            'message': 'Badge printed successfully.'
+            'dry_run': dry_run,
+            'assigned': len(placements),
+            'unplaced': [{'name': a.get('name'), 'email': a.get('email')} for a in unplaced],
+            'groups': summarize(placements),
+            'seats': [
+                {'seat_no': f'SEAT-{number}', 'name': a.get('name'), 'email': a.get('email'), 'company': a.get('company') or ''}
+                for a, number in sorted(placements, key=lambda p: p[1])
+            ],
         })
     except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
+
+
+@requires_permission('seats.view')
+@login_required
+@require_http_methods(["GET"])
+@reads_from_replica
+def seat_history(request, seat_id):
+    """Change log of one seat, oldest first. Works for deleted seats too."""
+    entries = history.seat_history(current_event(request), seat_id).select_related('changed_by')
+    return JsonResponse({
+        'success': True,
+        'history': [
+            {
+                'at': entry.created_at.isoformat(),
+                'action': entry.action,
+                'source': entry.source,
+                'seat_no': entry.seat_no,
+                'changes': entry.changes,
+                'changed_by': entry.changed_by.email if entry.changed_by else None,
+            }
+            for entry in entries
+        ],
+    })
+
+
+@requires_permission('seats.view')
+@login_required
+@require_http_methods(["GET"])
+@reads_from_replica
+def seats_at(request):
+    """
+    State of all seats (or ?ids=1,2,3) at ?at=<ISO datetime>.
+    """
+    when = parse_datetime(request.GET.get('at', ''))
+    if when is None:
+        return JsonResponse({'success': False, 'error': 'at must be an ISO datetime'}, status=400)
+    if timezone.is_naive(when):
+        when = timezone.make_aware(when)
+
+    try:
+        ids = [int(i) for i in request.GET['ids'].split(',')] if request.GET.get('ids') else None
+    except ValueError:
+        return JsonResponse({'success': False, 'error': 'ids must be comma-separated integers'}, status=400)
+
+    state = history.seats_at(current_event(request), when, seat_ids=ids)
+    return JsonResponse({
+        'success': True,
+        'at': when.isoformat(),
+        'seats': [{'id': seat_id, **values} for seat_id, values in sorted(state.items())],
+    })
+
+
+# Bulk operations
+BULK_EDITABLE_FIELDS = ('name', 'email', 'company', 'phone', 'gender', 'print_status')
+BULK_FILTER_FIELDS = ('print_status', 'company', 'gender', 'email', 'seat_from', 'seat_to')
+
+
+def _validate_seat_patch(patch):
+    """Validate a partial seat update once, returning {field: [errors]} or None."""
+    unknown = set(patch) - set(BULK_EDITABLE_FIELDS)
+    if unknown:
+        return {field: ['Field cannot be bulk edited.'] for field in sorted(unknown)}
+    try:
+        Seat(**patch).clean_fields(exclude=[f.name for f in Seat._meta.fields if f.name not in patch])
+    except ValidationError as e:
+        return e.message_dict
+    return None
+
+
+def _bulk_target_queryset(event, data):
+    """
+    Resolve the seats of `event` a bulk request applies to.
+    Accepts either `ids` (list of seat ids) or `filter` (field → value).
+    """
+    seats = Seat.objects.filter(event=event)
+    if 'ids' in data:
+        ids = data['ids']
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            raise ValueError('ids must be a list of integers')
+        return seats.filter(id__in=ids), ids
+
+    filters = data.get('filter')
+    if not isinstance(filters, dict) or not filters:
+        raise ValueError('Provide either ids or a non-empty filter')
+    unknown = set(filters) - set(BULK_FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported filter fields: {', '.join(sorted(unknown))}")
+    filters = dict(filters)
+    queryset = _seat_range(seats, filters.pop('seat_from', None), filters.pop('seat_to', None))
+    return queryset.filter(**filters), None
+
+
+def _seat_bound(bound):
+    """Parse a range bound given as an int, '250' or 'SEAT-250'; None if blank."""
+    if bound in (None, ''):
+        return None
+    number = parse_seat_number(bound) if isinstance(bound, str) and not bound.isdigit() else int(bound)
+    if number is None:
+        raise ValueError(f'Invalid seat bound: {bound}')
+    return number
+
+
+def _seat_range(queryset, seat_from=None, seat_to=None):
+    """Restrict to an inclusive seat-number range."""
+    for bound, lookup in ((_seat_bound(seat_from), 'seat_number__gte'), (_seat_bound(seat_to), 'seat_number__lte')):
+        if bound is not None:
+            queryset = queryset.filter(**{lookup: bound})
+    return queryset
+
+
+def _record_bulk_update(event, user, before, patch):
+    """Batch-write history for rows (id, seat_no, old values) given one patch."""
+    changes = history.HistoryBuffer(event, user=user, source=SeatHistory.Source.BULK)
+    for row in before:
+        changes.add(row['id'], row['seat_no'], SeatHistory.Action.UPDATE, history.diff(row, patch))
+    changes.flush()
+
+
+def _bulk_results(requested_ids, applied_ids):
+    """Per-item results; ids that matched no seat are reported as not found."""
+    applied = set(applied_ids)
+    ids = requested_ids if requested_ids is not None else applied_ids
+    return [
+        {'id': i, 'success': True} if i in applied
+        else {'id': i, 'success': False, 'error': 'Seat not found'}
+        for i in ids
+    ]
+
+
+@requires_permission('seats.edit')
+@login_required
+@require_POST
+@csrf_exempt
+def bulk_edit_seats(request):
+    """
+    Apply edits to many seats in one transaction.
+    Body: {"ids": [...]} or {"filter": {...}} plus a shared "patch",
+    or {"items": [{"id": 1, "name": ...}, ...]} for per-seat values.
+    """
+    try:
+        data = json.loads(request.body)
+        event = current_event(request)
+
+        if 'items' in data:
+            items = data['items']
+            if not isinstance(items, list) or not all(isinstance(i, dict) and isinstance(i.get('id'), int) for i in items):
+                raise ValueError('items must be a list of objects with an integer id')
+
+            errors = []
+            for item in items:
+                item_errors = _validate_seat_patch({k: v for k, v in item.items() if k != 'id'})
+                if item_errors:
+                    errors.append({'id': item['id'], 'success': False, 'errors': item_errors})
+            if errors:
+                return JsonResponse({'success': False, 'error': 'Validation failed', 'results': errors}, status=400)
+
+            patches = {item['id']: item for item in items}
+            fields = sorted({k for item in items for k in item if k != 'id'})
+            now = timezone.now()
+            changes = history.HistoryBuffer(event, user=request.user, source=SeatHistory.Source.BULK)
+            with transaction.atomic():
+                seats = list(Seat.objects.select_for_update().filter(event=event, id__in=patches))
+                for seat in seats:
+                    before = history.snapshot(seat)
+                    for field in fields:
+                        if field in patches[seat.id]:
+                            setattr(seat, field, patches[seat.id][field])
+                    seat.updated_at = now
+                    changes.add(seat.id, seat.seat_no, SeatHistory.Action.UPDATE, history.diff(before, history.snapshot(seat)))
+                Seat.objects.bulk_update(seats, fields + ['updated_at'])
+                changes.flush()
+            results = _bulk_results([item['id'] for item in items], [s.id for s in seats])
+        else:
+            patch = data.get('patch')
+            if not isinstance(patch, dict) or not patch:
+                raise ValueError('patch must be a non-empty object')
+            errors = _validate_seat_patch(patch)
+            if errors:
+                return JsonResponse({'success': False, 'error': 'Validation failed', 'errors': errors}, status=400)
+
+            queryset, requested_ids = _bulk_target_queryset(event, data)
+            with transaction.atomic():
+                before = list(queryset.select_for_update().values('id', 'seat_no', *patch))
+                applied_ids = [row['id'] for row in before]
+                Seat.objects.filter(id__in=applied_ids).update(**patch, updated_at=timezone.now())
+                _record_bulk_update(event, request.user, before, patch)
+            results = _bulk_results(requested_ids, applied_ids)
+
         return JsonResponse({
-            'success': False,
-            'error': str(e)
-        }, status=400)
+            'success': True,
+            'updated': sum(1 for r in results if r['success']),
+            'results': results,
+        })
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@requires_permission('seats.delete')
 @login_required
 @require_POST
 @csrf_exempt
-def reprint_seat(request):
-    """Reprint (same as print, but logs action)"""
-    return print_seat(request)  # Same logic
+def bulk_delete_seats(request):
+    """Delete many seats by ids or filter in one transaction."""
+    try:
+        data = json.loads(request.body)
+        event = current_event(request)
+        queryset, requested_ids = _bulk_target_queryset(event, data)
+        with transaction.atomic():
+            before = list(queryset.select_for_update().values('id', *history.TRACKED_FIELDS))
+            applied_ids = [row['id'] for row in before]
+            Seat.objects.filter(id__in=applied_ids).delete()
+            changes = history.HistoryBuffer(event, user=request.user, source=SeatHistory.Source.BULK)
+            for row in before:
+                changes.add_delete(row['id'], row)
+            changes.flush()
+        results = _bulk_results(requested_ids, applied_ids)
+        return JsonResponse({'success': True, 'deleted': len(applied_ids), 'results': results})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@requires_permission('seats.edit')
 @login_required
 @require_POST
 @csrf_exempt
-def delete_seat(request):
-    """Delete a seat."""
+def bulk_status_seats(request):
+    """Set print_status on many seats with a single UPDATE."""
     try:
         data = json.loads(request.body)
-        seat_id = data.get('id')
-        seat = get_object_or_404(Seat, id=seat_id)
-        seat.delete()
-        return JsonResponse({'success': True})
+        print_status = data.get('print_status')
+        if print_status not in Seat.PrintStatus.values:
+            raise ValueError(f"print_status must be one of: {', '.join(Seat.PrintStatus.values)}")
+
+        event = current_event(request)
+        queryset, requested_ids = _bulk_target_queryset(event, data)
+        with transaction.atomic():
+            before = list(queryset.select_for_update().values('id', 'seat_no', 'print_status'))
+            applied_ids = [row['id'] for row in before]
+            Seat.objects.filter(id__in=applied_ids).update(print_status=print_status, updated_at=timezone.now())
+            _record_bulk_update(event, request.user, before, {'print_status': print_status})
+        results = _bulk_results(requested_ids, applied_ids)
+        return JsonResponse({'success': True, 'updated': len(applied_ids), 'results': results})
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
@@ -200,6 +590,37 @@ def delete_seat(request):
 
 
 
+@requires_permission('seats.view')
+@login_required
+@require_http_methods(["GET"])
+def list_events(request):
+    """Events that can be worked on, and the one this session is using."""
+    try:
+        current = current_event(request).id
+    except Http404:
+        current = None
+    events = Event.objects.exclude(status=Event.Status.ARCHIVED).values(
+        'id', 'name', 'slug', 'starts_on', 'ends_on', 'status'
+    )
+    return JsonResponse({'success': True, 'current': current, 'events': list(events)})
+
+
+@requires_permission('seats.view')
+@login_required
+@require_POST
+@csrf_exempt
+def select_event(request):
+    """Switch this session to another event. Body: {"slug": "..."}"""
+    try:
+        slug = json.loads(request.body).get('slug')
+        event = Event.objects.exclude(status=Event.Status.ARCHIVED).get(slug=slug)
+    except (ValueError, Event.DoesNotExist):
+        return JsonResponse({'success': False, 'error': 'Unknown event'}, status=400)
+    request.session[EVENT_SESSION_KEY] = event.id
+    return JsonResponse({'success': True, 'event': {'id': event.id, 'name': event.name, 'slug': event.slug}})
+
+
+@requires_permission('seats.upload', 'seats.create')
 @login_required
 @csrf_exempt
 @require_http_methods(["POST"])
@@ -209,11 +630,6 @@ def bulk_upload_seats(request):
     - Small files: processed immediately
     - Large files: offloaded to Celery
     """
-    user_permissions = get_permissions(request.user)
-    # Use 'upload' if you added it, else 'create'
-    if 'upload' not in user_permissions.get('seats', []) and 'create' not in user_permissions.get('seats', []):
-        return JsonResponse({'success': False, 'error': 'No upload/create permission for seats'}, status=403)
-        
     csv_file = request.FILES.get('file')  # <-- matches <input name="file">
     is_large_file = request.POST.get('isLargeFile', 'false').lower() == 'true'
 
@@ -222,9 +638,11 @@ def bulk_upload_seats(request):
 
     # Save upload record
     csv_upload = SeatCSVUpload.objects.create(
+        event=current_event(request),
         file=csv_file,
         status='processing',
-        processed=False
+        processed=False,
+        enqueued_at=timezone.now(),
     )
 
     if is_large_file:
@@ -244,44 +662,35 @@ def bulk_upload_seats(request):
 
 
 # views.py
+@requires_permission('seats.upload', 'seats.create')
 @login_required
 def upload_status(request, upload_id):
     try:
-        upload = SeatCSVUpload.objects.get(id=upload_id)
-        if upload.processed:
-            return JsonResponse({
-                'status': 'completed',
-                'result': {
-                    'added': upload.added or 0,
-                    'updated': upload.updated or 0,
-                    'failed': upload.failed or 0,
-                    'errors': upload.errors or []
-                }
-            })
-        else:
-            return JsonResponse({
-                'status': upload.status,
-                'processed_rows': upload.processed_rows or 0
-            })
+        upload = SeatCSVUpload.objects.get(id=upload_id, event=current_event(request))
+        return JsonResponse(upload_status_payload(upload))
     except SeatCSVUpload.DoesNotExist:
         return JsonResponse({'status': 'not_found'}, status=404)
 
 
 
+@requires_permission('seats.view')
 @login_required
 def download_sample(request):
-    data = {
-        'seat_no': ['SEAT-101', 'SEAT-102'],
-        'name': ['John Doe', 'Jane Smith'],
-        'email': ['john@example.com', 'jane@example.com'],
-        'company': ['TechCorp', 'DesignHub'],
-        'phone': ['+1234567890', '+0987654321'],
-        'gender': ['male', 'female']
-    }
-    df = pd.DataFrame(data)
+    # Imported here so web workers only load openpyxl when a sample is asked for.
+    from openpyxl import Workbook
+
+    rows = [
+        ('seat_no', 'name', 'email', 'company', 'phone', 'gender'),
+        ('SEAT-101', 'John Doe', 'john@example.com', 'TechCorp', '+1234567890', 'male'),
+        ('SEAT-102', 'Jane Smith', 'jane@example.com', 'DesignHub', '+0987654321', 'female'),
+    ]
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = 'Seats'
+    for row in rows:
+        sheet.append(row)
     output = BytesIO()
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        df.to_excel(writer, index=False, sheet_name='Seats')
+    workbook.save(output)
     output.seek(0)
 
     response = HttpResponse(
@@ -293,103 +702,121 @@ def download_sample(request):
 
 
 
+@requires_permission('badges.view', 'seats.view')
 @require_http_methods(["GET"])
+@reads_from_replica
 def search_seats(request):
     query = request.GET.get('q', '').strip()
     if not query or len(query) < 2:
         return JsonResponse({'results': []})
 
     # Search across name, email, company, phone
-    seats = Seat.objects.filter(
-        Q(name__icontains=query) |
-        Q(email__icontains=query) |
-        Q(company__icontains=query) |
-        Q(phone__icontains=query)
-    ).values('id', 'seat_no', 'name', 'email', 'company', 'phone', 'print_status')[:10]
-
-    results = [
-        {
-            'id': s['id'],
-            'seat_no': s['seat_no'],
-            'name': s['name'],
-            'email': s['email'],
-            'company': s['company'] or '',
-            'phone': s['phone'] or '',
-            'print_status': s['print_status'],
-            'print_status_display': s['print_status'] == 'printed' and 'Printed' or 'Not Printed'
-        }
-        for s in seats
-    ]
-    return JsonResponse({'results': results})
+    seats = Seat.objects.filter(event=current_event(request)).filter(search_filter(query)).values(*SEARCH_FIELDS)[:SEARCH_LIMIT]
+    return JsonResponse({'results': [search_result(s) for s in seats]})
 
 
+@requires_permission('badges.print')
 @require_http_methods(["POST"])
 @login_required
 def print_seat(request, seat_id):
     try:
-        seat = Seat.objects.get(id=seat_id)
-        seat.print_status = "printed"
-        seat.save()
+        seat = Seat.objects.get(id=seat_id, event=current_event(request))
+        previous_status = seat.print_status
+        seat.print_status = Seat.PrintStatus.PRINTED
+        with transaction.atomic():
+            seat.save(update_fields=['print_status', 'updated_at'])
+            history.record(seat, SeatHistory.Action.PRINT,
+                           {'print_status': [previous_status, seat.print_status]}, user=request.user)
 
         return JsonResponse({
             "success": True,
             "seat_no": seat.seat_no,
-            "name":    seat.name
+            "name":    seat.name,
+            "badge_url": reverse('seats:seat_badge', args=[seat.id]),
         })
     except Seat.DoesNotExist:
         return JsonResponse({"success": False, "error": "Seat not found"}, status=404)
-    
 
 
+@requires_permission('badges.print')
+@require_http_methods(["GET"])
+@login_required
+def seat_badge(request, seat_id):
+    """The seat's print-ready badge as SVG: pre-rendered, or drawn now if not ready yet."""
+    event = current_event(request)
+    try:
+        seat = Seat.objects.get(id=seat_id, event=event)
+    except Seat.DoesNotExist:
+        return JsonResponse({"success": False, "error": "Seat not found"}, status=404)
+    path = prerender.badge_path(event, seat)
+    if path is None:
+        return JsonResponse({'success': False, 'error': 'No template found'}, status=404)
+    # A badge is well under a kilobyte: read it whole rather than stream it.
+    with open(path, 'rb') as f:
+        return HttpResponse(f.read(), content_type='image/svg+xml')
+
+
+
+@requires_permission('alignment.edit')
 @csrf_exempt
 @require_http_methods(["POST"])
 @login_required
 def save_badge_template(request):
     try:
         data = json.loads(request.body)
-        template = BadgeTemplate.objects.order_by('-created_at').first()
-
-        if not template:
-            template = BadgeTemplate(created_by=request.user)
-        else:
-            # Don't allow editing others' templates unless admin
-            if template.created_by != request.user and not request.user.is_staff:
-                return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
-
-        template.name = data.get('name', template.name)
-        template.position_x = int(data.get('position_x', template.position_x))
-        template.position_y = int(data.get('position_y', template.position_y))
-        template.font_size = int(data.get('font_size', template.font_size))
-        template.is_bold = data.get('is_bold', template.is_bold)
-        template.text_align = data.get('text_align', template.text_align)
-        template.page_width_mm = int(data.get('page_width_mm', template.page_width_mm))
-        template.page_height_mm = int(data.get('page_height_mm', template.page_height_mm))
-        template.created_by = request.user
+        event = current_event(request)
+        current = event.badge_template_version and BadgeTemplate.objects.filter(
+            event=event, version=event.badge_template_version).first()
+
+        # Don't allow editing others' templates unless admin
+        if current and current.created_by_id != request.user.id and not request.user.is_staff:
+            return JsonResponse({'success': False, 'error': 'Permission denied'}, status=403)
+
+        # Versions are immutable: the edit becomes the next version, starting
+        # from the current one.
+        template = BadgeTemplate(event=event, created_by=request.user)
+        base = current or template
+        template.name = data.get('name', base.name)
+        template.position_x = int(data.get('position_x', base.position_x))
+        template.position_y = int(data.get('position_y', base.position_y))
+        template.font_size = int(data.get('font_size', base.font_size))
+        template.is_bold = data.get('is_bold', base.is_bold)
+        template.text_align = data.get('text_align', base.text_align)
+        template.page_width_mm = int(data.get('page_width_mm', base.page_width_mm))
+        template.page_height_mm = int(data.get('page_height_mm', base.page_height_mm))
         template.save()
 
-        return JsonResponse({'success': True, 'id': template.id})
+        return JsonResponse({
+            'success': True, 'id': template.id, 'version': template.version, 'plan': template.render_plan,
+        })
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)}, status=400)
 
 
+@requires_permission('alignment.view', 'badges.print')
 @require_http_methods(["GET"])
 @login_required
 def get_badge_template(request):
-    template = BadgeTemplate.objects.order_by('-created_at').first()
-    if not template:
-        return JsonResponse({'success': False, 'error': 'No template found'})
-    return JsonResponse({
-        'success': True,
-        'template': {
-            'position_x': template.position_x,
-            'position_y': template.position_y,
-            'font_size': template.font_size,
-            'is_bold': template.is_bold,
-            'text_align': template.text_align,
-            'page_width_mm': template.page_width_mm,
-            'page_height_mm': template.page_height_mm,
-        }
-    })
+    event = current_event(request)
+    version = badge_template_version(request, event)
+    key = badge_template_cache_key(event.id, version)
+    payload = cache.get(key) if version else None
+    if payload is None:
+        template = version and BadgeTemplate.objects.filter(event=event, version=version).first()
+        if not template:
+            return JsonResponse({'success': False, 'error': 'No template found'})
+        payload = badge_template_payload(template)
+        cache.set(key, payload, None)
+    return JsonResponse({'success': True, 'template': payload})
+
+
+@requires_permission('seats.view', 'badges.view')
+@require_http_methods(["GET"])
+@login_required
+def seat_feed(request):
+    # The live feed needs the ASGI app; 204 tells EventSource clients under
+    # WSGI to stop reconnecting.
+    return HttpResponse(status=204)
 
 
 
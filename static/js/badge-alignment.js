@@ -0,0 +1,295 @@
+// URLs and permissions come from data-* attributes on this page's <script> tag.
+const pageConfig = document.currentScript.dataset;
+
+document.addEventListener('DOMContentLoaded', function () {
+    const badgePreview = document.getElementById('badgePreview');
+    const seatField = document.getElementById('seatField');
+    const seatValue = document.getElementById('seatValue');
+    const printSeat = document.getElementById('printSeat');
+    const printContainer = document.getElementById('printContainer');
+    const fontSizeSlider = document.getElementById('fontSizeSlider');
+    const fontSizeLabel = document.getElementById('fontSizeLabel');
+    const boldToggle = document.getElementById('boldToggle');
+    const alignButtons = document.querySelectorAll('.btn-toggle[data-align]');
+    const posButtons = document.querySelectorAll('.btn-toggle[data-pos]');
+    const sizeOptions = document.querySelectorAll('.size-option');
+    const offsetX = document.getElementById('offsetX');
+    const offsetY = document.getElementById('offsetY');
+    const applyPosBtn = document.getElementById('applyPos');
+    const printBtn = document.getElementById('printBtn');
+    const saveBtn = document.getElementById('saveBtn');
+    const resetBtn = document.getElementById('resetBtn');
+    const badgeSizeEl = document.querySelector('.badge-size');
+
+    // State variables
+    let currentPageWidth = 105;
+    let currentPageHeight = 148;
+    // The saved version being edited; printing draws from its render plan.
+    let savedTemplate = null;
+
+    // Load saved template
+    function loadTemplate() {
+        fetch(pageConfig.getTemplateUrl)
+            .then(r => r.json())
+            .then(data => {
+                if (data.success) {
+                    const t = data.template;
+                    savedTemplate = t;
+                    seatField.style.left = t.position_x + 'px';
+                    seatField.style.top = t.position_y + 'px';
+                    offsetX.value = t.position_x;
+                    offsetY.value = t.position_y;
+
+                    seatValue.style.fontSize = t.font_size + 'px';
+                    fontSizeSlider.value = t.font_size;
+                    fontSizeLabel.textContent = t.font_size;
+
+                    seatValue.style.fontWeight = t.is_bold ? 'bold' : 'normal';
+                    boldToggle.classList.toggle('active', t.is_bold);
+
+                    seatValue.style.textAlign = t.text_align;
+                    alignButtons.forEach(b => b.classList.toggle('active', b.dataset.align === t.text_align));
+
+                    currentPageWidth = t.page_width_mm;
+                    currentPageHeight = t.page_height_mm;
+                    updatePageSize();
+                }
+            });
+    }
+    loadTemplate();
+
+    // Initialize position
+    seatField.style.left = '20px';
+    seatField.style.top = '20px';
+
+    // DRAGGING
+    let isDragging = false;
+    let dragOffsetX, dragOffsetY;
+
+    seatField.addEventListener('mousedown', (e) => {
+        isDragging = true;
+        const rect = seatField.getBoundingClientRect();
+        dragOffsetX = e.clientX - rect.left;
+        dragOffsetY = e.clientY - rect.top;
+        seatField.style.cursor = 'grabbing';
+        e.preventDefault();
+    });
+
+    document.addEventListener('mousemove', (e) => {
+        if (!isDragging) return;
+        const badgeRect = badgePreview.getBoundingClientRect();
+        const x = e.clientX - badgeRect.left - dragOffsetX;
+        const y = e.clientY - badgeRect.top - dragOffsetY;
+
+        const maxX = badgeRect.width - seatField.offsetWidth;
+        const maxY = badgeRect.height - seatField.offsetHeight;
+        const finalX = Math.max(0, Math.min(x, maxX));
+        const finalY = Math.max(0, Math.min(y, maxY));
+
+        seatField.style.left = Math.round(finalX) + 'px';
+        seatField.style.top = Math.round(finalY) + 'px';
+        offsetX.value = Math.round(finalX);
+        offsetY.value = Math.round(finalY);
+        posButtons.forEach(btn => btn.classList.remove('active'));
+    });
+
+    document.addEventListener('mouseup', () => {
+        if (isDragging) {
+            isDragging = false;
+            seatField.style.cursor = 'move';
+        }
+    });
+
+    // Apply manual position
+    applyPosBtn.addEventListener('click', () => {
+        let x = parseInt(offsetX.value) || 0;
+        let y = parseInt(offsetY.value) || 0;
+        const badgeRect = badgePreview.getBoundingClientRect();
+        x = Math.max(0, Math.min(x, badgeRect.width - seatField.offsetWidth));
+        y = Math.max(0, Math.min(y, badgeRect.height - seatField.offsetHeight));
+        seatField.style.left = x + 'px';
+        seatField.style.top = y + 'px';
+        offsetX.value = x;
+        offsetY.value = y;
+        posButtons.forEach(btn => btn.classList.remove('active'));
+    });
+
+    // Position presets
+    posButtons.forEach(btn => {
+        btn.addEventListener('click', () => {
+            posButtons.forEach(b => b.classList.remove('active'));
+            btn.classList.add('active');
+            const [x, y] = btn.dataset.pos.split(',').map(Number);
+            seatField.style.left = x + 'px';
+            seatField.style.top = y + 'px';
+            offsetX.value = x;
+            offsetY.value = y;
+        });
+    });
+
+    // Text alignment
+    alignButtons.forEach(btn => {
+        btn.addEventListener('click', () => {
+            alignButtons.forEach(b => b.classList.remove('active'));
+            btn.classList.add('active');
+            seatValue.style.textAlign = btn.dataset.align;
+        });
+    });
+
+    // Font size
+    fontSizeSlider.addEventListener('input', () => {
+        const size = fontSizeSlider.value;
+        seatValue.style.fontSize = size + 'px';
+        fontSizeLabel.textContent = size;
+    });
+
+    // Bold toggle
+    boldToggle.addEventListener('click', () => {
+        boldToggle.classList.toggle('active');
+        seatValue.style.fontWeight = boldToggle.classList.contains('active') ? 'bold' : 'normal';
+    });
+
+    // Page size
+    sizeOptions.forEach(opt => {
+        opt.addEventListener('click', () => {
+            sizeOptions.forEach(o => o.classList.remove('active'));
+            opt.classList.add('active');
+
+            if (opt.dataset.size === 'custom') {
+                currentPageWidth = parseInt(document.getElementById('customWidth').value) || 105;
+                currentPageHeight = parseInt(document.getElementById('customHeight').value) || 148;
+                badgeSizeEl.textContent = `Custom (${currentPageWidth} × ${currentPageHeight} mm)`;
+            } else {
+                currentPageWidth = parseInt(opt.dataset.w);
+                currentPageHeight = parseInt(opt.dataset.h);
+                badgeSizeEl.textContent = `${opt.dataset.size.toUpperCase()} (${currentPageWidth} × ${currentPageHeight} mm)`;
+            }
+
+            badgePreview.style.width = currentPageWidth + 'mm';
+            badgePreview.style.height = currentPageHeight + 'mm';
+            printContainer.style.width = currentPageWidth + 'mm';
+            printContainer.style.height = currentPageHeight + 'mm';
+        });
+    });
+
+    // The layout as edited, in the fields a template version stores
+    function currentLayout() {
+        return {
+            position_x: parseInt(seatField.style.left) || 0,
+            position_y: parseInt(seatField.style.top) || 0,
+            font_size: parseInt(fontSizeSlider.value),
+            is_bold: boldToggle.classList.contains('active'),
+            text_align: seatValue.style.textAlign || 'left',
+            page_width_mm: currentPageWidth,
+            page_height_mm: currentPageHeight
+        };
+    }
+
+    // PRINT: badges print from the saved version's plan, as at the kiosk
+    printBtn.addEventListener('click', () => {
+        const layout = currentLayout();
+        if (!savedTemplate || Object.keys(layout).some(k => layout[k] !== savedTemplate[k])) {
+            alert('Save the layout first: badges print from the saved version.');
+            return;
+        }
+        applyBadgePlan(printContainer, printSeat, savedTemplate.plan, seatValue.textContent);
+        window.print();
+    });
+
+    // SAVE VIA AJAX
+   saveBtn.addEventListener('click', () => {
+        const data = currentLayout();
+
+        fetch(pageConfig.saveTemplateUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': document.querySelector('[name=csrfmiddlewaretoken]').value
+            },
+            body: JSON.stringify(data)
+        })
+        .then(r => {
+            if (!r.ok) throw new Error(`HTTP ${r.status}`);
+            return r.json();
+        })
+        .then(res => {
+            if (res.success) savedTemplate = Object.assign(data, {version: res.version, plan: res.plan});
+            alert(res.success ? `Template saved as version ${res.version}` : 'Error: ' + (res.error || ''));
+        })
+        .catch(error => {
+            console.error('Save failed:', error);
+            alert('Failed to save. Check console.');
+        });
+    });
+
+    // Reset
+    resetBtn.addEventListener('click', () => {
+        if (confirm('Reset to default layout?')) {
+            seatField.style.left = '20px';
+            seatField.style.top = '20px';
+            offsetX.value = 20;
+            offsetY.value = 20;
+            posButtons.forEach(b => b.classList.remove('active'));
+            document.querySelector('.btn-toggle[data-pos="20,20"]').classList.add('active');
+
+            seatValue.style.textAlign = 'left';
+            alignButtons.forEach(b => b.classList.remove('active'));
+            document.querySelector('.btn-toggle[data-align="left"]').classList.add('active');
+
+            seatValue.style.fontSize = '24px';
+            seatValue.style.fontWeight = 'normal';
+            fontSizeSlider.value = 24;
+            fontSizeLabel.textContent = '24';
+            boldToggle.classList.remove('active');
+
+            sizeOptions.forEach(o => o.classList.remove('active'));
+            document.querySelector('.size-option[data-size="A6"]').classList.add('active');
+            currentPageWidth = 105;
+            currentPageHeight = 148;
+            badgePreview.style.width = '105mm';
+            badgePreview.style.height = '148mm';
+            printContainer.style.width = '105mm';
+            printContainer.style.height = '148mm';
+            badgeSizeEl.textContent = 'A6 (105 × 148 mm)';
+
+            alert('Reset complete!');
+        }
+    });
+
+    // Helper: Get CSRF token (Django)
+    function getCookie(name) {
+        let cookieValue = null;
+        if (document.cookie && document.cookie !== '') {
+            const cookies = document.cookie.split(';');
+            for (let i = 0; i < cookies.length; i++) {
+                const cookie = cookies[i].trim();
+                if (cookie.substring(0, name.length + 1) === (name + '=')) {
+                    cookieValue = decodeURIComponent(cookie.substring(name.length + 1));
+                    break;
+                }
+            }
+        }
+        return cookieValue;
+    }
+
+
+
+
+    // Custom size toggle
+    document.querySelector('[data-size="custom"]').addEventListener('click', () => {
+        customSizeInputs.classList.add('show');
+    });
+    sizeOptions.forEach(opt => {
+        if (opt.dataset.size !== 'custom') {
+            opt.addEventListener('click', () => {
+                customSizeInputs.classList.remove('show');
+            });
+        }
+    });
+
+    function updatePageSize() {
+        badgePreview.style.width = currentPageWidth + 'mm';
+        badgePreview.style.height = currentPageHeight + 'mm';
+        badgeSizeEl.textContent = `Custom (${currentPageWidth} × ${currentPageHeight} mm)`;
+    }
+});
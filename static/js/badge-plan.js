@@ -0,0 +1,19 @@
+// Lays a badge out from its template's compiled render plan (see
+// seatalignment/badges.py), so print clients draw exactly what the server
+// renders and never redo the px/mm arithmetic themselves.
+function applyBadgePlan(page, seatEl, plan, seatNo) {
+    page.style.width = plan.page.width_mm + 'mm';
+    page.style.height = plan.page.height_mm + 'mm';
+
+    // The plan's offsets already include the text padding.
+    const text = plan.seat_no;
+    seatEl.textContent = seatNo;
+    seatEl.style.position = 'absolute';
+    seatEl.style.padding = '0';
+    seatEl.style.left = text.x_mm + 'mm';
+    seatEl.style.top = text.y_mm + 'mm';
+    seatEl.style.fontFamily = text.font_family;
+    seatEl.style.fontSize = text.font_size_mm + 'mm';
+    seatEl.style.fontWeight = text.font_weight;
+    seatEl.style.whiteSpace = 'nowrap';
+}
@@ -0,0 +1,531 @@
+// URLs and permissions come from data-* attributes on this page's <script> tag.
+const pageConfig = document.currentScript.dataset;
+
+    // ==== 1. DOM-only search + filter (replace renderTable) ====
+    const searchInput      = document.getElementById('searchInput');
+    const filterNotPrinted = document.getElementById('filterNotPrinted');
+    const tableBody        = document.getElementById('seatTableBody');
+    const noDataMessage    = document.getElementById('noDataMessage');
+
+    function filterTable() {
+        const term      = searchInput.value.toLowerCase().trim();
+        const onlyNotPrinted = filterNotPrinted.checked;
+        let visible = 0;
+
+        document.querySelectorAll('#seatTableBody tr[data-id]').forEach(row => {
+            const seatNo  = row.cells[0].textContent.toLowerCase();
+            const name    = row.cells[1].textContent.toLowerCase();
+            const email   = row.cells[2].textContent.toLowerCase();
+            const company = row.cells[3].textContent.toLowerCase();
+            const printed = row.cells[6].querySelector('.badge.bg-success') !== null;
+
+            const matchSearch = seatNo.includes(term) ||
+                                name.includes(term) ||
+                                email.includes(term) ||
+                                company.includes(term);
+            const matchFilter = onlyNotPrinted ? !printed : true;
+
+            if (matchSearch && matchFilter) {
+                row.style.display = '';
+                visible++;
+            } else {
+                row.style.display = 'none';
+            }
+        });
+
+        noDataMessage.classList.toggle('d-none', visible > 0);
+    }
+
+    // Typing narrows the rows on this page; Enter searches the whole event.
+    searchInput.addEventListener('input', filterTable);
+    filterNotPrinted.addEventListener('change', () => filterNotPrinted.form.submit());
+    filterTable();   // initial run
+
+    // ==== 2. CSRF helper (keep if you already have it) ====
+    function getCsrfToken() {
+        return document.querySelector('[name=csrfmiddlewaretoken]').value;
+    }
+
+    // ==== 3. ALL AJAX HANDLERS (Add / Print / Reprint / Edit / Delete) ====
+    // ---- Add new seat -------------------------------------------------
+    document.getElementById('saveAddBtn')?.addEventListener('click', function () {
+        const payload = {
+            seat_no: document.getElementById('addSeatNo').value.trim(),
+            name   : document.getElementById('addName').value.trim(),
+            email  : document.getElementById('addEmail').value.trim(),
+            company: document.getElementById('addCompany').value.trim(),
+            phone  : document.getElementById('addPhone').value.trim(),
+            gender : document.getElementById('addGender').value,
+        };
+        payload.auto_assign = !payload.seat_no;
+
+        if (!payload.name || !payload.email) {
+            alert('Name and Email are required.');
+            return;
+        }
+
+        fetch(pageConfig.addSeatUrl, {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': getCsrfToken()
+            },
+            body: JSON.stringify(payload)
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (data.success) {
+                // ---- prepend new row (same HTML Django would render) ----
+                const row = document.createElement('tr');
+                row.dataset.id = data.seat.id;
+                row.innerHTML = `
+                    <td>${data.seat.seat_no}</td>
+                    <td>${data.seat.name}</td>
+                    <td>${data.seat.email}</td>
+                    <td>${data.seat.company || '—'}</td>
+                    <td>${data.seat.phone || '—'}</td>
+                    <td>${data.seat.gender}</td>
+                    <td class="status-cell">
+                        <span class="badge bg-warning text-dark">Not Printed</span>
+                    </td>
+                    <td>
+                        <div class="print-action-group d-flex gap-1">
+                            <button class="btn btn-sm btn-outline-success print-btn"   data-id="${data.seat.id}" title="Print">Print</button>
+                            <button class="btn btn-sm btn-outline-secondary reprint-btn" data-id="${data.seat.id}" title="Reprint">Reprint</button>
+                            <button class="btn btn-sm btn-outline-primary edit-btn"   data-id="${data.seat.id}" title="Edit">Edit</button>
+                            <button class="btn btn-sm btn-outline-danger delete-btn"  data-id="${data.seat.id}" title="Delete">Delete</button>
+                        </div>
+                    </td>`;
+                tableBody.querySelector(`tr[data-id="${data.seat.id}"]`)?.remove();   // already added by the live feed
+                tableBody.insertBefore(row, tableBody.firstChild);
+                attachButtonListeners(row);          // <-- re-attach for new row
+                filterTable();                       // refresh visibility
+                bootstrap.Modal.getInstance(document.getElementById('addSeatModal')).hide();
+                document.getElementById('addSeatForm').reset();
+            } else {
+                alert('Error: ' + data.error);
+            }
+        });
+    });
+
+
+    // handle print
+
+ let currentPrintSeat = null;
+
+function handlePrint(e) {
+    const btn = e.target.closest('button');
+    const row = btn.closest('tr');
+    const id = row.dataset.id;
+
+    currentPrintSeat = {
+        id: id,
+        seat_no: row.cells[0].textContent.trim(),
+        name: row.cells[1].textContent.trim(),
+        company: row.cells[3].textContent.trim() === '—' ? '' : row.cells[3].textContent.trim()
+    };
+
+    // Fill preview
+    document.getElementById('previewSeatNo').textContent = currentPrintSeat.seat_no;
+    document.getElementById('previewName').textContent = currentPrintSeat.name;
+    document.getElementById('previewCompany').textContent = currentPrintSeat.company || '—';
+
+    // Show modal
+    new bootstrap.Modal(document.getElementById('printPreviewModal')).show();
+}
+
+// Reuse for Reprint
+function handleReprint(e) { handlePrint(e); }
+
+// Confirm Print
+document.getElementById('confirmPrintBtn').addEventListener('click', function () {
+    if (!currentPrintSeat) return;
+
+    const isReprint = document.activeElement?.classList.contains('reprint-btn');
+
+    // Update DB only on first print
+    if (!isReprint) {
+
+        fetch(pageConfig.printSeatUrl.replace('0', currentPrintSeat.id), {
+            method: 'POST',
+            headers: {
+                'X-CSRFToken': getCsrfToken(),
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        })
+
+        .then(r => r.json())
+        .then(d => {
+            if (d.success) {
+                const row = document.querySelector(`tr[data-id="${currentPrintSeat.id}"]`);
+                const badge = row.querySelector('.badge');
+                badge.className = 'badge bg-success';
+                badge.textContent = 'Printed';
+                filterTable();
+            }
+        });
+    }
+
+    // Print
+    window.print();
+
+    // Close modal
+    bootstrap.Modal.getInstance(document.getElementById('printPreviewModal')).hide();
+    currentPrintSeat = null;
+});
+
+
+    // ---- Edit --------------------------------------------------------
+    function handleEdit(e) {
+    const row = e.target.closest('tr');
+    const id = row.dataset.id;
+
+    document.getElementById('editId').value = id;
+    document.getElementById('editSeatNo').value = row.cells[0].textContent.trim();
+    document.getElementById('editName').value = row.cells[1].textContent.trim();
+    document.getElementById('editEmail').value = row.cells[2].textContent.trim();
+
+    // Company & Phone: remove "—" if present
+    const company = row.cells[3].textContent.trim();
+    const phone = row.cells[4].textContent.trim();
+    document.getElementById('editCompany').value = company === '—' ? '' : company;
+    document.getElementById('editPhone').value = phone === '—' ? '' : phone;
+
+    // Gender: map display → value
+    const genderMap = {
+        'Male': 'male',
+        'Female': 'female',
+        'Other': 'other',
+        'Prefer not to say': 'prefer_not_to_say',
+        '': ''
+    };
+    const genderDisplay = row.cells[5].textContent.trim();
+    document.getElementById('editGender').value = genderMap[genderDisplay] || '';
+
+    // Print Status: map badge text → value
+    const printBadge = row.querySelector('.badge');
+    const printStatus = printBadge?.textContent.trim() === 'Printed' ? 'printed' : 'not_printed';
+    document.getElementById('editPrintStatus').value = printStatus;
+
+    new bootstrap.Modal(document.getElementById('editModal')).show();
+}
+
+document.getElementById('saveEditBtn')?.addEventListener('click', function () {
+    const payload = {
+        id: document.getElementById('editId').value,
+        seat_no: document.getElementById('editSeatNo').value.trim(),
+        name: document.getElementById('editName').value.trim(),
+        email: document.getElementById('editEmail').value.trim(),
+        company: document.getElementById('editCompany').value.trim(),
+        phone: document.getElementById('editPhone').value.trim(),
+        gender: document.getElementById('editGender').value,
+        print_status: document.getElementById('editPrintStatus').value  // ADD THIS
+    };
+
+    fetch(pageConfig.editSeatUrl, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCsrfToken() },
+        body: JSON.stringify(payload)
+    })
+    .then(r => r.json())
+    .then(d => {
+        if (d.success) {
+            const row = document.querySelector(`tr[data-id="${d.seat.id}"]`);
+            row.cells[0].textContent = d.seat.seat_no;
+            row.cells[1].textContent = d.seat.name;
+            row.cells[2].textContent = d.seat.email;
+            row.cells[3].textContent = d.seat.company || '—';
+            row.cells[4].textContent = d.seat.phone || '—';
+            row.cells[5].textContent = d.seat.get_gender_display || d.seat.gender;
+
+            // Update Print Status Badge
+            const statusCell = row.cells[6];
+            const badge = statusCell.querySelector('.badge');
+            if (d.seat.print_status === 'printed') {
+                badge.className = 'badge bg-success';
+                badge.textContent = 'Printed';
+            } else {
+                badge.className = 'badge bg-warning text-dark';
+                badge.textContent = 'Not Printed';
+            }
+
+            filterTable();
+            bootstrap.Modal.getInstance(document.getElementById('editModal')).hide();
+        } else {
+            alert('Error: ' + (d.error || 'Unknown'));
+        }
+    })
+    .catch(err => {
+        console.error(err);
+        alert('Network error');
+    });
+});
+
+    // ---- Delete -------------------------------------------------------
+    function handleDelete(e) {
+        if (!confirm('Delete this seat permanently?')) return;
+        const id = e.target.closest('button').dataset.id;
+
+        fetch(pageConfig.deleteSeatUrl, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json', 'X-CSRFToken': getCsrfToken() },
+            body: JSON.stringify({ id })
+        })
+        .then(r => r.json())
+        .then(d => {
+            if (d.success) {
+                e.target.closest('tr').remove();
+                filterTable();
+            } else alert(d.error);
+        });
+    }
+
+    // ---- Helper: attach listeners to a row (used for newly added rows) ----
+    function attachButtonListeners(row) {
+        row.querySelector('.print-btn')?.addEventListener('click', handlePrint);
+        row.querySelector('.reprint-btn')?.addEventListener('click', handleReprint);
+        row.querySelector('.edit-btn')?.addEventListener('click', handleEdit);
+        row.querySelector('.delete-btn')?.addEventListener('click', handleDelete);
+    }
+
+    // ---- Attach to **all** existing rows on page load -----------------
+    document.querySelectorAll('#seatTableBody tr[data-id]').forEach(attachButtonListeners);
+
+    // ---- (Optional) Excel download / upload placeholders ----------------
+    document.getElementById('downloadSample')?.addEventListener('click', e => {
+        e.preventDefault();
+        alert('Download sample Excel…');
+    });
+    // document.getElementById('uploadBtn')?.addEventListener('click', () => {
+    //     const file = document.getElementById('seatFile')?.files[0];
+    //     if (!file) return alert('Select a file first.');
+    //     alert(`Would upload: ${file.name}`);
+    // });
+
+
+// CSRF Token
+    function getCsrfToken() {
+    return document.querySelector('meta[name="csrf-token"]')?.content ||
+           document.querySelector('[name=csrfmiddlewaretoken]')?.value;
+}
+
+    document.getElementById('uploadBtn')?.addEventListener('click', function () {
+    const fileInput = document.getElementById('seatFile');
+    const file = fileInput.files[0];
+    const progressDiv = document.getElementById('uploadProgress');
+    const uploadText = this.querySelector('.upload-text');
+    const spinner = this.querySelector('.spinner-border');
+
+    if (!file) {
+        alert('Please select a file.');
+        return;
+    }
+
+    const isLargeFile = file.size > 5 * 1024 * 1024;
+    const formData = new FormData();
+    formData.append('file', file);
+    if (isLargeFile) formData.append('isLargeFile', 'true');
+
+    // UI: Show loading
+    uploadText.classList.add('d-none');
+    spinner.classList.remove('d-none');
+    progressDiv.innerHTML = '<div class="text-primary">Uploading and processing...</div>';
+    this.disabled = true;
+
+    fetch(pageConfig.bulkUploadUrl, {
+        method: 'POST',
+        headers: {
+            'X-CSRFToken': getCsrfToken()
+        },
+        body: formData
+    })
+    .then(response => {
+        // CRITICAL: Check if HTTP status is OK
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+        }
+        return response.json();  // Only parse if OK
+    })
+    .then(data => {
+        // SUCCESS PATH
+        uploadText.classList.remove('d-none');
+        spinner.classList.add('d-none');
+        this.disabled = false;
+        fileInput.value = '';
+
+        if (data.success) {
+            const msg = `Success: ${data.added} added, ${data.updated} updated, ${data.failed} failed.`;
+            progressDiv.innerHTML = `<div class="text-success">${msg}</div>`;
+
+            if (data.errors?.length > 0) {
+                const list = data.errors.map(e => `<li>Row ${e.row}: ${e.error}</li>`).join('');
+                progressDiv.innerHTML += `
+                    <details class="mt-2">
+                        <summary class="text-danger">View ${data.errors.length} errors</summary>
+                        <ul class="text-danger small">${list}</ul>
+                    </details>`;
+            }
+
+            // Without the live feed, refresh to pick up the imported rows
+            if (!feedConnected) setTimeout(() => location.reload(), 1500);
+        } else {
+            progressDiv.innerHTML = `<div class="text-danger">Error: ${data.error || 'Unknown error'}</div>`;
+        }
+    })
+    .catch(error => {
+        // ONLY network or parsing errors
+        console.error('Upload error:', error);
+        progressDiv.innerHTML = `<div class="text-danger">Network error: ${error.message}</div>`;
+        uploadText.classList.remove('d-none');
+        spinner.classList.add('d-none');
+        this.disabled = false;
+    });
+});
+
+    // ---- Re-attach button listeners after reload (if using AJAX refresh) ----
+    function attachButtonListeners(row) {
+        row.querySelector('.print-btn')?.addEventListener('click', handlePrint);
+        row.querySelector('.reprint-btn')?.addEventListener('click', handleReprint);
+        row.querySelector('.edit-btn')?.addEventListener('click', handleEdit);
+        row.querySelector('.delete-btn')?.addEventListener('click', handleDelete);
+    }
+
+    // Attach to existing rows
+    document.querySelectorAll('#seatTableBody tr[data-id]').forEach(attachButtonListeners);
+
+    /* ==============================================================
+    LIVE FEED: apply seat changes made at other stations
+    ============================================================== */
+    const canEdit   = pageConfig.canEdit === 'true';
+    const canDelete = pageConfig.canDelete === 'true';
+    const genderLabels = { male: 'Male', female: 'Female', other: 'Other', prefer_not_to_say: 'Prefer not to say' };
+    const feedColumns  = { seat_no: 0, name: 1, email: 2, company: 3, phone: 4, gender: 5 };
+    let feedConnected = false;
+    let reloadTimer = null;
+
+    function setStatusBadge(row, status) {
+        const badge = row.cells[6].querySelector('.badge');
+        if (status === 'printed') {
+            badge.className = 'badge bg-success';
+            badge.textContent = 'Printed';
+        } else {
+            badge.className = 'badge bg-warning text-dark';
+            badge.textContent = 'Not Printed';
+        }
+    }
+
+    function patchRow(row, changes) {
+        Object.entries(changes).forEach(([field, [, value]]) => {
+            if (field === 'print_status') {
+                setStatusBadge(row, value);
+            } else if (field === 'gender') {
+                row.cells[5].textContent = genderLabels[value] || '';
+            } else if (field in feedColumns) {
+                row.cells[feedColumns[field]].textContent = value || '';
+            }
+        });
+    }
+
+    function insertRow(id, changes) {
+        const row = document.createElement('tr');
+        row.dataset.id = id;
+        for (let i = 0; i < 6; i++) row.insertCell();
+        row.insertCell().innerHTML = '<span class="badge bg-warning text-dark">Not Printed</span>';
+        row.cells[6].className = 'status-cell';
+        const actions = document.createElement('div');
+        actions.className = 'print-action-group d-flex gap-1';
+        [['print-btn', 'btn-outline-success', 'Print', canEdit],
+         ['reprint-btn', 'btn-outline-secondary', 'Reprint', canEdit],
+         ['edit-btn', 'btn-outline-primary', 'Edit', canEdit],
+         ['delete-btn', 'btn-outline-danger', 'Delete', canDelete]].forEach(([cls, style, label, allowed]) => {
+            const btn = document.createElement('button');
+            btn.className = `btn btn-sm ${style} ${cls}`;
+            btn.dataset.id = id;
+            btn.title = label;
+            btn.textContent = label;
+            btn.disabled = !allowed;
+            actions.appendChild(btn);
+        });
+        row.insertCell().appendChild(actions);
+        patchRow(row, changes);
+        tableBody.querySelector('tr:not([data-id])')?.remove();   // "No records found"
+        tableBody.insertBefore(row, tableBody.firstChild);
+        attachButtonListeners(row);
+    }
+
+    function applySeatMessage(msg) {
+        const row = tableBody.querySelector(`tr[data-id="${msg.id}"]`);
+        if (msg.action === 'delete') {
+            row?.remove();
+        } else if (row) {
+            patchRow(row, msg.changes);
+        } else if (msg.action === 'create') {
+            insertRow(msg.id, msg.changes);
+        }
+    }
+
+    if (window.EventSource) {
+        const feed = new EventSource(pageConfig.seatFeedUrl);
+        feed.onopen = () => { feedConnected = true; };
+        feed.onerror = () => { feedConnected = false; };
+        feed.onmessage = (e) => {
+            const msg = JSON.parse(e.data);
+            if (msg.type === 'reload') {
+                // A bulk change: refetch the page once things settle.
+                clearTimeout(reloadTimer);
+                reloadTimer = setTimeout(() => location.reload(), 1000);
+                return;
+            }
+            applySeatMessage(msg);
+            filterTable();
+        };
+    }
+
+
+    /* ==============================================================
+    FILTER MAIN TABLE ON SEARCH (in addition to dropdown)
+    ============================================================== */
+    const seatTableBody = document.getElementById("seatTableBody");
+
+    input.addEventListener("input", function () {
+        const q = this.value.trim();
+
+        // --- 1. Update dropdown (existing) ---
+        clearTimeout(timeout);
+        if (q.length < 2) {
+            results.style.display = "none";
+            // Reset table to full view
+            loadTableRows("");
+            return;
+        }
+
+        timeout = setTimeout(() => {
+            // --- 2. Search dropdown (existing) ---
+            doSearch(q);
+
+            // --- 3. Filter main table ---
+            loadTableRows(q);
+        }, 300);
+    });
+
+    // ------------------------------------------------------------------
+    // Load table rows via AJAX
+    // ------------------------------------------------------------------
+    // function loadTableRows(query) {
+    //     const url = "{ % url 'seats:filter_seats_table' %}" + (query ? `?q=${encodeURIComponent(query)}` : "");
+    //     fetch(url, {
+    //         headers: { "X-Requested-With": "XMLHttpRequest" }
+    //     })
+    //     .then(r => r.text())
+    //     .then(html => {
+    //         seatTableBody.innerHTML = html;
+    //     })
+    //     .catch(() => {
+    //         seatTableBody.innerHTML = `<tr><td colspan="8" class="text-danger text-center">Error loading seats.</td></tr>`;
+    //     });
+    // }
+
+    // // Clear button (if you add one) or when input is empty
+    // if (q === "") {
+    //     loadTableRows("");
+    // }
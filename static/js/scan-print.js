@@ -0,0 +1,167 @@
+// URLs and permissions come from data-* attributes on this page's <script> tag.
+const pageConfig = document.currentScript.dataset;
+
+// ==============================================
+//  REAL DATABASE SEARCH + PRINT
+// ==============================================
+document.addEventListener("DOMContentLoaded", function () {
+    const searchInput = document.getElementById('searchInput');
+    const searchBtn = document.getElementById('searchBtn');
+    const resultSection = document.getElementById('resultSection');
+    const noResultSection = document.getElementById('noResultSection');
+    const printBtn = document.getElementById('printBtn');
+    const printStatusBadge = document.getElementById('printStatusBadge');
+    const printContainer = document.querySelector('.print-badge-container');
+    const badgeImage = document.getElementById('printBadgeImage');
+    const planPage = document.getElementById('printPlanPage');
+    const planSeatNo = document.getElementById('printPlanSeatNo');
+
+    const hasPrintPermission = pageConfig.canPrint === 'true';
+    let currentSeat = null;
+    // The event's current badge template; its plan lays the badge out
+    // when the pre-rendered image cannot be fetched.
+    let badgeTemplate = null;
+
+    function showPrintStatus(isPrinted) {
+        printStatusBadge.innerHTML = isPrinted
+            ? '<i class="fas fa-check-circle me-1"></i>Printed'
+            : '<i class="fas fa-clock me-1"></i>Not Printed';
+        printStatusBadge.className = `badge ${isPrinted ? 'bg-success' : 'bg-warning text-dark'} badge-custom`;
+        printBtn.disabled = isPrinted || !hasPrintPermission;
+        printBtn.innerHTML = isPrinted
+            ? '<i class="fas fa-check me-2"></i>Already Printed'
+            : '<i class="fas fa-print me-2"></i>Print Badge';
+    }
+
+    // Helper: get CSRF token
+    function getCsrfToken() {
+        return document.querySelector('[name=csrfmiddlewaretoken]').value;
+    }
+
+    // Load a seat's pre-rendered badge into the print area. Resolves false
+    // when there is none (no badge template yet): print the HTML layout then.
+    function loadBadge(url) {
+        return new Promise(resolve => {
+            if (badgeImage.getAttribute('src') === url && badgeImage.complete) {
+                resolve(badgeImage.naturalWidth > 0);
+                return;
+            }
+            badgeImage.onload = () => resolve(true);
+            badgeImage.onerror = () => resolve(false);
+            badgeImage.src = url;
+        });
+    }
+
+    if (hasPrintPermission) {
+        fetch(pageConfig.getTemplateUrl)
+            .then(r => r.json())
+            .then(data => { if (data.success) badgeTemplate = data.template; })
+            .catch(() => {});
+    }
+
+    // Search via Django API
+    function performSearch() {
+        const query = searchInput.value.trim();
+        if (!query || query.length < 2) {
+            alert('Enter at least 2 characters.');
+            return;
+        }
+
+        fetch(`${pageConfig.searchUrl}?q=${encodeURIComponent(query)}`, {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': getCsrfToken()
+            }
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (!data.results || data.results.length === 0) {
+                resultSection.classList.add('d-none');
+                noResultSection.classList.remove('d-none');
+                currentSeat = null;
+                return;
+            }
+
+            // Show FIRST result only
+            const seat = data.results[0];
+            currentSeat = seat;
+
+            document.getElementById('resultName').textContent = seat.name;
+            document.getElementById('resultEmail').textContent = seat.email;
+            document.getElementById('resultCompany').textContent = seat.company || '—';
+            document.getElementById('resultPhone').textContent = seat.phone || '—';
+            document.getElementById('resultSeatNo').textContent = seat.seat_no;
+
+            showPrintStatus(seat.print_status === 'printed');
+            // Fetch the badge now, so printing does not wait for it
+            if (hasPrintPermission) loadBadge(pageConfig.seatBadgeUrl.replace('0', seat.id));
+
+            noResultSection.classList.add('d-none');
+            resultSection.classList.remove('d-none');
+        })
+        .catch(() => {
+            alert('Search failed. Try again.');
+        });
+    }
+
+    // Print: update DB + open print dialog
+    printBtn.addEventListener('click', function () {
+        if (!currentSeat) return;
+
+        // Update print template
+        document.getElementById('printSeatNo').textContent = currentSeat.seat_no;
+        document.getElementById('printName').textContent = currentSeat.name;
+        document.getElementById('printCompany').textContent = currentSeat.company || '—';
+
+        // Call Django to mark as printed
+        fetch(pageConfig.printSeatUrl.replace('0', currentSeat.id), {
+            method: 'POST',
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest',
+                'X-CSRFToken': getCsrfToken()
+            }
+        })
+        .then(r => r.json())
+        .then(data => {
+            if (data.success) {
+                const badge = data.badge_url ? loadBadge(data.badge_url) : Promise.resolve(false);
+                badge.then(ready => {
+                    const usePlan = !ready && badgeTemplate !== null;
+                    if (usePlan) applyBadgePlan(planPage, planSeatNo, badgeTemplate.plan, currentSeat.seat_no);
+                    printContainer.classList.toggle('use-image', ready);
+                    printContainer.classList.toggle('use-plan', usePlan);
+                    window.print();  // Open print dialog
+                    // Update UI after print
+                    setTimeout(() => showPrintStatus(true), 500);
+                });
+            } else {
+                alert('Print failed: ' + data.error);
+            }
+        });
+    });
+
+    // Live feed: another station printing this badge disables our button
+    if (window.EventSource) {
+        const feed = new EventSource(pageConfig.seatFeedUrl);
+        feed.onmessage = (e) => {
+            const msg = JSON.parse(e.data);
+            if (msg.type !== 'seat' || !currentSeat || msg.id !== currentSeat.id) return;
+            if (msg.action === 'delete') {
+                resultSection.classList.add('d-none');
+                currentSeat = null;
+            } else if (msg.changes.print_status) {
+                currentSeat.print_status = msg.changes.print_status[1];
+                showPrintStatus(currentSeat.print_status === 'printed');
+            }
+        };
+    }
+
+    // Events
+    searchBtn.addEventListener('click', performSearch);
+    searchInput.addEventListener('keypress', e => {
+        if (e.key === 'Enter') performSearch();
+    });
+
+    // Focus on load
+    searchInput.focus();
+});
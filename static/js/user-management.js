@@ -0,0 +1,267 @@
+// URLs and permissions come from data-* attributes on this page's <script> tag.
+const pageConfig = document.currentScript.dataset;
+const canEdit = pageConfig.canEdit === 'true';
+const canDelete = pageConfig.canDelete === 'true';
+
+       const API = {
+        list: pageConfig.listUrl,
+        create: pageConfig.createUrl,
+        update: (id) => pageConfig.updateUrl.replace('999', id),
+        delete: (id) => pageConfig.deleteUrl.replace('999', id)
+    };
+
+
+    const createModal = new bootstrap.Modal(document.getElementById('createUserModal'));
+    const editModal = new bootstrap.Modal(document.getElementById('editUserModal'));
+    // const modal = new bootstrap.Modal(document.getElementById('createUserModal'));
+    let editingUserId = null;
+    let usersById = {};
+
+    // Fetch every page of the user list (keyset cursor) and collect the users
+    function fetchAllUsers(cursor = null, acc = []) {
+        const url = cursor ? `${API.list}?cursor=${cursor}` : API.list;
+        return fetch(url)
+            .then(r => r.json())
+            .then(data => {
+                acc.push(...data.users);
+                if (data.next_cursor) return fetchAllUsers(data.next_cursor, acc);
+                return { stats: data.stats, users: acc };
+            });
+    }
+
+    // Load users + stats
+    function loadUsers() {
+        fetchAllUsers()
+            .then(data => {
+                // Update stats
+                document.getElementById('stat-total').textContent = data.stats.total;
+                document.getElementById('stat-admins').textContent = data.stats.admins;
+                document.getElementById('stat-managers').textContent = data.stats.managers;
+                document.getElementById('stat-staff').textContent = data.stats.staff;
+                document.getElementById('user-count').textContent = data.stats.total;
+
+                // Update table
+                usersById = {};
+                const tbody = document.getElementById('userTableBody');
+                tbody.innerHTML = '';
+                data.users.forEach(u => {
+                    usersById[u.id] = u;
+                    const initials = u.name.split(' ').map(n => n[0]).join('').substring(0, 2).toUpperCase();
+                    const tr = document.createElement('tr');
+                    tr.innerHTML = `
+                        <td>
+                            <div class="user-info">
+                                <div class="user-avatar">${initials}</div>
+                                <div>
+                                    <div class="user-name">${u.name}</div>
+                                    <div class="user-email">${u.email}</div>
+                                </div>
+                            </div>
+                        </td>
+                        <td><span class="role-badge role-${u.role}">${u.role.charAt(0).toUpperCase() + u.role.slice(1)}</span></td>
+                        <td><span class="status-${u.status}">${u.status.charAt(0).toUpperCase() + u.status.slice(1)}</span></td>
+                        <td>
+                            <div class="action-buttons">
+                                <button class="btn-action btn-edit" data-id="${u.id}" title="Edit"
+                                   ${canEdit ? '' : `
+                                        disabled
+                                        data-bs-toggle="tooltip"
+                                        data-bs-placement="top"
+                                        title="You do not have permission to create seats"
+                                    `}
+                                >
+                                    <i class="fas fa-edit"></i>
+                                </button>
+                                <button class="btn-action btn-delete" data-id="${u.id}" title="Delete"
+                                ${canDelete ? '' : `
+                                        disabled
+                                        data-bs-toggle="tooltip"
+                                        data-bs-placement="top"
+                                        title="You do not have permission to create seats"
+                                    `}
+                                >
+                                    <i class="fas fa-trash"></i>
+                                </button>
+                            </div>
+                        </td>
+                    `;
+                    tbody.appendChild(tr);
+                });
+                attachActionListeners();
+            });
+    }
+
+    function attachActionListeners() {
+        document.querySelectorAll('.btn-edit').forEach(btn => {
+            btn.onclick = () => editUser(btn.dataset.id);
+        });
+        document.querySelectorAll('.btn-delete').forEach(btn => {
+            btn.onclick = () => deleteUser(btn.dataset.id);
+        });
+    }
+
+function editUser(id) {
+        // Reuse the list already loaded instead of refetching it
+        const user = usersById[id];
+        if (!user) return;
+
+        editingUserId = id;
+        document.getElementById('editUserName').value = user.name;
+        document.getElementById('editUserEmail').value = user.email;
+        document.getElementById('editUserRole').value = user.role;
+        document.getElementById('editUserStatus').checked = String(user.status).toLowerCase() === 'active';
+        document.getElementById('editUserPassword').value = ''; // Clear password
+
+        const statusCheckbox = document.getElementById('editUserStatus');
+         statusCheckbox.checked = (user.status === 'active' || user.status === true);
+
+        // Reset checkboxes in edit modal
+        document.querySelectorAll('#editUserModal input[type="checkbox"]').forEach(cb => cb.checked = false);
+        Object.keys(user.permissions).forEach(key => {
+            const [module, action] = key.split('_');
+            const cbId = `editModal${module.charAt(0).toUpperCase() + module.slice(1)}${action.charAt(0).toUpperCase() + action.slice(1)}`;
+            const cb = document.getElementById(cbId);
+            if (cb) cb.checked = true;
+        });
+
+        editModal.show();
+    }
+
+    function deleteUser(id) {
+        if (!confirm('Delete this user?')) return;
+        fetch(API.delete(id), { method: 'DELETE' })
+            .then(r => r.json())
+            .then(res => {
+                if (res.success) loadUsers();
+                else alert('Delete failed');
+            });
+    }
+
+        // Save Create
+        document.getElementById('btnSaveCreate').onclick = () => saveUser(false);
+
+        // Save Update
+        document.getElementById('btnSaveEdit').onclick = () => saveUser(true);
+
+        function saveUser(isEdit) {
+            const modalId = isEdit ? 'editUserModal' : 'createUserModal';
+            const prefix = isEdit ? 'editModal' : 'createModal';
+            const nameId = isEdit ? 'editUserName' : 'userName';
+            const emailId = isEdit ? 'editUserEmail' : 'userEmail';
+            const roleId = isEdit ? 'editUserRole' : 'userRole';
+            const statusId = isEdit ? 'editUserStatus' : 'userStatus';
+            const passwordId = isEdit ? 'editUserPassword' : 'userPassword';
+
+            const data = {
+                name: document.getElementById(nameId).value.trim(), // Assuming backend expects 'name' from full name
+                email: document.getElementById(emailId).value.trim(),
+                password: document.getElementById(passwordId).value || undefined,
+                role: document.getElementById(roleId).value,
+                status: document.getElementById(statusId).checked ? 'active' : 'inactive',
+                permissions: []
+            };
+
+            if (!data.email || !data.role) {
+                alert('Email and Role are required');
+                return;
+            }
+
+            // Collect permissions
+            document.querySelectorAll(`#${modalId} input[type="checkbox"]:checked`).forEach(cb => {
+                const match = cb.id.match(new RegExp(`${prefix}([A-Z][a-z]+)([A-Z][a-z]+)`));
+                if (match) {
+                    data.permissions.push({
+                        module: match[1].toLowerCase(),
+                        action: match[2].toLowerCase()
+                    });
+                }
+            });
+
+            const url = isEdit ? API.update(editingUserId) : API.create;
+            fetch(url, {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                    'X-CSRFToken': document.querySelector('input[name=csrfmiddlewaretoken]').value
+                },
+                body: JSON.stringify(data)
+            })
+            .then(r => r.json())
+            .then(res => {
+                if (res.success) {
+                    (isEdit ? editModal : createModal).hide();
+                    loadUsers();
+                    if (!isEdit) resetCreateForm();
+                    editingUserId = null;
+                } else {
+                    alert(res.error || 'Save failed');
+                }
+            });
+        }
+
+        function resetCreateForm() {
+            document.querySelector('#createUserModal form').reset();
+            // Reset checkboxes with defaults
+            document.getElementById('createModalSeatView').checked = true;
+            document.getElementById('createModalSeatEdit').checked = true;
+            document.getElementById('createModalBadgeView').checked = true;
+            document.getElementById('createModalBadgePrint').checked = true;
+            document.getElementById('createModalUserView').checked = true;
+            document.getElementById('createModalUserCreate').checked = true;
+            document.getElementById('createModalUserEdit').checked = true;
+            document.getElementById('createModalAlignView').checked = true;
+            document.getElementById('createModalAlignEdit').checked = true;
+            // Others remain unchecked
+        }
+
+    // Search
+    document.getElementById('searchInput').oninput = (e) => {
+        const term = e.target.value.toLowerCase();
+        document.querySelectorAll('#userTableBody tr').forEach(tr => {
+            const text = tr.textContent.toLowerCase();
+            tr.style.display = text.includes(term) ? '' : 'none';
+        });
+    };
+
+    // Reset modal
+   document.getElementById('createUserModal').addEventListener('hidden.bs.modal', () => {
+        resetCreateForm();
+    });
+    document.getElementById('editUserModal').addEventListener('hidden.bs.modal', () => {
+        document.querySelector('#editUserModal form').reset();
+        editingUserId = null;
+    });
+
+    // Initial load
+    loadUsers();
+
+
+ // Automatically disable module permissions when "View" is unchecked (for both modals)
+['createModal', 'editModal'].forEach(prefix => {
+    document.querySelectorAll(`[id^="${prefix}"][id$="View"]`).forEach(viewCheckbox => {
+        viewCheckbox.addEventListener('change', function() {
+            const modalId = this.closest('.modal').id;
+            const card = this.closest('.card-body');
+            const allCheckboxes = card.querySelectorAll(`input[type="checkbox"]:not(#${this.id})`);
+
+            if (!this.checked) {
+                allCheckboxes.forEach(cb => {
+                    cb.checked = false;
+                    cb.disabled = true;
+                });
+            } else {
+                allCheckboxes.forEach(cb => cb.disabled = false);
+            }
+        });
+
+        // Run once on load
+        const card = viewCheckbox.closest('.card-body');
+        const allCheckboxes = card.querySelectorAll(`input[type="checkbox"]:not(#${viewCheckbox.id})`);
+        if (!viewCheckbox.checked) {
+            allCheckboxes.forEach(cb => {
+                cb.checked = false;
+                cb.disabled = true;
+            });
+        }
+    });
+});